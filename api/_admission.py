@@ -0,0 +1,130 @@
+"""
+Admission control for the Jyra API.
+
+Requests are grouped into route classes (password-hashing auth endpoints,
+reads and writes), each with its own concurrency limit. A request arriving
+while its class is at the limit waits in a bounded queue for up to
+``queue_timeout`` seconds. When the queue is full, or the wait times out, the
+request is shed so the caller can answer 503 at once. Overload then costs a
+fast rejection instead of every request piling up and timing out together.
+"""
+
+import threading
+import time
+
+
+class RouteClassLimiter:
+    """
+    Concurrency limit with a bounded, timed wait queue for one route class.
+
+    Parameters:
+    ----------
+    max_active : int
+        Requests handled at once (0 for no limit)
+    max_queue : int
+        Requests allowed to wait for a slot; further requests are shed
+    queue_timeout : float
+        Seconds a queued request waits before it is shed
+    """
+
+    def __init__(self, max_active: int, max_queue: int, queue_timeout: float):
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._condition = threading.Condition()
+        self.active = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.admitted = 0
+        self.shed = 0
+        self.timed_out = 0
+
+    def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if needed; False if shed."""
+        with self._condition:
+            if not self.max_active or (
+                self.active < self.max_active and not self.queued
+            ):
+                self.active += 1
+                self.admitted += 1
+                return True
+
+            if self.queued >= self.max_queue:
+                self.shed += 1
+                return False
+
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self.active >= self.max_active:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.shed += 1
+                        self.timed_out += 1
+                        return False
+                    self._condition.wait(remaining)
+            finally:
+                self.queued -= 1
+
+            self.active += 1
+            self.admitted += 1
+            return True
+
+    def release(self):
+        """Give back a slot taken by ``acquire``."""
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+    def stats(self) -> dict:
+        """Return the current load and counters."""
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "timed_out": self.timed_out,
+        }
+
+
+class AdmissionController:
+    """
+    One ``RouteClassLimiter`` per route class.
+
+    Parameters:
+    ----------
+    limits : dict[str, tuple[int, int]]
+        ``(max_active, max_queue)`` for each route class
+    queue_timeout : float
+        Seconds a queued request waits before it is shed
+    """
+
+    def __init__(
+        self, limits: dict[str, tuple[int, int]], queue_timeout: float = 1.0
+    ):
+        self.queue_timeout = queue_timeout
+        self.limiters = {
+            route_class: RouteClassLimiter(max_active, max_queue, queue_timeout)
+            for route_class, (max_active, max_queue) in limits.items()
+        }
+
+    def acquire(self, route_class: str) -> bool:
+        """Admit a request of ``route_class``; False if it was shed."""
+        return self.limiters[route_class].acquire()
+
+    def release(self, route_class: str):
+        """Mark an admitted request of ``route_class`` as finished."""
+        self.limiters[route_class].release()
+
+    def retry_after(self) -> int:
+        """Whole seconds a shed client should wait before retrying."""
+        return max(1, round(self.queue_timeout))
+
+    def stats(self) -> dict:
+        """Return each route class's load and counters."""
+        return {
+            route_class: limiter.stats()
+            for route_class, limiter in self.limiters.items()
+        }
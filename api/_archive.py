@@ -0,0 +1,80 @@
+"""
+Hot/cold archival of closed tickets for the Jyra API.
+
+Shared by the ``/api/tickets/archive`` endpoint and
+``scripts/archive_tickets.py``. Tickets closed more than a given number of
+days ago (by ``closed_at``, so a long-lived ticket closed today stays put) are
+moved from ``tickets`` to ``tickets_archive`` in small batches, each in its
+own short transaction, so the write lock is never held for long and
+``tickets`` (with its indexes) only holds the working set.
+Archived tickets are returned by listings only when ``include_archived`` is
+requested.
+"""
+
+import sqlite3
+import time
+from typing import Callable, Optional
+import _repository as repository
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def cutoff(older_than_days: float) -> int:
+    """Return the ``closed_at`` epoch before which tickets are archived."""
+    return int(time.time() - older_than_days * 86400)
+
+
+def archive_workspace(
+    db: sqlite3.Connection,
+    workplace_id: int,
+    older_than_days: float,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    pause: float = 0.0,
+    progress: Optional[Callable[[int], None]] = None,
+) -> tuple[int, Optional[int]]:
+    """
+    Archive a workspace's tickets closed over ``older_than_days`` days ago.
+
+    Parameters:
+    ----------
+    db : sqlite3.Connection
+        Writable connection
+    workplace_id : int
+        Workspace whose tickets are archived
+    older_than_days : float
+        Minimum time since a ticket was closed, in days
+    batch_size : int
+        Tickets moved per transaction
+    pause : float
+        Seconds to sleep between batches, giving other writers the lock
+    progress : Callable[[int], None], optional
+        Called with the running total after each committed batch
+
+    Returns:
+    -------
+    tuple[int, int or None]
+        Number of tickets archived, and the workspace version bumped by the
+        last committed batch (None if nothing was archived)
+    """
+    closed_before = cutoff(older_than_days)
+    archived = 0
+    version = None
+    while True:
+        try:
+            moved = repository.archive_closed_tickets(
+                db, workplace_id, closed_before, batch_size
+            )
+            if moved:
+                version = repository.bump_workspace_version(db, workplace_id)
+            db.commit()
+        except sqlite3.Error:
+            db.rollback()
+            raise
+
+        archived += moved
+        if moved and progress:
+            progress(archived)
+        if moved < batch_size:
+            return archived, version
+        if pause:
+            time.sleep(pause)
@@ -0,0 +1,159 @@
+"""
+Persistent audit log for the Jyra API.
+
+``log_action`` hands every event to an ``AuditWriter``, which only appends it
+to an in-memory buffer. A background thread drains the buffer into the
+``audit_events`` table with one ``executemany`` per batch, so requests never
+wait on the insert, and periodically deletes events older than the retention
+period.
+"""
+
+import atexit
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+import _repository as repository
+
+
+class AuditWriter:
+    """
+    Buffers audit events and writes them in batches off the request path.
+
+    Parameters:
+    ----------
+    database : str
+        Path of the SQLite database holding ``audit_events``
+    flush_interval : float
+        Maximum seconds an event waits in the buffer
+    batch_size : int
+        Buffered events that trigger an early flush
+    max_buffer : int
+        Events kept in memory if the database falls behind; beyond this the
+        oldest are dropped (they remain in ``api.log``)
+    retention_days : float
+        Age after which events are pruned (0 keeps them forever)
+    prune_interval : float
+        Minimum seconds between prunes
+    """
+
+    def __init__(
+        self,
+        database: str,
+        flush_interval: float = 1.0,
+        batch_size: int = 500,
+        max_buffer: int = 10000,
+        retention_days: float = 90,
+        prune_interval: float = 3600.0,
+    ):
+        self.database = database
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.retention_days = retention_days
+        self.prune_interval = prune_interval
+        self._buffer: deque[tuple] = deque(maxlen=max_buffer)
+        self._wake = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._db = None
+        self._pruned_at = 0.0
+        self.written = 0
+        self.dropped = 0
+        self.pruned = 0
+        self.failures = 0
+
+    def record(
+        self,
+        ts: str,
+        action: str,
+        user_id,
+        workplace_id,
+        ticket_id,
+        ip_address,
+        details,
+    ):
+        """Buffer one event; ``details`` is already JSON-encoded (or None)."""
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(
+            (ts, action, user_id, workplace_id, ticket_id, ip_address, details)
+        )
+        if self._thread is None:
+            self._start()
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="audit-writer", daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                self._maybe_prune()
+            except sqlite3.Error:
+                self.failures += 1
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(
+                self.database, timeout=5, check_same_thread=False
+            )
+        return self._db
+
+    def flush(self):
+        """Write every buffered event now, in batches of ``batch_size``."""
+        with self._flush_lock:
+            while self._buffer:
+                batch = []
+                while self._buffer and len(batch) < self.batch_size:
+                    batch.append(self._buffer.popleft())
+                db = self._connect()
+                try:
+                    repository.insert_audit_events(db, batch)
+                    db.commit()
+                except sqlite3.Error:
+                    db.rollback()
+                    self._buffer.extendleft(reversed(batch))
+                    raise
+                self.written += len(batch)
+
+    def _maybe_prune(self):
+        if not self.retention_days:
+            return
+        now = time.monotonic()
+        if now - self._pruned_at < self.prune_interval:
+            return
+        self._pruned_at = now
+        self.prune()
+
+    def prune(self) -> int:
+        """Delete events older than the retention period and return how many."""
+        cutoff = datetime.now() - timedelta(days=self.retention_days)
+        with self._flush_lock:
+            db = self._connect()
+            deleted = repository.prune_audit_events(db, cutoff.isoformat())
+            db.commit()
+        self.pruned += deleted
+        return deleted
+
+    def stats(self) -> dict:
+        """Return buffer size and counters."""
+        return {
+            "buffered": len(self._buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+            "pruned": self.pruned,
+            "failures": self.failures,
+        }
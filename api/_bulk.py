@@ -0,0 +1,250 @@
+"""
+Bulk ticket import for the Jyra API.
+
+Shared by the ``/api/tickets/import`` endpoint and ``scripts/import_tickets.py``.
+Uploads are parsed incrementally from a binary stream, validated with the same
+rules as ticket updates, and inserted in fixed-size batches, each in its own
+transaction. Every batch also bumps the workspace's ``change_log`` version so
+caches in all worker processes are invalidated. If an import fails part-way,
+``ImportFailed.resume_from`` is the number of records already committed;
+passing it back as ``resume_from`` skips them on the next attempt.
+"""
+
+import csv
+import io
+import json
+import sqlite3
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
+import _ranking as ranking
+import _repository as repository
+from _models import ticket_field_error
+
+IMPORT_FORMATS = ("csv", "ndjson")
+DEFAULT_BATCH_SIZE = 5000
+MAX_BATCH_SIZE = 50000
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportFailed(Exception):
+    """Raised when a batch cannot be committed."""
+
+    def __init__(self, message: str, result: "ImportResult"):
+        super().__init__(message)
+        self.result = result
+
+    @property
+    def resume_from(self) -> int:
+        return self.result.resume_from
+
+
+class ImportResult:
+    """
+    Running totals for an import.
+
+    ``version`` is the workspace version bumped by the last committed batch,
+    or None while no batch has been committed.
+    """
+
+    __slots__ = ("imported", "skipped", "resume_from", "errors", "version")
+
+    def __init__(self, resume_from: int = 0):
+        self.imported = 0
+        self.skipped = 0
+        self.resume_from = resume_from
+        self.errors: list[dict] = []
+        self.version: Optional[int] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "imported": self.imported,
+            "skipped": self.skipped,
+            "resume_from": self.resume_from,
+            "errors": self.errors,
+        }
+
+
+def iter_records(stream: BinaryIO, fmt: str) -> Iterator[dict]:
+    """
+    Parse an uploaded CSV or NDJSON stream one record at a time.
+
+    Parameters:
+    ----------
+    stream : BinaryIO
+        UTF-8 encoded upload
+    fmt : str
+        "csv" (with a header row) or "ndjson"
+
+    Yields:
+    ------
+    dict
+        One record per CSV row or NDJSON line
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        yield from csv.DictReader(text)
+        return
+
+    for line in text:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield record if isinstance(record, dict) else {}
+
+
+def _ticket_row(
+    record: dict, workplace_id: int, default_owner_id: int, members: set
+) -> tuple:
+    """
+    Validate a record and build its insert parameters.
+
+    NDJSON values can be any JSON type, so types are checked here: a value
+    SQLite cannot bind would otherwise fail the whole batch on every retry.
+    """
+    title = record.get("title")
+    description = record.get("description")
+    if not title or not description:
+        raise ValueError("Title and description are required")
+    if not isinstance(title, str) or not isinstance(description, str):
+        raise ValueError("Title and description must be strings")
+
+    fields = {
+        "status": record.get("status") or "Open",
+        "priority": record.get("priority") or "Medium",
+    }
+    for name, value in fields.items():
+        if not isinstance(value, str):
+            raise ValueError(f"Invalid {name} value")
+    field_error = ticket_field_error(fields)
+    if field_error:
+        raise ValueError(field_error)
+
+    owner_id = record.get("owner_id")
+    if owner_id is None or owner_id == "":
+        owner_id = default_owner_id
+    # bool is an int subclass; JSON true must not become user 1.
+    if isinstance(owner_id, bool) or not isinstance(owner_id, (int, str)):
+        raise ValueError("Invalid owner_id value")
+    try:
+        owner_id = int(owner_id)
+    except ValueError:
+        raise ValueError("Invalid owner_id value")
+    if owner_id not in members:
+        raise ValueError("Owner is not a member of this workspace")
+
+    return (
+        title,
+        description,
+        fields["status"],
+        fields["priority"],
+        owner_id,
+        workplace_id,
+    )
+
+
+def import_tickets(
+    db: sqlite3.Connection,
+    records: Iterable[dict],
+    workplace_id: int,
+    default_owner_id: int,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    resume_from: int = 0,
+    progress: Optional[Callable[[ImportResult], None]] = None,
+) -> ImportResult:
+    """
+    Insert tickets from parsed records in batched transactions.
+
+    Invalid records are skipped and reported (up to ``MAX_REPORTED_ERRORS``)
+    rather than aborting the import.
+
+    Parameters:
+    ----------
+    db : sqlite3.Connection
+        Writable connection
+    records : Iterable[dict]
+        Parsed records, e.g. from ``iter_records``
+    workplace_id : int
+        Workspace the tickets are created in
+    default_owner_id : int
+        Owner for records without an ``owner_id``
+    batch_size : int
+        Number of tickets per transaction
+    resume_from : int
+        Number of leading records to skip (already imported)
+    progress : Callable[[ImportResult], None], optional
+        Called after each committed batch
+
+    Returns:
+    -------
+    ImportResult
+        Totals for the import; ``resume_from`` is the number of records consumed
+
+    Raises:
+    ------
+    ImportFailed
+        If a batch fails to commit; its ``resume_from`` points at that batch
+    """
+    result = ImportResult(resume_from)
+    members = {
+        member.id
+        for member in repository.list_workspace_members(db, workplace_id)
+    }
+    batch: list[tuple] = []
+    consumed = 0
+    # Imported tickets are appended to the bottom of their board column.
+    last_ranks: dict[str, Optional[str]] = {}
+
+    def ranked(row: tuple) -> tuple:
+        status = row[2]
+        if status not in last_ranks:
+            last_ranks[status] = repository.get_last_rank(
+                db, workplace_id, status
+            )
+        last_ranks[status] = ranking.key_between(last_ranks[status], None)
+        return row + (last_ranks[status],)
+
+    def flush():
+        try:
+            repository.insert_tickets(db, map(ranked, batch))
+            version = repository.bump_workspace_version(db, workplace_id)
+            db.commit()
+        except sqlite3.Error as e:
+            db.rollback()
+            raise ImportFailed(f"Batch failed: {str(e)}", result) from e
+        result.imported += len(batch)
+        result.resume_from = consumed
+        result.version = version
+        batch.clear()
+        if progress:
+            progress(result)
+
+    try:
+        for consumed, record in enumerate(records, start=1):
+            if consumed <= resume_from:
+                continue
+            try:
+                batch.append(
+                    _ticket_row(
+                        record, workplace_id, default_owner_id, members
+                    )
+                )
+            except ValueError as e:
+                result.skipped += 1
+                if len(result.errors) < MAX_REPORTED_ERRORS:
+                    result.errors.append(
+                        {"record": consumed, "error": str(e)}
+                    )
+            if len(batch) >= batch_size:
+                flush()
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise ImportFailed(
+            f"Malformed upload after record {consumed}: {str(e)}", result
+        ) from e
+
+    if batch:
+        flush()
+    result.resume_from = max(consumed, resume_from)
+    return result
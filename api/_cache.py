@@ -0,0 +1,111 @@
+"""
+Per-workspace, in-process caches for the Jyra API.
+
+Entries are keyed by workspace and evicted as a group when the invalidation
+bus reports that the workspace changed, whether the write happened in this
+process or another one. The cache is bounded and drops its least recently
+used entry when full, or when its entries outgrow a byte budget.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple, Optional
+
+
+class WorkspaceCache:
+    """
+    Bounded LRU cache whose entries belong to a workspace.
+
+    Parameters:
+    ----------
+    max_entries : int
+        Entries kept across all workspaces (0 disables the cache)
+    max_bytes : int
+        Total ``sizeof`` of the entries kept (0 for no byte budget)
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[int, Hashable], Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def sizeof(self, value: Any) -> int:
+        """Return the bytes a value counts against ``max_bytes``."""
+        return 0
+
+    def _discard(self, key: tuple[int, Hashable]):
+        self.bytes -= self.sizeof(self._entries.pop(key))
+
+    def get(self, workplace_id: int, key: Hashable) -> Optional[Any]:
+        """Return a cached value, or None on a miss."""
+        with self._lock:
+            value = self._entries.get((workplace_id, key))
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((workplace_id, key))
+            self.hits += 1
+            return value
+
+    def put(self, workplace_id: int, key: Hashable, value: Any):
+        """Cache a value, evicting least recently used entries if full."""
+        size = self.sizeof(value)
+        if not self.max_entries or (self.max_bytes and size > self.max_bytes):
+            return
+        with self._lock:
+            if (workplace_id, key) in self._entries:
+                self._discard((workplace_id, key))
+            self._entries[(workplace_id, key)] = value
+            self.bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes and self.bytes > self.max_bytes
+            ):
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def expire(self, workplace_id: int):
+        """Drop every entry of a workspace; subscribed to the bus."""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == workplace_id]
+            for key in stale:
+                self._discard(key)
+
+    def stats(self) -> dict:
+        """Return the entry count, size and counters."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class CachedResponse(NamedTuple):
+    """A serialized JSON response body and the headers sent with it."""
+
+    body: bytes
+    headers: tuple[tuple[str, str], ...] = ()
+
+
+class ResponseCache(WorkspaceCache):
+    """
+    ``WorkspaceCache`` of serialized responses, budgeted by body size.
+
+    Parameters:
+    ----------
+    max_entries : int
+        Responses kept across all workspaces (0 disables the cache)
+    max_bytes : int
+        Total body bytes kept (0 for no byte budget)
+    """
+
+    def sizeof(self, value: CachedResponse) -> int:
+        return len(value.body) + sum(
+            len(name) + len(header) for name, header in value.headers
+        )
@@ -0,0 +1,130 @@
+"""
+Cross-process cache invalidation for the Jyra API.
+
+Write endpoints bump their workspace's row in the ``change_log`` table inside
+the same transaction as the write. Each worker keeps a dedicated connection
+and checks ``PRAGMA data_version`` before handling a request: the value only
+changes when another connection has committed, so in the common case the
+check costs a single pragma. When it does change, the rows with a sequence
+number above the last one seen tell the worker exactly which workspaces
+changed, and only those workspaces' cache entries are evicted.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+import _repository as repository
+
+Subscriber = Callable[[int], None]
+
+
+class InvalidationBus:
+    """
+    Tracks workspace versions and notifies caches when a workspace changes.
+
+    Parameters:
+    ----------
+    database : str
+        Path of the SQLite database to watch
+    poll_interval : float
+        Minimum seconds between ``data_version`` checks (0 checks on every
+        call to ``poll``)
+    """
+
+    def __init__(self, database: str, poll_interval: float = 0.0):
+        self.database = database
+        self.poll_interval = poll_interval
+        self._subscribers: list[Subscriber] = []
+        self._versions: dict[int, int] = {}
+        self._db = None
+        self._data_version = None
+        self._last_seq = 0
+        self._polled_at = 0.0
+        self._lock = threading.Lock()
+        self.polls = 0
+        self.external_changes = 0
+        self.invalidations = 0
+
+    def subscribe(self, callback: Subscriber):
+        """Call ``callback(workplace_id)`` whenever a workspace changes."""
+        self._subscribers.append(callback)
+
+    def version(self, workplace_id: int) -> int:
+        """Return the last known version of a workspace."""
+        return self._versions.get(workplace_id, 0)
+
+    def invalidate(self, workplace_id: int, version: Optional[int] = None):
+        """
+        Evict a workspace from every subscribed cache.
+
+        Called directly after a local write commits, and by ``poll`` for
+        writes made by other processes. ``version`` is the workspace's
+        committed ``change_log`` version; without one the caches are evicted
+        but the known version is left alone, since a guessed version could
+        run ahead of ``change_log`` and hide the next real bump from ``poll``.
+        """
+        if version is not None and version > self._versions.get(
+            workplace_id, 0
+        ):
+            self._versions[workplace_id] = version
+        self.invalidations += 1
+        for callback in self._subscribers:
+            callback(workplace_id)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            path = Path(self.database).absolute()
+            self._db = sqlite3.connect(
+                f"{path.as_uri()}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            self._db.execute("PRAGMA query_only = ON")
+            self._last_seq = repository.last_change_seq(self._db)
+            self._data_version = self._read_data_version()
+        return self._db
+
+    def _read_data_version(self) -> int:
+        return self._db.execute("PRAGMA data_version").fetchone()[0]
+
+    def poll(self):
+        """
+        Evict workspaces changed by other processes since the last poll.
+        """
+        now = time.monotonic()
+        if self.poll_interval and now - self._polled_at < self.poll_interval:
+            return
+
+        with self._lock:
+            self._polled_at = now
+            self.polls += 1
+            self._connect()
+            data_version = self._read_data_version()
+            if data_version == self._data_version:
+                return
+            self._data_version = data_version
+
+            changes = repository.changes_since(self._db, self._last_seq)
+            for workplace_id, version, seq in changes:
+                self._last_seq = max(self._last_seq, seq)
+                if version > self._versions.get(workplace_id, 0):
+                    self.external_changes += 1
+                    self.invalidate(workplace_id, version)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def stats(self) -> dict:
+        """Return counters and the number of tracked workspaces."""
+        return {
+            "workspaces": len(self._versions),
+            "last_seq": self._last_seq,
+            "polls": self.polls,
+            "external_changes": self.external_changes,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,168 @@
+"""
+In-process index of workspace join codes.
+
+A Bloom filter over every known join code lets ``join_workspace`` reject
+mistyped or guessed codes without touching the database, and lets
+``create_workspace`` pick a fresh code without probing the table. The filter
+never gives false negatives for codes it has seen; a positive answer only
+means "possibly valid" and is confirmed with a query.
+
+Codes created by other worker processes are picked up by an incremental
+refresh (``WHERE id > last seen id``), run at most once per
+``refresh_interval`` seconds when a lookup misses, or on the next miss after
+the invalidation bus reports a workspace newer than any loaded.
+"""
+
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+import _repository as repository
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over short strings."""
+
+    __slots__ = ("capacity", "size", "hash_count", "bits", "count")
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(capacity, 1)
+        self.size = max(
+            8,
+            math.ceil(
+                -self.capacity * math.log(error_rate) / (math.log(2) ** 2)
+            ),
+        )
+        self.hash_count = max(
+            1, round(self.size / self.capacity * math.log(2))
+        )
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, value: str):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+class JoinCodeIndex:
+    """
+    Bloom-filter index of join codes, warmed from and refreshed against the
+    ``workplaces`` table.
+
+    Parameters:
+    ----------
+    refresh_interval : float
+        Minimum seconds between refreshes triggered by lookup misses
+    error_rate : float
+        Target false-positive rate of the filter
+    """
+
+    def __init__(
+        self, refresh_interval: float = 5.0, error_rate: float = 0.001
+    ):
+        self.refresh_interval = refresh_interval
+        self.error_rate = error_rate
+        self._filter = BloomFilter(1024, error_rate)
+        self._last_id = 0
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+        self.warmed = False
+        self.rejected = 0
+
+    def warm(self, db: sqlite3.Connection):
+        """Rebuild the filter from every join code in the database."""
+        with self._lock:
+            self._last_id = 0
+            self._filter = BloomFilter(1024, self.error_rate)
+            self._load(db)
+            self.warmed = True
+
+    def refresh(self, db: sqlite3.Connection):
+        """Add join codes of workspaces created since the last load."""
+        with self._lock:
+            self._load(db)
+
+    def _load(self, db: sqlite3.Connection):
+        for workplace_id, join_code in repository.iter_join_codes(
+            db, self._last_id
+        ):
+            if join_code:
+                self._filter.add(join_code)
+            self._last_id = max(self._last_id, workplace_id)
+        if self._filter.count > self._filter.capacity:
+            self._rebuild(db, self._filter.count * 2)
+        self._refreshed_at = time.monotonic()
+
+    def _rebuild(self, db: sqlite3.Connection, capacity: int):
+        """Reload every code into a larger filter once this one is full."""
+        bloom = BloomFilter(capacity, self.error_rate)
+        last_id = 0
+        for workplace_id, join_code in repository.iter_join_codes(db, 0):
+            if join_code:
+                bloom.add(join_code)
+            last_id = max(last_id, workplace_id)
+        self._filter = bloom
+        self._last_id = last_id
+
+    def add(self, join_code: str, workplace_id: int):
+        """Record a join code created by this process."""
+        with self._lock:
+            self._filter.add(join_code)
+            if workplace_id == self._last_id + 1:
+                self._last_id = workplace_id
+
+    def expire(self, workplace_id: int):
+        """
+        Make the next lookup miss refresh immediately if ``workplace_id`` is
+        newer than any workspace already loaded.
+        """
+        if workplace_id > self._last_id:
+            self._refreshed_at = 0.0
+
+    def might_exist(self, db: sqlite3.Connection, join_code: str) -> bool:
+        """
+        Return False if the join code definitely doesn't exist.
+
+        A miss triggers a refresh when the last one is older than
+        ``refresh_interval``, so codes created by other processes are found.
+        """
+        if not self.warmed:
+            self.warm(db)
+        if join_code in self._filter:
+            return True
+        if time.monotonic() - self._refreshed_at >= self.refresh_interval:
+            self.refresh(db)
+            if join_code in self._filter:
+                return True
+        self.rejected += 1
+        return False
+
+    def is_taken(self, db: sqlite3.Connection, join_code: str) -> bool:
+        """Return True if a generated code may collide with an existing one."""
+        if not self.warmed:
+            self.warm(db)
+        return join_code in self._filter
+
+    def stats(self) -> dict:
+        """Return the filter's size and counters."""
+        return {
+            "codes": self._filter.count,
+            "capacity": self._filter.capacity,
+            "bytes": len(self._filter.bits),
+            "rejected": self.rejected,
+        }
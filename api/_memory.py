@@ -0,0 +1,177 @@
+"""
+Memory diagnostics for the Jyra API.
+
+Wraps ``tracemalloc`` so admins can trace a running worker: start and stop
+tracing, take numbered snapshots, and compare two snapshots by allocation
+site to see which lines of code grew. Tracing slows allocation-heavy code
+down noticeably, so it is off until started and should be stopped after use.
+"""
+
+import os
+import sys
+import threading
+import tracemalloc
+from collections import OrderedDict
+from typing import Optional
+
+GROUP_BY = ("lineno", "filename", "traceback")
+
+
+def rss_bytes() -> dict:
+    """
+    Return the process's current and peak resident set size in bytes.
+
+    Either value is None where the platform does not report it: the peak
+    needs the Unix-only ``resource`` module, the current size ``/proc``.
+    """
+    try:
+        import resource
+    except ImportError:
+        peak = None
+    else:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+        peak *= 1 if sys.platform == "darwin" else 1024
+    current = None
+    try:
+        with open("/proc/self/statm") as statm:
+            current = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        pass
+    return {"rss_bytes": current, "peak_rss_bytes": peak}
+
+
+def _site(trace: tracemalloc.Traceback) -> list[str]:
+    return [f"{frame.filename}:{frame.lineno}" for frame in trace]
+
+
+class MemoryTracer:
+    """
+    Starts and stops ``tracemalloc`` and keeps its recent snapshots.
+
+    Parameters:
+    ----------
+    max_snapshots : int
+        Snapshots kept; the oldest is dropped when another is taken
+    """
+
+    def __init__(self, max_snapshots: int = 4):
+        self.max_snapshots = max_snapshots
+        self._snapshots: OrderedDict[int, tracemalloc.Snapshot] = OrderedDict()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def start(self, frames: int = 1):
+        """Start tracing, keeping ``frames`` frames per allocation."""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        tracemalloc.start(frames)
+
+    def stop(self):
+        """Stop tracing and drop every snapshot."""
+        tracemalloc.stop()
+        with self._lock:
+            self._snapshots.clear()
+
+    def snapshot(self) -> int:
+        """
+        Take a snapshot of the traced allocations.
+
+        Returns:
+        -------
+        int
+            The snapshot's ID, for ``compare``
+
+        Raises:
+        ------
+        RuntimeError
+            If tracing has not been started
+        """
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("Memory tracing is not running")
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            )
+        )
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self._snapshots[snapshot_id] = snapshot
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def top(
+        self, snapshot_id: int, group_by: str = "lineno", limit: int = 20
+    ) -> Optional[list[dict]]:
+        """Return a snapshot's largest allocation sites, or None if unknown."""
+        snapshot = self._snapshots.get(snapshot_id)
+        if snapshot is None:
+            return None
+        return [
+            {
+                "site": _site(stat.traceback),
+                "size": stat.size,
+                "count": stat.count,
+            }
+            for stat in snapshot.statistics(group_by)[:limit]
+        ]
+
+    def compare(
+        self,
+        from_id: int,
+        to_id: int,
+        group_by: str = "lineno",
+        limit: int = 20,
+    ) -> Optional[list[dict]]:
+        """
+        Diff two snapshots by allocation site, largest growth first.
+
+        Parameters:
+        ----------
+        from_id : int
+            ID of the earlier snapshot
+        to_id : int
+            ID of the later snapshot
+        group_by : str
+            "lineno", "filename" or "traceback"
+        limit : int
+            Sites returned
+
+        Returns:
+        -------
+        list[dict] or None
+            Per-site size and count changes, or None if either snapshot is
+            unknown
+        """
+        old = self._snapshots.get(from_id)
+        new = self._snapshots.get(to_id)
+        if old is None or new is None:
+            return None
+        return [
+            {
+                "site": _site(stat.traceback),
+                "size": stat.size,
+                "size_diff": stat.size_diff,
+                "count": stat.count,
+                "count_diff": stat.count_diff,
+            }
+            for stat in new.compare_to(old, group_by)[:limit]
+        ]
+
+    def stats(self) -> dict:
+        """Return the tracing state, traced memory and snapshot IDs."""
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else None,
+            "traced_bytes": current,
+            "peak_traced_bytes": peak,
+            "overhead_bytes": (
+                tracemalloc.get_tracemalloc_memory() if tracing else 0
+            ),
+            "snapshots": list(self._snapshots),
+        }
@@ -0,0 +1,278 @@
+"""
+Compact row models for the Jyra API.
+
+Rows are read from SQLite as plain tuples and turned straight into these
+``__slots__`` classes, skipping the intermediate ``sqlite3.Row`` and per-row
+dict. ``to_wire`` is the single place a model becomes the JSON-ready dict
+passed to ``ApiResponse``.
+
+Ticket status and priority are stored as small integer codes (their index in
+``TICKET_STATUSES`` / ``TICKET_PRIORITIES``, so code order is workflow
+order) and ``created_at`` as Unix epoch seconds. ``Ticket`` decodes the codes
+to names, and ``to_wire`` formats the timestamp, so neither encoding leaks
+past the API.
+"""
+
+import calendar
+import json
+import time
+from datetime import date
+from operator import attrgetter
+from typing import Callable, Optional
+
+USER_COLUMNS = "id, name, email, is_admin, workplace_id, mfa_enabled"
+TICKET_COLUMNS = (
+    "id, title, description, status, priority, created_at, owner_id, "
+    "workplace_id, rank"
+)
+WORKPLACE_COLUMNS = "id, name, description, join_code, created_at"
+AUDIT_EVENT_COLUMNS = "id, ts, action, user_id, ticket_id, details"
+
+TICKET_STATUSES = ("Open", "In Progress", "Closed")
+TICKET_PRIORITIES = ("Low", "Medium", "High")
+STATUS_CODES = {status: code for code, status in enumerate(TICKET_STATUSES)}
+PRIORITY_CODES = {
+    priority: code for code, priority in enumerate(TICKET_PRIORITIES)
+}
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def format_timestamp(epoch: int) -> str:
+    """Format epoch seconds as the wire's UTC ``YYYY-MM-DD HH:MM:SS``."""
+    return time.strftime(TIMESTAMP_FORMAT, time.gmtime(epoch))
+
+
+def date_to_epoch(day: date) -> int:
+    """Return the epoch seconds of midnight UTC at the start of ``day``."""
+    return calendar.timegm(day.timetuple())
+
+
+class Model:
+    """
+    Base class for slotted row models.
+
+    Subclasses list their columns in ``__slots__`` in the same order as the
+    matching ``*_COLUMNS`` string, the fields sent to clients by default in
+    ``WIRE_FIELDS``, and in ``WIRE_FORMATS`` a function converting any field
+    whose wire value differs from the stored one.
+    """
+
+    __slots__ = ()
+    WIRE_FIELDS: tuple = ()
+    WIRE_FORMATS: dict[str, Callable] = {}
+
+    @classmethod
+    def from_cursor(cls, cursor, row: tuple):
+        """
+        Build a model from a raw cursor row.
+
+        Matches the ``sqlite3`` row factory signature so it can be assigned
+        to ``cursor.row_factory`` directly.
+        """
+        return cls(*row)
+
+    def __repr__(self):
+        values = ", ".join(
+            f"{name}={getattr(self, name)!r}" for name in self.__slots__
+        )
+        return f"{type(self).__name__}({values})"
+
+
+class User(Model):
+    __slots__ = (
+        "id",
+        "name",
+        "email",
+        "is_admin",
+        "workplace_id",
+        "mfa_enabled",
+        "password_hash",
+    )
+    WIRE_FIELDS = (
+        "id",
+        "name",
+        "email",
+        "is_admin",
+        "workplace_id",
+        "mfa_enabled",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        email: str,
+        is_admin: int,
+        workplace_id: Optional[int],
+        mfa_enabled: int,
+        password_hash: Optional[str] = None,
+    ):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.is_admin = bool(is_admin)
+        self.workplace_id = workplace_id
+        self.mfa_enabled = bool(mfa_enabled)
+        self.password_hash = password_hash
+
+
+class Ticket(Model):
+    __slots__ = (
+        "id",
+        "title",
+        "description",
+        "status",
+        "priority",
+        "created_at",
+        "owner_id",
+        "workplace_id",
+        "rank",
+    )
+    WIRE_FIELDS = (
+        "id",
+        "title",
+        "description",
+        "status",
+        "priority",
+        "created_at",
+        "owner_id",
+        "rank",
+    )
+    WIRE_FORMATS = {"created_at": format_timestamp}
+
+    def __init__(
+        self,
+        id: int,
+        title: str,
+        description: str,
+        status: int,
+        priority: int,
+        created_at: int,
+        owner_id: int,
+        workplace_id: int,
+        rank: Optional[str],
+    ):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.status = TICKET_STATUSES[status]
+        self.priority = TICKET_PRIORITIES[priority]
+        self.created_at = created_at
+        self.owner_id = owner_id
+        self.workplace_id = workplace_id
+        self.rank = rank
+
+
+class Workplace(Model):
+    __slots__ = ("id", "name", "description", "join_code", "created_at")
+    WIRE_FIELDS = ("id", "name", "description", "join_code", "created_at")
+
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        description: Optional[str],
+        join_code: str,
+        created_at: str,
+    ):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.join_code = join_code
+        self.created_at = created_at
+
+
+class AuditEvent(Model):
+    __slots__ = ("id", "ts", "action", "user_id", "ticket_id", "details")
+    WIRE_FIELDS = ("id", "ts", "action", "user_id", "details")
+
+    def __init__(
+        self,
+        id: int,
+        ts: str,
+        action: str,
+        user_id: Optional[int],
+        ticket_id: Optional[int],
+        details: Optional[str],
+    ):
+        self.id = id
+        self.ts = ts
+        self.action = action
+        self.user_id = user_id
+        self.ticket_id = ticket_id
+        self.details = json.loads(details) if details else None
+
+
+def ticket_field_error(fields: dict) -> Optional[str]:
+    """
+    Validate the status and priority of a ticket payload.
+
+    Parameters:
+    ----------
+    fields : dict
+        Ticket fields being written
+
+    Returns:
+    -------
+    str or None
+        The error message for the first invalid field, or None if valid
+    """
+    if "status" in fields and fields["status"] not in TICKET_STATUSES:
+        return "Invalid status value"
+    if "priority" in fields and fields["priority"] not in TICKET_PRIORITIES:
+        return "Invalid priority value"
+    return None
+
+
+_getters: dict[tuple, Callable] = {}
+
+
+def to_wire(value, fields: Optional[tuple] = None):
+    """
+    Serialise a model, or a list of models, to the API wire format.
+
+    Parameters:
+    ----------
+    value : Model or list[Model]
+        The model(s) to serialise
+    fields : tuple, optional
+        Fields to include (defaults to the model's ``WIRE_FIELDS``)
+
+    Returns:
+    -------
+    dict or list[dict]
+        JSON-ready representation of the model(s)
+    """
+    if isinstance(value, list):
+        if not value:
+            return []
+        model = type(value[0])
+        fields = fields or model.WIRE_FIELDS
+        getter = _getter(fields)
+        rows = [dict(zip(fields, getter(item))) for item in value]
+        for field, convert in model.WIRE_FORMATS.items():
+            if field in fields:
+                for row in rows:
+                    row[field] = convert(row[field])
+        return rows
+
+    model = type(value)
+    fields = fields or model.WIRE_FIELDS
+    row = dict(zip(fields, _getter(fields)(value)))
+    for field, convert in model.WIRE_FORMATS.items():
+        if field in fields:
+            row[field] = convert(row[field])
+    return row
+
+
+def _getter(fields: tuple) -> Callable:
+    getter = _getters.get(fields)
+    if getter is None:
+        if len(fields) == 1:
+            single = attrgetter(fields[0])
+            getter = lambda item: (single(item),)
+        else:
+            getter = attrgetter(*fields)
+        _getters[fields] = getter
+    return getter
@@ -0,0 +1,107 @@
+"""
+On-demand request profiling for the Jyra API.
+
+A profiled request runs under ``cProfile`` from admission to teardown, and
+its stats are written as a ``.prof`` file (the ``pstats`` dump format read by
+``python -m pstats``, snakeviz, flameprof and gprof2dot) into a directory
+that keeps only the newest ``max_files`` profiles. Requests that are not
+profiled cost one sampling decision.
+"""
+
+import cProfile
+import os
+import random
+import re
+import threading
+import time
+from typing import Optional
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+class RequestProfiler:
+    """
+    Profiles sampled requests into a bounded on-disk ring.
+
+    Parameters:
+    ----------
+    directory : str
+        Directory the ``.prof`` files are written to (created on first use)
+    max_files : int
+        Profiles kept; the oldest are deleted beyond this
+    sample_rate : float
+        Fraction of requests profiled without being asked to (0 disables)
+    """
+
+    def __init__(
+        self, directory: str, max_files: int = 50, sample_rate: float = 0.0
+    ):
+        self.directory = directory
+        self.max_files = max_files
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self.profiled = 0
+        self.failures = 0
+
+    def sampled(self) -> bool:
+        """Decide whether an unrequested request should be profiled."""
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self, label: str) -> Optional[tuple[cProfile.Profile, str]]:
+        """
+        Start profiling the current thread.
+
+        Parameters:
+        ----------
+        label : str
+            Describes the request, e.g. ``GET api.get_tickets``
+
+        Returns:
+        -------
+        tuple[cProfile.Profile, str] or None
+            The running profile and the file name it will be stored under,
+            or None if another profiler is already active
+        """
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            self.failures += 1
+            return None
+        name = f"{time.time_ns()}-{_UNSAFE.sub('_', label).strip('_')}.prof"
+        return profile, name
+
+    def finish(self, profile: cProfile.Profile, name: str) -> bool:
+        """Stop a profile and store it in the ring; False if not written."""
+        profile.disable()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            profile.dump_stats(os.path.join(self.directory, name))
+            self._trim()
+        except OSError:
+            self.failures += 1
+            return False
+        self.profiled += 1
+        return True
+
+    def _trim(self):
+        with self._lock:
+            # Names start with a nanosecond timestamp, so they sort by age.
+            names = sorted(
+                entry
+                for entry in os.listdir(self.directory)
+                if entry.endswith(".prof")
+            )
+            for stale in names[: max(0, len(names) - self.max_files)]:
+                try:
+                    os.remove(os.path.join(self.directory, stale))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self) -> dict:
+        """Return the configuration and counters."""
+        return {
+            "sample_rate": self.sample_rate,
+            "profiled": self.profiled,
+            "failures": self.failures,
+        }
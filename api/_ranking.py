@@ -0,0 +1,262 @@
+"""
+Manual ticket ordering for the Jyra API.
+
+Every ticket carries a ``rank``: a base-62 string that sorts, byte-wise, in
+board order within its workspace and status column. A key can always be
+generated between any two others, so moving a ticket rewrites only that
+ticket's rank, in the same single-row ``UPDATE`` as its other fields.
+
+Keys are fractional indexes: a variable-length integer part (a head letter
+giving its length, then digits) followed by an optional fraction. Appending
+to a column increments the integer part, so keys grow logarithmically with
+the column; inserting repeatedly at the same spot lengthens the fraction by
+about one digit per six inserts. ``RankRebalancer`` rewrites a column with
+short, evenly spaced keys in the background once a key grows past a limit.
+"""
+
+import sqlite3
+import threading
+from typing import Iterator, Optional
+import _repository as repository
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+INTEGER_ZERO = "a0"
+SMALLEST_INTEGER = "A" + DIGITS[0] * 26
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid rank head: {head!r}")
+
+
+def _split(key: str) -> tuple[str, str]:
+    integer = key[: _integer_length(key[0])]
+    return integer, key[len(integer) :]
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    """Return a fraction between fractions ``a`` and ``b`` (None is 1)."""
+    if b is not None:
+        n = 0
+        while (a[n] if n < len(a) else DIGITS[0]) == b[n]:
+            n += 1
+        if n:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    low = DIGITS.index(a[0]) if a else 0
+    high = DIGITS.index(b[0]) if b is not None else BASE
+    if high - low > 1:
+        return DIGITS[(low + high + 1) // 2]
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[low] + _midpoint(a[1:], None)
+
+
+def _increment(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        value = DIGITS.index(digits[i]) + 1
+        if value < BASE:
+            digits[i] = DIGITS[value]
+            return head + "".join(digits)
+        digits[i] = DIGITS[0]
+    if head == "Z":
+        return INTEGER_ZERO
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(DIGITS[0])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        value = DIGITS.index(digits[i]) - 1
+        if value >= 0:
+            digits[i] = DIGITS[value]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def key_between(low: Optional[str], high: Optional[str]) -> str:
+    """
+    Return a rank that sorts strictly between ``low`` and ``high``.
+
+    Parameters:
+    ----------
+    low : str, optional
+        Rank of the ticket before the new position (None for the top)
+    high : str, optional
+        Rank of the ticket after the new position (None for the bottom)
+
+    Returns:
+    -------
+    str
+        The new rank
+
+    Raises:
+    ------
+    ValueError
+        If ``low`` does not sort before ``high``
+    """
+    if low is not None and high is not None and low >= high:
+        raise ValueError(f"{low!r} does not sort before {high!r}")
+    if low is None:
+        if high is None:
+            return INTEGER_ZERO
+        integer, fraction = _split(high)
+        if integer == SMALLEST_INTEGER:
+            return integer + _midpoint("", fraction)
+        if integer < high:
+            return integer
+        decremented = _decrement(integer)
+        if decremented is None:
+            raise ValueError("Cannot rank before the smallest key")
+        return decremented
+    if high is None:
+        integer, fraction = _split(low)
+        incremented = _increment(integer)
+        if incremented is None:
+            return integer + _midpoint(fraction, None)
+        return incremented
+
+    low_integer, low_fraction = _split(low)
+    high_integer, high_fraction = _split(high)
+    if low_integer == high_integer:
+        return low_integer + _midpoint(low_fraction, high_fraction)
+    incremented = _increment(low_integer)
+    if incremented is not None and incremented < high:
+        return incremented
+    return low_integer + _midpoint(low_fraction, None)
+
+
+def register_functions(db: sqlite3.Connection):
+    """Make ``rank_between(low, high)`` (``key_between``) callable from SQL."""
+    db.create_function("rank_between", 2, key_between, deterministic=True)
+
+
+def iter_keys(after: Optional[str] = None) -> Iterator[str]:
+    """Yield consecutive, short ranks following ``after``."""
+    key = after
+    while True:
+        key = key_between(key, None)
+        yield key
+
+
+def rebalance_column(
+    db: sqlite3.Connection, workplace_id: int, status: str
+) -> int:
+    """
+    Rewrite a column's ranks as consecutive short keys, keeping its order.
+
+    Unranked tickets (from before ranks existed) sort first, by ID. The
+    column is read and rewritten, and the workspace version bumped, in one
+    ``IMMEDIATE`` transaction, so no move can land in between.
+
+    Returns:
+    -------
+    int
+        Number of tickets re-ranked
+    """
+    try:
+        db.execute("BEGIN IMMEDIATE")
+        ticket_ids = repository.list_column_ticket_ids(db, workplace_id, status)
+        repository.set_ticket_ranks(db, zip(iter_keys(), ticket_ids))
+        if ticket_ids:
+            repository.bump_workspace_version(db, workplace_id)
+        db.commit()
+    except sqlite3.Error:
+        db.rollback()
+        raise
+    return len(ticket_ids)
+
+
+class RankRebalancer:
+    """
+    Rebalances columns on a background thread, off the request path.
+
+    Parameters:
+    ----------
+    database : str
+        Path of the SQLite database holding ``tickets``
+    max_length : int
+        Rank length above which a column should be rebalanced
+    """
+
+    def __init__(self, database: str, max_length: int = 32):
+        self.database = database
+        self.max_length = max_length
+        self._pending: set[tuple[int, str]] = set()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._db = None
+        self.rebalanced = 0
+        self.failures = 0
+
+    def check(self, workplace_id: int, status: str, rank: Optional[str]):
+        """Schedule a rebalance if ``rank`` is longer than the limit."""
+        if rank and len(rank) > self.max_length:
+            self.schedule(workplace_id, status)
+
+    def schedule(self, workplace_id: int, status: str):
+        """Queue a column for rebalancing."""
+        with self._lock:
+            self._pending.add((workplace_id, status))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="rank-rebalancer", daemon=True
+                )
+                self._thread.start()
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            self.run_pending()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(
+                self.database, timeout=30, check_same_thread=False
+            )
+        return self._db
+
+    def run_pending(self):
+        """Rebalance every queued column now."""
+        while True:
+            with self._lock:
+                if not self._pending:
+                    return
+                workplace_id, status = self._pending.pop()
+            try:
+                rebalance_column(self._connect(), workplace_id, status)
+                self.rebalanced += 1
+            except sqlite3.Error:
+                self.failures += 1
+
+    def stats(self) -> dict:
+        """Return the queue length and counters."""
+        return {
+            "pending": len(self._pending),
+            "rebalanced": self.rebalanced,
+            "failures": self.failures,
+        }
@@ -0,0 +1,237 @@
+"""
+Token-bucket rate limiting for the Jyra API.
+
+Each key (e.g. ``ip:1.2.3.4`` or ``email:a@b.co``) owns a bucket holding up to
+``capacity`` tokens that refills at ``refill_rate`` tokens per second. A request
+takes one token or is rejected with the number of seconds until one is
+available.
+
+Two backends are provided:
+
+- ``MemoryBackend`` keeps buckets in a bounded LRU dict, per process.
+- ``SQLiteBackend`` keeps buckets in a small SQLite file so that several worker
+  processes on one host share the same limits.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+def _refill(
+    tokens: float, updated: float, now: float, capacity: float, rate: float
+) -> float:
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+class MemoryBackend:
+    """
+    In-process bucket store bounded to ``max_keys`` entries.
+
+    When full, the least recently used bucket is evicted. An evicted bucket
+    simply starts full again, so eviction can only make the limiter more
+    lenient, never stricter.
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self.evictions = 0
+        self._buckets: OrderedDict[str, list] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(
+        self, key: str, capacity: float, rate: float
+    ) -> tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [capacity, now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._buckets.move_to_end(key)
+
+            tokens = _refill(bucket[0], bucket[1], now, capacity, rate)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return True, 0.0
+            bucket[0] = tokens
+            return False, (1 - tokens) / rate
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SQLiteBackend:
+    """
+    Bucket store shared between processes through a SQLite file.
+
+    Each ``take`` runs in a ``BEGIN IMMEDIATE`` transaction, so concurrent
+    workers serialise on the bucket update. Buckets that have been idle long
+    enough to be full again are pruned every ``prune_interval`` seconds.
+    """
+
+    def __init__(self, path: str, prune_interval: float = 60.0):
+        self.path = path
+        self.prune_interval = prune_interval
+        self.evictions = 0
+        self._local = threading.local()
+        self._pruned_at = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None
+            )
+            db.execute("PRAGMA journal_mode = WAL")
+            db.execute("PRAGMA synchronous = NORMAL")
+            db.execute(
+                """CREATE TABLE IF NOT EXISTS rate_limits
+                          (key TEXT PRIMARY KEY,
+                           tokens REAL NOT NULL,
+                           updated REAL NOT NULL)"""
+            )
+            self._local.db = db
+        return db
+
+    def take(
+        self, key: str, capacity: float, rate: float
+    ) -> tuple[bool, float]:
+        db = self._connect()
+        now = time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute(
+                "SELECT tokens, updated FROM rate_limits WHERE key = ?",
+                (key,),
+            ).fetchone()
+            tokens = (
+                capacity
+                if row is None
+                else _refill(row[0], row[1], now, capacity, rate)
+            )
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            db.execute(
+                """INSERT INTO rate_limits (key, tokens, updated)
+                   VALUES (?, ?, ?)
+                   ON CONFLICT(key) DO UPDATE
+                   SET tokens = excluded.tokens, updated = excluded.updated""",
+                (key, tokens, now),
+            )
+            if now - self._pruned_at >= self.prune_interval:
+                self._pruned_at = now
+                self.evictions += db.execute(
+                    "DELETE FROM rate_limits WHERE updated < ?",
+                    (now - capacity / rate,),
+                ).rowcount
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return (True, 0.0) if allowed else (False, (1 - tokens) / rate)
+
+    def __len__(self) -> int:
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM rate_limits"
+        ).fetchone()[0]
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter with per-namespace counters.
+
+    Parameters:
+    ----------
+    backend : MemoryBackend or SQLiteBackend
+        Where bucket state is stored
+    capacity : float
+        Maximum burst size (tokens in a full bucket)
+    per_minute : float
+        Sustained number of requests allowed per minute
+    """
+
+    def __init__(self, backend, capacity: float, per_minute: float):
+        self.backend = backend
+        self.capacity = capacity
+        self.rate = per_minute / 60.0
+        self._counters: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def hit(self, namespace: str, value: str) -> tuple[bool, float]:
+        """
+        Take a token for ``namespace:value``.
+
+        Returns:
+        -------
+        tuple[bool, float]
+            Whether the request is allowed, and seconds until it would be
+        """
+        allowed, retry_after = self.backend.take(
+            f"{namespace}:{value}", self.capacity, self.rate
+        )
+        with self._lock:
+            counters = self._counters.setdefault(
+                namespace, {"allowed": 0, "rejected": 0}
+            )
+            counters["allowed" if allowed else "rejected"] += 1
+        return allowed, retry_after
+
+    def stats(self) -> dict:
+        """Return the limiter's configuration, counters and bucket count."""
+        with self._lock:
+            counters = {k: dict(v) for k, v in self._counters.items()}
+        return {
+            "backend": type(self.backend).__name__,
+            "capacity": self.capacity,
+            "per_minute": self.rate * 60,
+            "buckets": len(self.backend),
+            "evictions": self.backend.evictions,
+            "counters": counters,
+        }
+
+
+def create_limiter(
+    backend: str,
+    capacity: float,
+    per_minute: float,
+    max_keys: int = 10000,
+    path: Optional[str] = None,
+) -> RateLimiter:
+    """
+    Build a limiter from configuration values.
+
+    Parameters:
+    ----------
+    backend : str
+        "memory" or "sqlite"
+    capacity : float
+        Maximum burst size
+    per_minute : float
+        Sustained requests per minute
+    max_keys : int
+        Bucket limit for the memory backend
+    path : str, optional
+        Database file for the sqlite backend
+
+    Returns:
+    -------
+    RateLimiter
+        The configured limiter
+    """
+    if backend == "sqlite":
+        store = SQLiteBackend(path or os.path.abspath("ratelimit.db"))
+    elif backend == "memory":
+        store = MemoryBackend(max_keys)
+    else:
+        raise ValueError(f"Unknown rate limit backend: {backend}")
+    return RateLimiter(store, capacity, per_minute)
@@ -0,0 +1,1298 @@
+"""
+Query repository for the Jyra API.
+
+Every SQL statement issued by the request handlers is declared once in
+``STATEMENTS`` and executed through the typed functions below. Keeping the
+set of statements fixed (no SQL assembled at request time) means each one is
+compiled once per connection and then served from sqlite3's statement cache,
+which is sized to hold all of them via ``STATEMENT_CACHE_SIZE``.
+"""
+
+import heapq
+import sqlite3
+import time
+from typing import Callable, Iterable, Iterator, Optional
+from _models import (
+    AUDIT_EVENT_COLUMNS,
+    PRIORITY_CODES,
+    STATUS_CODES,
+    TICKET_COLUMNS,
+    TICKET_STATUSES,
+    USER_COLUMNS,
+    WORKPLACE_COLUMNS,
+    AuditEvent,
+    Model,
+    Ticket,
+    User,
+    Workplace,
+)
+
+
+def _qualified(alias: str, columns: str) -> str:
+    return ", ".join(f"{alias}.{column}" for column in columns.split(", "))
+
+
+_USER_WIDTH = len(USER_COLUMNS.split(", "))
+_TICKET_WIDTH = len(TICKET_COLUMNS.split(", "))
+_STATUS_COUNTS = ", ".join(
+    f"SUM(status = {code}) OVER ()" for code in range(len(TICKET_STATUSES))
+)
+
+# Status and priority are stored as codes in workflow order, so one plain
+# index per column serves both filtering and sorting.
+TICKET_FILTERS = {
+    "status": "status",
+    "priority": "priority",
+    "owner_id": "owner_id",
+}
+TICKET_SORT_KEYS = {
+    "created_at": None,
+    "status": "status",
+    "priority": "priority",
+}
+
+# Bounds of the epoch-seconds ``created_at`` range when a side is open.
+CREATED_AT_MIN = -(2**63)
+CREATED_AT_MAX = 2**63 - 1
+
+# ``closed_at`` is set when a ticket's status becomes Closed and cleared when
+# it is reopened; archival ages tickets by it.
+_CLOSED = STATUS_CODES["Closed"]
+
+# Indexes backing the statements below, created by ``init_db``
+INDEXES = {
+    "idx_users_workplace_name": "users (workplace_id, lower(name))",
+    "idx_users_workplace_email": "users (workplace_id, lower(email))",
+    "idx_security_questions_user": "security_questions (user_id)",
+    "idx_tickets_workplace_created": "tickets (workplace_id, created_at)",
+    "idx_tickets_workplace_owner": (
+        "tickets (workplace_id, owner_id, created_at)"
+    ),
+    "idx_tickets_workplace_status": (
+        "tickets (workplace_id, status, created_at)"
+    ),
+    "idx_tickets_workplace_priority": (
+        "tickets (workplace_id, priority, created_at)"
+    ),
+    "idx_tickets_workplace_status_rank": (
+        "tickets (workplace_id, status, rank)"
+    ),
+    "idx_tickets_workplace_closed": (
+        "tickets (workplace_id, closed_at) WHERE closed_at IS NOT NULL"
+    ),
+    "idx_tickets_archive_workplace": (
+        "tickets_archive (workplace_id, created_at)"
+    ),
+}
+# Indexes superseded by the ones above, dropped by ``init_db``.
+RETIRED_INDEXES = ("idx_users_workplace",)
+
+# The member directory is ordered by ``lower(name), id``. SQLite's lower()
+# only folds ASCII, so keys computed in Python must do the same.
+_ASCII_LOWER = str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"
+)
+# Sorts after every character, closing the range of a prefix search.
+_PREFIX_END = "\U0010ffff"
+MEMBER_PAGE_START = ("", 0)
+_MEMBER_KEYSET = "(lower(name) > ? OR (lower(name) = ? AND id > ?))"
+# Board columns are ordered by ``rank, id``.
+COLUMN_PAGE_START = ("", 0)
+_COLUMN_KEYSET = "(rank > ? OR (rank = ? AND id > ?))"
+
+
+def _last_rank(workplace_id: str) -> str:
+    """Subquery for the last rank in the column bound to the next ``?``."""
+    return (
+        "(SELECT last.rank FROM tickets AS last "
+        f"WHERE last.workplace_id = {workplace_id} AND last.status = ? "
+        "ORDER BY last.rank DESC LIMIT 1)"
+    )
+
+
+def _ticket_search_name(filters: tuple, sort: str, descending: bool) -> str:
+    direction = "desc" if descending else "asc"
+    return f"search_tickets:{'+'.join(filters) or 'all'}:{sort}:{direction}"
+
+
+def _ticket_search_statements() -> dict[str, str]:
+    """
+    Build one statement per combination of filters and sort order.
+
+    The workspace and created-date range are always bound; status, priority
+    and owner filters are only present in the statements that use them, so
+    each statement can be planned against a matching index. When sorting by
+    status or priority, the date range is written as ``+created_at`` so the
+    planner walks that column's index in order instead of range-scanning by
+    date and sorting every ticket in a temporary B-tree.
+    """
+    statements = {}
+    names = tuple(TICKET_FILTERS)
+    for mask in range(1 << len(names)):
+        filters = tuple(
+            name for i, name in enumerate(names) if mask & (1 << i)
+        )
+        for sort, expression in TICKET_SORT_KEYS.items():
+            keys = ["created_at", "id"]
+            created = "created_at"
+            if expression and sort not in filters:
+                keys.insert(0, expression)
+                created = "+created_at"
+            where = " AND ".join(
+                [
+                    "workplace_id = ?",
+                    *(f"{TICKET_FILTERS[name]} = ?" for name in filters),
+                    f"{created} >= ?",
+                    f"{created} < ?",
+                ]
+            )
+            for descending in (False, True):
+                direction = "DESC" if descending else "ASC"
+                order_by = ", ".join(f"{key} {direction}" for key in keys)
+                statements[_ticket_search_name(filters, sort, descending)] = (
+                    f"SELECT {TICKET_COLUMNS} FROM tickets "
+                    f"WHERE {where} ORDER BY {order_by}"
+                )
+    return statements
+
+
+STATEMENTS = {
+    "user_by_id": f"SELECT {USER_COLUMNS} FROM users WHERE id = ?",
+    "user_by_email": f"""
+        SELECT {USER_COLUMNS}, password FROM users WHERE email = ?
+    """,
+    "principal_with_workplace": f"""
+        SELECT {_qualified("u", USER_COLUMNS)}, {_qualified("w", WORKPLACE_COLUMNS)}
+        FROM users u
+        LEFT JOIN workplaces w ON w.id = u.workplace_id
+        WHERE u.id = ?
+    """,
+    "insert_user": """
+        INSERT INTO users (name, email, password, is_admin, workplace_id, mfa_enabled)
+        VALUES (?, ?, ?, 0, NULL, 0)
+    """,
+    "update_user_fields": f"""
+        UPDATE users
+        SET name = COALESCE(?, name), email = COALESCE(?, email)
+        WHERE id = ?
+        RETURNING {USER_COLUMNS}
+    """,
+    "set_user_workspace": """
+        UPDATE users
+        SET workplace_id = ?, is_admin = ?
+        WHERE id = ? AND workplace_id IS NULL
+    """,
+    "set_user_admin": f"""
+        UPDATE users SET is_admin = 1
+        WHERE id = ? AND workplace_id = (
+            SELECT workplace_id FROM users WHERE id = ? AND is_admin
+        )
+        RETURNING {USER_COLUMNS}
+    """,
+    "set_mfa_enabled": f"""
+        UPDATE users SET mfa_enabled = ? WHERE id = ?
+        RETURNING {USER_COLUMNS}
+    """,
+    "workspace_members": f"""
+        SELECT {USER_COLUMNS}
+        FROM users
+        WHERE workplace_id = ?
+    """,
+    "member_page": f"""
+        SELECT {USER_COLUMNS}
+        FROM users
+        WHERE workplace_id = ? AND lower(name) >= ? AND {_MEMBER_KEYSET}
+        ORDER BY lower(name), id
+        LIMIT ?
+    """,
+    "member_page_by_name": f"""
+        SELECT {USER_COLUMNS}
+        FROM users
+        WHERE workplace_id = ? AND lower(name) >= ? AND lower(name) < ?
+          AND {_MEMBER_KEYSET}
+        ORDER BY lower(name), id
+        LIMIT ?
+    """,
+    "member_page_by_email": f"""
+        SELECT {USER_COLUMNS}
+        FROM users
+        WHERE workplace_id = ? AND lower(email) >= ? AND lower(email) < ?
+          AND {_MEMBER_KEYSET}
+        ORDER BY lower(name), id
+        LIMIT ?
+    """,
+    "security_question": """
+        SELECT question, answer FROM security_questions WHERE user_id = ?
+    """,
+    "update_security_question": """
+        UPDATE security_questions
+        SET question = ?, answer = ?
+        WHERE user_id = ?
+    """,
+    "insert_security_question": """
+        INSERT INTO security_questions (user_id, question, answer)
+        VALUES (?, ?, ?)
+    """,
+    "workplace_by_id": f"""
+        SELECT {WORKPLACE_COLUMNS} FROM workplaces WHERE id = ?
+    """,
+    "workplace_ids": "SELECT id FROM workplaces ORDER BY id",
+    "workplace_by_join_code": f"""
+        SELECT {WORKPLACE_COLUMNS} FROM workplaces WHERE join_code = ?
+    """,
+    "join_codes_since": """
+        SELECT id, join_code FROM workplaces WHERE id > ? ORDER BY id
+    """,
+    "insert_workplace": f"""
+        INSERT INTO workplaces (name, description, join_code)
+        VALUES (?, ?, ?)
+        RETURNING {WORKPLACE_COLUMNS}
+    """,
+    "ticket_by_id": f"SELECT {TICKET_COLUMNS} FROM tickets WHERE id = ?",
+    "workspace_tickets": f"""
+        SELECT {TICKET_COLUMNS}
+        FROM tickets
+        WHERE workplace_id = ?
+        ORDER BY created_at DESC
+    """,
+    "owner_tickets": f"""
+        SELECT {TICKET_COLUMNS}
+        FROM tickets
+        WHERE workplace_id = ? AND owner_id = ?
+        ORDER BY created_at DESC
+    """,
+    "workspace_ticket_page": f"""
+        SELECT {TICKET_COLUMNS}, COUNT(*) OVER (), {_STATUS_COUNTS}
+        FROM tickets
+        WHERE workplace_id = ?
+        ORDER BY created_at DESC
+        LIMIT ?
+    """,
+    "owner_ticket_page": f"""
+        SELECT {TICKET_COLUMNS}, COUNT(*) OVER (), {_STATUS_COUNTS}
+        FROM tickets
+        WHERE workplace_id = ? AND owner_id = ?
+        ORDER BY created_at DESC
+        LIMIT ?
+    """,
+    "archive_closed_tickets": f"""
+        INSERT INTO tickets_archive ({TICKET_COLUMNS}, closed_at)
+        SELECT {TICKET_COLUMNS}, closed_at
+        FROM tickets
+        WHERE workplace_id = ? AND status = {_CLOSED} AND closed_at < ?
+        ORDER BY closed_at
+        LIMIT ?
+        RETURNING id
+    """,
+    "delete_ticket": "DELETE FROM tickets WHERE id = ?",
+    "archived_ticket_by_id": f"""
+        SELECT {TICKET_COLUMNS} FROM tickets_archive WHERE id = ?
+    """,
+    "archived_tickets": f"""
+        SELECT {TICKET_COLUMNS}
+        FROM tickets_archive
+        WHERE workplace_id = ?
+          AND created_at >= ? AND created_at < ?
+          AND (? IS NULL OR owner_id = ?)
+          AND (? IS NULL OR priority = ?)
+    """,
+    "insert_ticket": f"""
+        INSERT INTO tickets (title, description, status, priority, owner_id, workplace_id, rank, closed_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, CASE ? WHEN {_CLOSED} THEN unixepoch() END)
+    """,
+    "create_ticket": f"""
+        INSERT INTO tickets (title, description, status, priority, owner_id, workplace_id, rank, closed_at)
+        SELECT ?, ?, ?, ?, users.id, users.workplace_id,
+               rank_between({_last_rank("users.workplace_id")}, NULL),
+               CASE ? WHEN {_CLOSED} THEN unixepoch() END
+        FROM users
+        WHERE users.id = ? AND users.workplace_id IS NOT NULL
+        RETURNING {TICKET_COLUMNS}
+    """,
+    "update_ticket_fields": f"""
+        UPDATE tickets
+        SET title = COALESCE(?, title),
+            description = COALESCE(?, description),
+            status = COALESCE(?, status),
+            priority = COALESCE(?, priority),
+            rank = COALESCE(
+                ?,
+                CASE WHEN ? != status
+                THEN rank_between({_last_rank("tickets.workplace_id")}, NULL)
+                ELSE rank END
+            ),
+            closed_at = CASE
+                WHEN COALESCE(?, status) != {_CLOSED} THEN NULL
+                WHEN status = {_CLOSED} THEN COALESCE(closed_at, unixepoch())
+                ELSE unixepoch()
+            END
+        WHERE id = ? AND EXISTS (
+            SELECT 1 FROM users
+            WHERE users.id = ? AND users.workplace_id = tickets.workplace_id
+              AND (users.is_admin OR tickets.owner_id = users.id)
+        )
+        RETURNING {TICKET_COLUMNS}
+    """,
+    "last_column_rank": """
+        SELECT rank
+        FROM tickets
+        WHERE workplace_id = ? AND status = ?
+        ORDER BY rank DESC
+        LIMIT 1
+    """,
+    "next_column_rank": """
+        SELECT rank
+        FROM tickets
+        WHERE workplace_id = ? AND status = ? AND rank > ? AND id != ?
+        ORDER BY rank
+        LIMIT 1
+    """,
+    "previous_column_rank": """
+        SELECT rank
+        FROM tickets
+        WHERE workplace_id = ? AND status = ? AND rank < ? AND id != ?
+        ORDER BY rank DESC
+        LIMIT 1
+    """,
+    "ticket_positions": """
+        SELECT id, status, rank
+        FROM tickets
+        WHERE workplace_id = ? AND id IN (?, ?)
+    """,
+    "column_tickets": f"""
+        SELECT {TICKET_COLUMNS}
+        FROM tickets
+        WHERE workplace_id = ? AND status = ? AND rank >= ? AND {_COLUMN_KEYSET}
+        ORDER BY rank, id
+        LIMIT ?
+    """,
+    "owner_column_tickets": f"""
+        SELECT {TICKET_COLUMNS}
+        FROM tickets
+        WHERE workplace_id = ? AND status = ? AND rank >= ? AND {_COLUMN_KEYSET}
+          AND owner_id = ?
+        ORDER BY rank, id
+        LIMIT ?
+    """,
+    "column_ticket_ids": """
+        SELECT id
+        FROM tickets
+        WHERE workplace_id = ? AND status = ?
+        ORDER BY rank, id
+    """,
+    "set_ticket_rank": "UPDATE tickets SET rank = ? WHERE id = ?",
+    "backfill_closed_at": f"""
+        UPDATE tickets SET closed_at = unixepoch()
+        WHERE status = {_CLOSED} AND closed_at IS NULL
+    """,
+    "unranked_columns": """
+        SELECT DISTINCT workplace_id, status
+        FROM tickets
+        WHERE rank IS NULL
+    """,
+    "insert_audit_event": """
+        INSERT INTO audit_events
+            (ts, action, user_id, workplace_id, ticket_id, ip_address, details)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """,
+    "ticket_history": f"""
+        SELECT {AUDIT_EVENT_COLUMNS}
+        FROM audit_events
+        WHERE workplace_id = ? AND ticket_id = ?
+        ORDER BY ts
+    """,
+    "prune_audit_events": "DELETE FROM audit_events WHERE ts < ?",
+    "bump_workspace_version": """
+        INSERT INTO change_log (workplace_id, version, seq)
+        VALUES (?, 1, (SELECT COALESCE(MAX(seq), 0) + 1 FROM change_log))
+        ON CONFLICT(workplace_id) DO UPDATE
+        SET version = version + 1, seq = excluded.seq
+        RETURNING version
+    """,
+    "changes_since": """
+        SELECT workplace_id, version, seq
+        FROM change_log
+        WHERE seq > ?
+        ORDER BY seq
+    """,
+    "last_change_seq": "SELECT COALESCE(MAX(seq), 0) FROM change_log",
+    **_ticket_search_statements(),
+}
+
+STATEMENT_CACHE_SIZE = len(STATEMENTS)
+
+StatementHook = Callable[[str, float], None]
+
+_statement_hooks: list[StatementHook] = []
+
+
+def add_statement_hook(hook: StatementHook):
+    """
+    Register a callback invoked after every repository statement.
+
+    Parameters:
+    ----------
+    hook : Callable[[str, float], None]
+        Called with the statement name and its execution time in seconds
+    """
+    _statement_hooks.append(hook)
+
+
+def remove_statement_hook(hook: StatementHook):
+    """
+    Unregister a callback previously added with ``add_statement_hook``.
+
+    Parameters:
+    ----------
+    hook : Callable[[str, float], None]
+        The callback to remove
+    """
+    if hook in _statement_hooks:
+        _statement_hooks.remove(hook)
+
+
+def execute(
+    db: sqlite3.Connection,
+    name: str,
+    params: tuple = (),
+    model: Optional[type[Model]] = None,
+) -> sqlite3.Cursor:
+    """
+    Execute a named statement, reporting its timing to registered hooks.
+
+    Parameters:
+    ----------
+    db : sqlite3.Connection
+        Connection to execute the statement on
+    name : str
+        Key of the statement in ``STATEMENTS``
+    params : tuple
+        Positional parameters bound to the statement
+    model : type[Model], optional
+        Model class that result rows are built into
+
+    Returns:
+    -------
+    sqlite3.Cursor
+        Cursor positioned on the statement's results
+    """
+    sql = STATEMENTS[name]
+    cursor = db.cursor()
+    if model is not None:
+        cursor.row_factory = model.from_cursor
+    if not _statement_hooks:
+        return cursor.execute(sql, params)
+
+    start = time.perf_counter()
+    cursor.execute(sql, params)
+    elapsed = time.perf_counter() - start
+    for hook in _statement_hooks:
+        hook(name, elapsed)
+    return cursor
+
+
+def execute_many(
+    db: sqlite3.Connection, name: str, seq_of_params: Iterable[tuple]
+) -> sqlite3.Cursor:
+    """
+    Execute a named statement once per parameter tuple.
+
+    Parameters:
+    ----------
+    db : sqlite3.Connection
+        Connection to execute the statement on
+    name : str
+        Key of the statement in ``STATEMENTS``
+    seq_of_params : Iterable[tuple]
+        Parameter tuples, one per execution
+
+    Returns:
+    -------
+    sqlite3.Cursor
+        Cursor whose ``rowcount`` is the total number of affected rows
+    """
+    sql = STATEMENTS[name]
+    if not _statement_hooks:
+        return db.executemany(sql, seq_of_params)
+
+    start = time.perf_counter()
+    cursor = db.executemany(sql, seq_of_params)
+    elapsed = time.perf_counter() - start
+    for hook in _statement_hooks:
+        hook(name, elapsed)
+    return cursor
+
+
+def get_principal(db: sqlite3.Connection, user_id: int) -> Optional[User]:
+    """Return a user by ID, or None if they don't exist."""
+    return execute(db, "user_by_id", (user_id,), User).fetchone()
+
+
+def get_principal_with_workplace(
+    db: sqlite3.Connection, user_id: int
+) -> Optional[tuple[User, Optional[Workplace]]]:
+    """
+    Return a user and their workspace from a single join.
+
+    Returns:
+    -------
+    tuple[User, Workplace or None] or None
+        The user and workspace (None if they haven't joined one), or None if
+        the user doesn't exist
+    """
+    row = execute(db, "principal_with_workplace", (user_id,)).fetchone()
+    if row is None:
+        return None
+    user = User(*row[:_USER_WIDTH])
+    workplace = Workplace(*row[_USER_WIDTH:]) if row[_USER_WIDTH] else None
+    return user, workplace
+
+
+def get_user_by_email(db: sqlite3.Connection, email: str) -> Optional[User]:
+    """Return a user, including their password hash, by email."""
+    return execute(db, "user_by_email", (email,), User).fetchone()
+
+
+def insert_user(
+    db: sqlite3.Connection, name: str, email: str, password_hash: str
+) -> int:
+    """Insert a user without a workspace and return the new ID."""
+    return execute(
+        db, "insert_user", (name, email, password_hash)
+    ).lastrowid
+
+
+def update_user_fields(
+    db: sqlite3.Connection,
+    user_id: int,
+    name: Optional[str] = None,
+    email: Optional[str] = None,
+) -> Optional[User]:
+    """
+    Update the given profile fields and return the updated user.
+
+    Returns None if the user doesn't exist; raises ``sqlite3.IntegrityError``
+    if the email address belongs to another user.
+    """
+    return execute(
+        db, "update_user_fields", (name, email, user_id), User
+    ).fetchone()
+
+
+def set_user_workspace(
+    db: sqlite3.Connection, user_id: int, workplace_id: int, is_admin: bool
+) -> bool:
+    """
+    Move a user into a workspace with the given admin flag.
+
+    Returns False, changing nothing, if the user already belongs to a
+    workspace (or doesn't exist).
+    """
+    return (
+        execute(
+            db, "set_user_workspace", (workplace_id, int(is_admin), user_id)
+        ).rowcount
+        == 1
+    )
+
+
+def set_user_admin(
+    db: sqlite3.Connection, user_id: int, admin_id: int
+) -> Optional[User]:
+    """
+    Grant admin rights to a user, on behalf of an admin of their workspace.
+
+    Returns the promoted user, or None (changing nothing) if ``admin_id`` is
+    not an admin of the user's workspace or the user does not exist.
+    """
+    return execute(
+        db, "set_user_admin", (user_id, admin_id), User
+    ).fetchone()
+
+
+def set_mfa_enabled(
+    db: sqlite3.Connection, user_id: int, enabled: bool
+) -> Optional[User]:
+    """Turn MFA on or off for a user; returns the user, or None if missing."""
+    return execute(
+        db, "set_mfa_enabled", (int(enabled), user_id), User
+    ).fetchone()
+
+
+def list_workspace_members(
+    db: sqlite3.Connection, workplace_id: int
+) -> list[User]:
+    """Return every member of a workspace."""
+    return execute(
+        db, "workspace_members", (workplace_id,), User
+    ).fetchall()
+
+
+def member_key(user: User) -> tuple[str, int]:
+    """Return a member's position in the directory order."""
+    return user.name.translate(_ASCII_LOWER), user.id
+
+
+def list_workspace_members_page(
+    db: sqlite3.Connection,
+    workplace_id: int,
+    limit: int,
+    after: tuple[str, int] = MEMBER_PAGE_START,
+    prefix: Optional[str] = None,
+) -> tuple[list[User], Optional[tuple[str, int]]]:
+    """
+    Return one page of a workspace's members, ordered by name.
+
+    Pages are keyset-paginated on ``(lower(name), id)``, so every page is a
+    range read of the ``(workplace_id, lower(name))`` index however deep it
+    is. With a ``prefix``, members whose name or email starts with it
+    (ignoring ASCII case) are returned: each column is range-searched through
+    its own index and the two ordered results are merged.
+
+    Parameters:
+    ----------
+    db : sqlite3.Connection
+        Database connection
+    workplace_id : int
+        Workspace whose members are listed
+    limit : int
+        Maximum members returned
+    after : tuple[str, int]
+        Key of the last member of the previous page
+    prefix : str, optional
+        Name or email prefix to search for
+
+    Returns:
+    -------
+    tuple[list[User], tuple[str, int] or None]
+        The page, and the key to pass as ``after`` for the next page (None
+        on the last page)
+    """
+    name, user_id = after
+    keyset = (name, name, user_id)
+    if prefix is None:
+        members = execute(
+            db,
+            "member_page",
+            (workplace_id, name, *keyset, limit + 1),
+            User,
+        ).fetchall()
+    else:
+        start = prefix.translate(_ASCII_LOWER)
+        end = start + _PREFIX_END
+        by_name = execute(
+            db,
+            "member_page_by_name",
+            (workplace_id, max(start, name), end, *keyset, limit + 1),
+            User,
+        ).fetchall()
+        by_email = execute(
+            db,
+            "member_page_by_email",
+            (workplace_id, start, end, *keyset, limit + 1),
+            User,
+        ).fetchall()
+        members, seen = [], set()
+        for user in heapq.merge(by_name, by_email, key=member_key):
+            if user.id not in seen:
+                seen.add(user.id)
+                members.append(user)
+            if len(members) > limit:
+                break
+
+    if len(members) > limit:
+        del members[limit:]
+        return members, member_key(members[-1])
+    return members, None
+
+
+def get_security_question(
+    db: sqlite3.Connection, user_id: int
+) -> Optional[tuple[str, str]]:
+    """Return the question and hashed answer for a user's MFA."""
+    return execute(db, "security_question", (user_id,)).fetchone()
+
+
+def save_security_question(
+    db: sqlite3.Connection, user_id: int, question: str, answer_hash: str
+):
+    """Create or replace the security question for a user."""
+    cursor = execute(
+        db, "update_security_question", (question, answer_hash, user_id)
+    )
+    if cursor.rowcount == 0:
+        execute(
+            db, "insert_security_question", (user_id, question, answer_hash)
+        )
+
+
+def get_workplace(
+    db: sqlite3.Connection, workplace_id: int
+) -> Optional[Workplace]:
+    """Return a workspace by ID."""
+    return execute(
+        db, "workplace_by_id", (workplace_id,), Workplace
+    ).fetchone()
+
+
+def list_workplace_ids(db: sqlite3.Connection) -> list[int]:
+    """Return the ID of every workspace."""
+    return [row[0] for row in execute(db, "workplace_ids").fetchall()]
+
+
+def find_workplace(
+    db: sqlite3.Connection, join_code: str
+) -> Optional[Workplace]:
+    """Return the workspace with this join code, if any."""
+    return execute(
+        db, "workplace_by_join_code", (join_code,), Workplace
+    ).fetchone()
+
+
+def iter_join_codes(
+    db: sqlite3.Connection, after_id: int = 0
+) -> sqlite3.Cursor:
+    """Iterate (id, join_code) for workspaces with an ID above after_id."""
+    return execute(db, "join_codes_since", (after_id,))
+
+
+def insert_workplace(
+    db: sqlite3.Connection, name: str, description: str, join_code: str
+) -> Workplace:
+    """Insert a workspace and return it."""
+    return execute(
+        db, "insert_workplace", (name, description, join_code), Workplace
+    ).fetchone()
+
+
+def get_ticket(db: sqlite3.Connection, ticket_id: int) -> Optional[Ticket]:
+    """Return a ticket by ID."""
+    return execute(db, "ticket_by_id", (ticket_id,), Ticket).fetchone()
+
+
+def get_archived_ticket(
+    db: sqlite3.Connection, ticket_id: int
+) -> Optional[Ticket]:
+    """Return an archived ticket by ID."""
+    return execute(
+        db, "archived_ticket_by_id", (ticket_id,), Ticket
+    ).fetchone()
+
+
+def archive_closed_tickets(
+    db: sqlite3.Connection, workplace_id: int, closed_before: int, limit: int
+) -> int:
+    """
+    Move up to ``limit`` of a workspace's Closed tickets to the archive.
+
+    Only tickets closed before ``closed_before`` (epoch seconds) are moved,
+    longest-closed first. Runs inside the caller's transaction; the caller
+    commits.
+
+    Returns:
+    -------
+    int
+        Number of tickets moved
+    """
+    ids = execute(
+        db,
+        "archive_closed_tickets",
+        (workplace_id, closed_before, limit),
+    ).fetchall()
+    execute_many(db, "delete_ticket", ids)
+    return len(ids)
+
+
+def list_tickets(
+    db: sqlite3.Connection,
+    workplace_id: int,
+    owner_id: Optional[int] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    created_from: Optional[int] = None,
+    created_before: Optional[int] = None,
+    sort: str = "created_at",
+    descending: bool = True,
+    include_archived: bool = False,
+) -> list[Ticket]:
+    """
+    Return a workspace's tickets, filtered and sorted.
+
+    Parameters:
+    ----------
+    db : sqlite3.Connection
+        Connection to read from
+    workplace_id : int
+        Workspace whose tickets are listed
+    owner_id : int, optional
+        Restrict the listing to tickets owned by this user
+    status : str, optional
+        Restrict the listing to one of ``TICKET_STATUSES``
+    priority : str, optional
+        Restrict the listing to one of ``TICKET_PRIORITIES``
+    created_from : int, optional
+        Earliest ``created_at`` included, in epoch seconds (inclusive)
+    created_before : int, optional
+        ``created_at`` upper bound, in epoch seconds (exclusive)
+    sort : str
+        Key of ``TICKET_SORT_KEYS``; ties are ordered by creation time
+    descending : bool
+        Sort direction
+    include_archived : bool
+        Also return matching tickets from ``tickets_archive``, merged into
+        the same order
+
+    Returns:
+    -------
+    list[Ticket]
+        Matching tickets, newest first by default
+    """
+    values = {"status": status, "priority": priority, "owner_id": owner_id}
+    filters = tuple(
+        name for name in TICKET_FILTERS if values[name] is not None
+    )
+    params = [workplace_id]
+    for name in filters:
+        if name == "status":
+            params.append(STATUS_CODES[status])
+        elif name == "priority":
+            params.append(PRIORITY_CODES[priority])
+        else:
+            params.append(owner_id)
+    params.append(_or(created_from, CREATED_AT_MIN))
+    params.append(_or(created_before, CREATED_AT_MAX))
+
+    tickets = execute(
+        db,
+        _ticket_search_name(filters, sort, descending),
+        tuple(params),
+        Ticket,
+    ).fetchall()
+
+    if not include_archived or status not in (None, "Closed"):
+        return tickets
+
+    priority_code = None if priority is None else PRIORITY_CODES[priority]
+    archived = execute(
+        db,
+        "archived_tickets",
+        (
+            workplace_id,
+            _or(created_from, CREATED_AT_MIN),
+            _or(created_before, CREATED_AT_MAX),
+            owner_id,
+            owner_id,
+            priority_code,
+            priority_code,
+        ),
+        Ticket,
+    ).fetchall()
+    if not archived:
+        return tickets
+    return sorted(
+        tickets + archived, key=_ticket_sort_key(sort), reverse=descending
+    )
+
+
+def _ticket_sort_key(sort: str) -> Callable[[Ticket], tuple]:
+    """Python equivalent of a search statement's ORDER BY."""
+    if sort == "status":
+        return lambda t: (STATUS_CODES[t.status], t.created_at, t.id)
+    if sort == "priority":
+        return lambda t: (PRIORITY_CODES[t.priority], t.created_at, t.id)
+    return lambda t: (t.created_at, t.id)
+
+
+def _or(value: Optional[int], default: int) -> int:
+    return default if value is None else value
+
+
+def ticket_page_with_counts(
+    db: sqlite3.Connection,
+    workplace_id: int,
+    owner_id: Optional[int] = None,
+    limit: int = 50,
+) -> tuple[list[Ticket], dict[str, int]]:
+    """
+    Return the newest tickets and the counts over all matching tickets.
+
+    The counts are window aggregates evaluated before ``LIMIT``, so the page
+    and the totals come from one statement and one scan.
+
+    Parameters:
+    ----------
+    db : sqlite3.Connection
+        Connection to read from
+    workplace_id : int
+        Workspace whose tickets are listed
+    owner_id : int, optional
+        Restrict the page and counts to tickets owned by this user
+    limit : int
+        Maximum number of tickets returned
+
+    Returns:
+    -------
+    tuple[list[Ticket], dict[str, int]]
+        The page of tickets, and a "total" count plus one count per status
+    """
+    if owner_id is None:
+        cursor = execute(
+            db, "workspace_ticket_page", (workplace_id, limit)
+        )
+    else:
+        cursor = execute(
+            db, "owner_ticket_page", (workplace_id, owner_id, limit)
+        )
+    rows = cursor.fetchall()
+
+    tickets = [Ticket(*row[:_TICKET_WIDTH]) for row in rows]
+    if rows:
+        totals = rows[0][_TICKET_WIDTH:]
+    else:
+        totals = (0,) * (len(TICKET_STATUSES) + 1)
+    counts = {"total": totals[0]}
+    counts.update(zip(TICKET_STATUSES, totals[1:]))
+    return tickets, counts
+
+
+def iter_tickets(
+    db: sqlite3.Connection,
+    workplace_id: int,
+    owner_id: Optional[int] = None,
+    chunk_size: int = 1000,
+) -> Iterator[list[Ticket]]:
+    """
+    Stream a workspace's tickets in chunks, newest first.
+
+    Uses the same statements as ``list_tickets`` but reads the cursor with
+    ``fetchmany`` so only one chunk of rows is held in memory at a time.
+
+    Parameters:
+    ----------
+    db : sqlite3.Connection
+        Connection to read from
+    workplace_id : int
+        Workspace whose tickets are listed
+    owner_id : int, optional
+        Restrict the listing to tickets owned by this user
+    chunk_size : int
+        Number of tickets fetched per chunk
+
+    Yields:
+    ------
+    list[Ticket]
+        Consecutive chunks of at most ``chunk_size`` tickets
+    """
+    if owner_id is None:
+        cursor = execute(db, "workspace_tickets", (workplace_id,), Ticket)
+    else:
+        cursor = execute(
+            db, "owner_tickets", (workplace_id, owner_id), Ticket
+        )
+    try:
+        while True:
+            chunk = cursor.fetchmany(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        cursor.close()
+
+
+def create_ticket(
+    db: sqlite3.Connection,
+    user_id: int,
+    title: str,
+    description: str,
+    status: str,
+    priority: str,
+) -> Optional[Ticket]:
+    """
+    Create a ticket owned by a user, at the bottom of its board column.
+
+    The owner's workspace is read inside the ``INSERT``; returns None if the
+    user doesn't belong to a workspace.
+    """
+    return execute(
+        db,
+        "create_ticket",
+        (
+            title,
+            description,
+            STATUS_CODES[status],
+            PRIORITY_CODES[priority],
+            STATUS_CODES[status],
+            STATUS_CODES[status],
+            user_id,
+        ),
+        Ticket,
+    ).fetchone()
+
+
+def insert_tickets(db: sqlite3.Connection, rows: Iterable[tuple]) -> int:
+    """
+    Insert many tickets with a single prepared statement.
+
+    Parameters:
+    ----------
+    db : sqlite3.Connection
+        Connection to write to
+    rows : Iterable[tuple]
+        (title, description, status, priority, owner_id, workplace_id, rank)
+        tuples
+
+    Returns:
+    -------
+    int
+        Number of tickets inserted
+    """
+    encoded = (
+        row[:2]
+        + (STATUS_CODES[row[2]], PRIORITY_CODES[row[3]])
+        + row[4:]
+        + (STATUS_CODES[row[2]],)
+        for row in rows
+    )
+    return execute_many(db, "insert_ticket", encoded).rowcount
+
+
+def update_ticket_fields(
+    db: sqlite3.Connection,
+    ticket_id: int,
+    user_id: int,
+    title: Optional[str] = None,
+    description: Optional[str] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    rank: Optional[str] = None,
+) -> Optional[Ticket]:
+    """
+    Update the given ticket fields on behalf of a user.
+
+    The permission check is part of the ``UPDATE``: the user must be in the
+    ticket's workspace and either own the ticket or be an admin. A ticket
+    whose status changes without a ``rank`` moves to the bottom of its new
+    column, and ``closed_at`` follows the status in and out of Closed.
+
+    Returns:
+    -------
+    Ticket or None
+        The updated ticket, or None if it doesn't exist or the user may not
+        update it
+    """
+    status_code = None if status is None else STATUS_CODES[status]
+    return execute(
+        db,
+        "update_ticket_fields",
+        (
+            title,
+            description,
+            status_code,
+            None if priority is None else PRIORITY_CODES[priority],
+            rank,
+            status_code,
+            status_code,
+            status_code,
+            ticket_id,
+            user_id,
+        ),
+        Ticket,
+    ).fetchone()
+
+
+def get_last_rank(
+    db: sqlite3.Connection, workplace_id: int, status: str
+) -> Optional[str]:
+    """Return the rank of the last ticket in a board column."""
+    row = execute(
+        db, "last_column_rank", (workplace_id, STATUS_CODES[status])
+    ).fetchone()
+    return row[0] if row else None
+
+
+def get_adjacent_rank(
+    db: sqlite3.Connection,
+    workplace_id: int,
+    status: str,
+    rank: str,
+    exclude_id: int,
+    previous: bool = False,
+) -> Optional[str]:
+    """
+    Return the rank following (or preceding) ``rank`` in a column, ignoring
+    the ticket being moved.
+    """
+    name = "previous_column_rank" if previous else "next_column_rank"
+    row = execute(
+        db, name, (workplace_id, STATUS_CODES[status], rank, exclude_id)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def get_ticket_positions(
+    db: sqlite3.Connection, workplace_id: int, ticket_ids: Iterable[int]
+) -> dict[int, tuple[str, Optional[str]]]:
+    """Return ``{id: (status, rank)}`` for up to two tickets of a workspace."""
+    first, *rest = ticket_ids
+    second = rest[0] if rest else first
+    return {
+        ticket_id: (TICKET_STATUSES[status], rank)
+        for ticket_id, status, rank in execute(
+            db, "ticket_positions", (workplace_id, first, second)
+        )
+    }
+
+
+def list_column_tickets(
+    db: sqlite3.Connection,
+    workplace_id: int,
+    status: str,
+    limit: int,
+    after: tuple[str, int] = COLUMN_PAGE_START,
+    owner_id: Optional[int] = None,
+) -> tuple[list[Ticket], Optional[tuple[str, int]]]:
+    """
+    Return one page of a board column, in rank order.
+
+    Parameters:
+    ----------
+    db : sqlite3.Connection
+        Database connection
+    workplace_id : int
+        Workspace of the board
+    status : str
+        Column to read
+    limit : int
+        Maximum tickets returned
+    after : tuple[str, int]
+        ``(rank, id)`` of the last ticket of the previous page
+    owner_id : int, optional
+        Only return this user's tickets
+
+    Returns:
+    -------
+    tuple[list[Ticket], tuple[str, int] or None]
+        The page, and the key to pass as ``after`` for the next page (None
+        on the last page)
+    """
+    rank, ticket_id = after
+    keyset = (rank, rank, rank, ticket_id)
+    if owner_id is None:
+        tickets = execute(
+            db,
+            "column_tickets",
+            (workplace_id, STATUS_CODES[status], *keyset, limit + 1),
+            Ticket,
+        ).fetchall()
+    else:
+        tickets = execute(
+            db,
+            "owner_column_tickets",
+            (
+                workplace_id,
+                STATUS_CODES[status],
+                *keyset,
+                owner_id,
+                limit + 1,
+            ),
+            Ticket,
+        ).fetchall()
+
+    if len(tickets) > limit:
+        del tickets[limit:]
+        return tickets, (tickets[-1].rank, tickets[-1].id)
+    return tickets, None
+
+
+def list_column_ticket_ids(
+    db: sqlite3.Connection, workplace_id: int, status: str
+) -> list[int]:
+    """Return the IDs of a board column's tickets, in rank order."""
+    return [
+        row[0]
+        for row in execute(
+            db, "column_ticket_ids", (workplace_id, STATUS_CODES[status])
+        )
+    ]
+
+
+def set_ticket_ranks(
+    db: sqlite3.Connection, ranks: Iterable[tuple[str, int]]
+) -> int:
+    """Set the rank of many tickets from ``(rank, id)`` pairs."""
+    return execute_many(db, "set_ticket_rank", ranks).rowcount
+
+
+def backfill_closed_at(db: sqlite3.Connection) -> int:
+    """
+    Stamp Closed tickets without a ``closed_at`` as closed now.
+
+    Used once when the column is added: the real close time is unknown, and
+    counting from the migration never archives a ticket earlier than
+    intended.
+    """
+    return execute(db, "backfill_closed_at").rowcount
+
+
+def list_unranked_columns(db: sqlite3.Connection) -> list[tuple[int, str]]:
+    """Return the ``(workplace_id, status)`` columns with unranked tickets."""
+    return [
+        (workplace_id, TICKET_STATUSES[status])
+        for workplace_id, status in execute(db, "unranked_columns")
+    ]
+
+
+def insert_audit_events(db: sqlite3.Connection, events: Iterable[tuple]) -> int:
+    """
+    Insert a batch of audit events.
+
+    Parameters:
+    ----------
+    db : sqlite3.Connection
+        Connection to write to
+    events : Iterable[tuple]
+        (ts, action, user_id, workplace_id, ticket_id, ip_address, details)
+        tuples
+
+    Returns:
+    -------
+    int
+        Number of events inserted
+    """
+    return execute_many(db, "insert_audit_event", events).rowcount
+
+
+def get_ticket_history(
+    db: sqlite3.Connection, workplace_id: int, ticket_id: int
+) -> list[AuditEvent]:
+    """Return a ticket's audit events, oldest first."""
+    return execute(
+        db, "ticket_history", (workplace_id, ticket_id), AuditEvent
+    ).fetchall()
+
+
+def prune_audit_events(db: sqlite3.Connection, before: str) -> int:
+    """Delete audit events older than ``before`` and return how many."""
+    return execute(db, "prune_audit_events", (before,)).rowcount
+
+
+def bump_workspace_version(db: sqlite3.Connection, workplace_id: int) -> int:
+    """
+    Record a change to a workspace and return its new version.
+
+    Must run in the same transaction as the write it records, so other
+    processes never see the data change without the version changing.
+    """
+    return execute(db, "bump_workspace_version", (workplace_id,)).fetchone()[0]
+
+
+def changes_since(
+    db: sqlite3.Connection, seq: int
+) -> list[tuple[int, int, int]]:
+    """Return (workplace_id, version, seq) for workspaces changed after seq."""
+    return execute(db, "changes_since", (seq,)).fetchall()
+
+
+def last_change_seq(db: sqlite3.Connection) -> int:
+    """Return the sequence number of the most recent recorded change."""
+    return execute(db, "last_change_seq").fetchone()[0]
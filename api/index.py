@@ -1,14 +1,28 @@
 import re
 import os
+import base64
 import sqlite3
-import secrets
-import string
 import logging
 import json
 import time
-from datetime import timedelta, datetime
-from flask import Flask, g, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
+import queue
+import random
+import threading
+from functools import wraps
+from pathlib import Path
+from datetime import date, timedelta, datetime
+from flask import (
+    Blueprint,
+    Flask,
+    Response,
+    g,
+    current_app,
+    request,
+    jsonify,
+    after_this_request,
+    has_request_context,
+    stream_with_context,
+)
 from flask_jwt_extended import (
     JWTManager,
     create_access_token,
@@ -18,53 +32,602 @@ from flask_jwt_extended import (
     set_access_cookies,
     set_refresh_cookies,
     unset_jwt_cookies,
+    verify_jwt_in_request,
 )
-from dotenv import load_dotenv
 from flask_cors import CORS
-from typing import Any, Optional
+from typing import Any, Callable, Hashable, Optional
+import _ranking as ranking
+import _repository as repository
+from _admission import AdmissionController
+from _audit import AuditWriter
+from _profiling import RequestProfiler
+from _cache import CachedResponse, ResponseCache
+from _invalidation import InvalidationBus
+from _memory import GROUP_BY, MemoryTracer, rss_bytes
+from _join_codes import JoinCodeIndex
+from _rate_limit import create_limiter
+from _models import (
+    TICKET_COLUMNS,
+    TICKET_PRIORITIES,
+    TICKET_STATUSES,
+    Ticket,
+    Workplace,
+    date_to_epoch,
+    ticket_field_error,
+    to_wire,
+)
 
-load_dotenv()
+api = Blueprint("api", __name__)
 
-app = Flask(__name__)
+SCHEMA_VERSION = 9
 
-CORS(
-    app,
-    supports_credentials=True,
-    resources={
-        r"/api/*": {
-            "origins": ["http://localhost:3000"],
-            "methods": ["GET", "POST", "OPTIONS", "PUT"],
-            "allow_headers": ["Content-Type"],
-            "expose_headers": ["Set-Cookie"],
-        }
-    },
+_STATUS_CHECK = f"CHECK (status BETWEEN 0 AND {len(TICKET_STATUSES) - 1})"
+_PRIORITY_CHECK = (
+    f"CHECK (priority BETWEEN 0 AND {len(TICKET_PRIORITIES) - 1})"
 )
 
-app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY")
-app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=1)
-app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(days=30)
-app.config["JWT_COOKIE_SECURE"] = True
-app.config["JWT_COOKIE_CSRF_PROTECT"] = False
-app.config["JWT_COOKIE_SAMESITE"] = "Strict"
-app.config["DATABASE"] = os.getenv("DATABASE", "jyra.db")
-app.config["JWT_TOKEN_LOCATION"] = ["cookies"]
-app.config["JWT_ACCESS_COOKIE_PATH"] = "/api/"
-app.config["JWT_REFRESH_COOKIE_PATH"] = "/api/refresh"
-
-jwt = JWTManager(app)
+# Column definitions of the ticket tables. Status and priority are stored as
+# their index in ``TICKET_STATUSES``/``TICKET_PRIORITIES`` and timestamps as
+# Unix epoch seconds; ``_models`` translates both at the API boundary.
+TICKET_TABLES = {
+    "tickets": f"""(id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT NOT NULL,
+                    description TEXT NOT NULL,
+                    status INTEGER NOT NULL {_STATUS_CHECK},
+                    priority INTEGER NOT NULL {_PRIORITY_CHECK},
+                    created_at INTEGER NOT NULL DEFAULT (unixepoch()),
+                    owner_id INTEGER,
+                    workplace_id INTEGER,
+                    rank TEXT,
+                    closed_at INTEGER,
+                    FOREIGN KEY (owner_id) REFERENCES users (id),
+                    FOREIGN KEY (workplace_id) REFERENCES workplaces (id))
+                   STRICT""",
+    "tickets_archive": f"""(id INTEGER PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    description TEXT NOT NULL,
+                    status INTEGER NOT NULL {_STATUS_CHECK},
+                    priority INTEGER NOT NULL {_PRIORITY_CHECK},
+                    created_at INTEGER NOT NULL,
+                    owner_id INTEGER,
+                    workplace_id INTEGER,
+                    rank TEXT,
+                    closed_at INTEGER,
+                    archived_at INTEGER DEFAULT (unixepoch()))
+                   STRICT""",
+}
+
+REDACTED_FIELDS = frozenset({"password", "token", "answer"})
 
 log_filename = "api.log"
-logging.basicConfig(
-    filename=log_filename,
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
 logger = logging.getLogger("api_logger")
 
+_init_lock = threading.Lock()
+
+
+def create_app(test_config: Optional[dict] = None) -> Flask:
+    """
+    Create and configure the Flask application.
+    
+    Only in-memory setup happens here so that importing the module and
+    building the app stays cheap on a cold start. Work that touches the disk
+    (log file, database schema) is deferred to the first request by
+    ``initialise_app``.
+    
+    Parameters:
+    ----------
+    test_config : dict, optional
+        Configuration values overriding those read from the environment
+        
+    Returns:
+    -------
+    Flask
+        The configured application
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    app = Flask(__name__)
+
+    CORS(
+        app,
+        supports_credentials=True,
+        resources={
+            r"/api/*": {
+                "origins": ["http://localhost:3000"],
+                "methods": ["GET", "POST", "OPTIONS", "PUT"],
+                "allow_headers": ["Content-Type", "X-Profile"],
+                "expose_headers": [
+                    "Set-Cookie",
+                    "X-Next-Cursor",
+                    "X-Profile-Id",
+                ],
+            }
+        },
+    )
+
+    app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY")
+    app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=1)
+    app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(days=30)
+    app.config["JWT_COOKIE_SECURE"] = True
+    app.config["JWT_COOKIE_CSRF_PROTECT"] = False
+    app.config["JWT_COOKIE_SAMESITE"] = "Strict"
+    app.config["DATABASE"] = os.getenv("DATABASE", "jyra.db")
+    app.config["READ_POOL_SIZE"] = int(os.getenv("READ_POOL_SIZE", "8"))
+    app.config["EXPORT_CHUNK_SIZE"] = int(
+        os.getenv("EXPORT_CHUNK_SIZE", "1000")
+    )
+    app.config["JOIN_CODE_REFRESH_SECONDS"] = float(
+        os.getenv("JOIN_CODE_REFRESH_SECONDS", "5")
+    )
+    app.config["INVALIDATION_POLL_SECONDS"] = float(
+        os.getenv("INVALIDATION_POLL_SECONDS", "0")
+    )
+    app.config["REQUEST_LOG_SAMPLE_RATE"] = float(
+        os.getenv("REQUEST_LOG_SAMPLE_RATE", "1")
+    )
+    app.config["REQUEST_LOG_SLOW_SECONDS"] = float(
+        os.getenv("REQUEST_LOG_SLOW_SECONDS", "1")
+    )
+    app.config["AUDIT_FLUSH_SECONDS"] = float(
+        os.getenv("AUDIT_FLUSH_SECONDS", "1")
+    )
+    app.config["AUDIT_BATCH_SIZE"] = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+    app.config["AUDIT_MAX_BUFFER"] = int(
+        os.getenv("AUDIT_MAX_BUFFER", "10000")
+    )
+    app.config["AUDIT_RETENTION_DAYS"] = float(
+        os.getenv("AUDIT_RETENTION_DAYS", "90")
+    )
+    app.config["ARCHIVE_AFTER_DAYS"] = float(
+        os.getenv("ARCHIVE_AFTER_DAYS", "90")
+    )
+    app.config["ARCHIVE_BATCH_SIZE"] = int(
+        os.getenv("ARCHIVE_BATCH_SIZE", "500")
+    )
+    app.config["DASHBOARD_TICKET_LIMIT"] = int(
+        os.getenv("DASHBOARD_TICKET_LIMIT", "50")
+    )
+    app.config["MEMBER_PAGE_SIZE"] = int(
+        os.getenv("MEMBER_PAGE_SIZE", "50")
+    )
+    app.config["MEMBER_PAGE_MAX"] = int(os.getenv("MEMBER_PAGE_MAX", "200"))
+    app.config["RESPONSE_CACHE_ENTRIES"] = int(
+        os.getenv("RESPONSE_CACHE_ENTRIES", "4096")
+    )
+    app.config["RESPONSE_CACHE_BYTES"] = int(
+        os.getenv("RESPONSE_CACHE_BYTES", str(64 * 1024 * 1024))
+    )
+    app.config["BOARD_COLUMN_LIMIT"] = int(
+        os.getenv("BOARD_COLUMN_LIMIT", "100")
+    )
+    app.config["RANK_MAX_LENGTH"] = int(os.getenv("RANK_MAX_LENGTH", "32"))
+    app.config["BATCH_MAX_REQUESTS"] = int(
+        os.getenv("BATCH_MAX_REQUESTS", "10")
+    )
+    # Process-wide endpoints (metrics, profiling, memory diagnostics) are
+    # limited to these user IDs. A workspace admin is not an operator, and
+    # the list is empty by default.
+    app.config["OPERATOR_USER_IDS"] = frozenset(
+        int(user_id)
+        for user_id in os.getenv("OPERATOR_USER_IDS", "").split(",")
+        if user_id.strip()
+    )
+    app.config["ADMISSION_AUTH_LIMIT"] = int(
+        os.getenv("ADMISSION_AUTH_LIMIT", "4")
+    )
+    app.config["ADMISSION_AUTH_QUEUE"] = int(
+        os.getenv("ADMISSION_AUTH_QUEUE", "16")
+    )
+    app.config["ADMISSION_READ_LIMIT"] = int(
+        os.getenv("ADMISSION_READ_LIMIT", "16")
+    )
+    app.config["ADMISSION_READ_QUEUE"] = int(
+        os.getenv("ADMISSION_READ_QUEUE", "64")
+    )
+    app.config["ADMISSION_WRITE_LIMIT"] = int(
+        os.getenv("ADMISSION_WRITE_LIMIT", "4")
+    )
+    app.config["ADMISSION_WRITE_QUEUE"] = int(
+        os.getenv("ADMISSION_WRITE_QUEUE", "32")
+    )
+    app.config["ADMISSION_QUEUE_TIMEOUT"] = float(
+        os.getenv("ADMISSION_QUEUE_TIMEOUT", "2")
+    )
+    app.config["PROFILE_SAMPLE_RATE"] = float(
+        os.getenv("PROFILE_SAMPLE_RATE", "0")
+    )
+    app.config["PROFILE_DIRECTORY"] = os.getenv(
+        "PROFILE_DIRECTORY", "profiles"
+    )
+    app.config["PROFILE_MAX_FILES"] = int(
+        os.getenv("PROFILE_MAX_FILES", "50")
+    )
+    app.config["MEMORY_SNAPSHOTS"] = int(os.getenv("MEMORY_SNAPSHOTS", "4"))
+    app.config["AUTH_RATE_LIMIT_BACKEND"] = os.getenv(
+        "AUTH_RATE_LIMIT_BACKEND", "memory"
+    )
+    app.config["AUTH_RATE_LIMIT_DATABASE"] = os.getenv(
+        "AUTH_RATE_LIMIT_DATABASE", "ratelimit.db"
+    )
+    app.config["AUTH_RATE_LIMIT_BURST"] = float(
+        os.getenv("AUTH_RATE_LIMIT_BURST", "10")
+    )
+    app.config["AUTH_RATE_LIMIT_PER_MINUTE"] = float(
+        os.getenv("AUTH_RATE_LIMIT_PER_MINUTE", "10")
+    )
+    app.config["AUTH_RATE_LIMIT_MAX_KEYS"] = int(
+        os.getenv("AUTH_RATE_LIMIT_MAX_KEYS", "10000")
+    )
+    app.config["JWT_TOKEN_LOCATION"] = ["cookies"]
+    app.config["JWT_ACCESS_COOKIE_PATH"] = "/api/"
+    app.config["JWT_REFRESH_COOKIE_PATH"] = "/api/refresh"
+
+    if test_config:
+        app.config.update(test_config)
+
+    JWTManager(app)
+
+    app.extensions["read_pool"] = queue.LifoQueue()
+    app.extensions["join_codes"] = JoinCodeIndex(
+        app.config["JOIN_CODE_REFRESH_SECONDS"]
+    )
+    app.extensions["invalidation"] = InvalidationBus(
+        app.config["DATABASE"], app.config["INVALIDATION_POLL_SECONDS"]
+    )
+    app.extensions["invalidation"].subscribe(
+        app.extensions["join_codes"].expire
+    )
+    app.extensions["responses"] = ResponseCache(
+        app.config["RESPONSE_CACHE_ENTRIES"],
+        app.config["RESPONSE_CACHE_BYTES"],
+    )
+    app.extensions["invalidation"].subscribe(
+        app.extensions["responses"].expire
+    )
+    app.extensions["rank_rebalancer"] = ranking.RankRebalancer(
+        app.config["DATABASE"], app.config["RANK_MAX_LENGTH"]
+    )
+    app.extensions["audit"] = AuditWriter(
+        app.config["DATABASE"],
+        flush_interval=app.config["AUDIT_FLUSH_SECONDS"],
+        batch_size=app.config["AUDIT_BATCH_SIZE"],
+        max_buffer=app.config["AUDIT_MAX_BUFFER"],
+        retention_days=app.config["AUDIT_RETENTION_DAYS"],
+    )
+    app.extensions["auth_limiter"] = create_limiter(
+        app.config["AUTH_RATE_LIMIT_BACKEND"],
+        app.config["AUTH_RATE_LIMIT_BURST"],
+        app.config["AUTH_RATE_LIMIT_PER_MINUTE"],
+        max_keys=app.config["AUTH_RATE_LIMIT_MAX_KEYS"],
+        path=app.config["AUTH_RATE_LIMIT_DATABASE"],
+    )
+
+    app.extensions["admission"] = AdmissionController(
+        {
+            route_class: (
+                app.config[f"ADMISSION_{route_class.upper()}_LIMIT"],
+                app.config[f"ADMISSION_{route_class.upper()}_QUEUE"],
+            )
+            for route_class in ("auth", "read", "write")
+        },
+        app.config["ADMISSION_QUEUE_TIMEOUT"],
+    )
+
+    app.extensions["profiler"] = RequestProfiler(
+        app.config["PROFILE_DIRECTORY"],
+        app.config["PROFILE_MAX_FILES"],
+        app.config["PROFILE_SAMPLE_RATE"],
+    )
+
+    app.extensions["memory"] = MemoryTracer(app.config["MEMORY_SNAPSHOTS"])
+
+    app.before_request(initialise_app)
+    app.before_request(before_request)
+    app.before_request(admit_request)
+    app.before_request(start_profile)
+    app.before_request(poll_invalidations)
+    app.after_request(after_request)
+    app.teardown_request(release_admission)
+    app.teardown_request(finish_profile)
+    app.teardown_appcontext(close_connection)
+    app.register_blueprint(api)
+
+    return app
+
+
+def initialise_app():
+    """
+    Run one-time, disk-touching setup before the first request is handled.
+    
+    Configures the log file and brings the database schema up to date.
+    Runs at most once per application, even with concurrent first requests.
+    """
+    if current_app.extensions.get("initialised"):
+        return
+
+    with _init_lock:
+        if current_app.extensions.get("initialised"):
+            return
+
+        logging.basicConfig(
+            filename=log_filename,
+            level=logging.INFO,
+            format="%(asctime)s - %(levelname)s - %(message)s",
+        )
+        init_db()
+        current_app.extensions["initialised"] = True
+
+
+# Route classes that differ from the request method's (None: not limited).
+# Diagnostics stay reachable under overload.
+ROUTE_CLASS_OVERRIDES = {
+    "api.batch": "read",
+    "api.get_metrics": None,
+    "api.get_memory_status": None,
+    "api.set_memory_tracing": None,
+    "api.take_memory_snapshot": None,
+    "api.diff_memory_snapshots": None,
+}
+
+
+def route_class_of(endpoint: Optional[str], method: str) -> Optional[str]:
+    """
+    Return the admission route class of a request.
+    
+    Password-hashing endpoints (those wrapped in ``rate_limited``) are
+    "auth", GET and HEAD requests "read" and everything else "write".
+    CORS preflights and unrouted requests are not limited.
+    
+    Parameters:
+    ----------
+    endpoint : str, optional
+        The matched endpoint, or None if no route matched
+    method : str
+        The HTTP method
+        
+    Returns:
+    -------
+    str or None
+        The route class, or None if the request is not limited
+    """
+    if endpoint is None or method == "OPTIONS":
+        return None
+    if endpoint in ROUTE_CLASS_OVERRIDES:
+        return ROUTE_CLASS_OVERRIDES[endpoint]
+    view = current_app.view_functions.get(endpoint)
+    if getattr(view, "route_class", None):
+        return view.route_class
+    return "read" if method in ("GET", "HEAD") else "write"
+
+
+def admit_request():
+    """
+    Admit the request into its route class, or shed it with a 503.
+    
+    A request over its class's concurrency limit waits in the class's
+    queue for up to ``ADMISSION_QUEUE_TIMEOUT`` seconds. When the queue is
+    full or the wait times out it is rejected at once, with a
+    ``Retry-After`` header, before touching the database.
+    """
+    route_class = route_class_of(request.endpoint, request.method)
+    if route_class is None:
+        return None
+
+    admission = current_app.extensions["admission"]
+    if admission.acquire(route_class):
+        g.admission_class = route_class
+        return None
+
+    response, status_code = ApiResponse.error(
+        "Server is busy, please try again shortly", 503
+    )
+    response.headers["Retry-After"] = str(admission.retry_after())
+    return response, status_code
+
+
+def release_admission(exception=None):
+    """
+    Free the request's admission slot once the request has finished.
+    
+    Parameters:
+    ----------
+    exception : Exception, optional
+        The exception that ended the request, if any
+    """
+    route_class = g.pop("admission_class", None)
+    if route_class is not None:
+        current_app.extensions["admission"].release(route_class)
+
+
+def profile_requested_by_operator() -> bool:
+    """
+    Check whether an operator asked for this request to be profiled.
+    
+    Only called when the ``X-Profile`` header is present, so other requests
+    never pay for the JWT check. Profiles are written to the shared
+    ``PROFILE_DIRECTORY`` ring, so workspace admins may not request them
+    (see ``is_operator``).
+    """
+    try:
+        verify_jwt_in_request(optional=True)
+        user_id = get_jwt_identity()
+    except Exception:
+        return False
+    return user_id is not None and is_operator(user_id)
+
+
+def start_profile():
+    """
+    Profile the request if it is sampled or an operator asked for it.
+    
+    Requests are sampled with probability ``PROFILE_SAMPLE_RATE``; an
+    operator can also profile one request by sending ``X-Profile: 1``. The profile
+    is stored when the request is torn down (see ``finish_profile``) and
+    its file name is returned in the ``X-Profile-Id`` response header.
+    """
+    profiler = current_app.extensions["profiler"]
+    if request.headers.get("X-Profile") == "1":
+        if not profile_requested_by_operator():
+            return
+    elif not profiler.sampled():
+        return
+
+    started = profiler.start(f"{request.method} {request.endpoint}")
+    if started is None:
+        return
+    g.profile = started
+
+    @after_this_request
+    def tag_response(response):
+        response.headers["X-Profile-Id"] = started[1]
+        return response
+
+
+def finish_profile(exception=None):
+    """
+    Stop the request's profile, if any, and write it to the profile ring.
+    
+    Parameters:
+    ----------
+    exception : Exception, optional
+        The exception that ended the request, if any
+    """
+    started = g.pop("profile", None)
+    if started is not None:
+        current_app.extensions["profiler"].finish(*started)
+
+
+def poll_invalidations():
+    """
+    Evict cache entries for workspaces changed by other worker processes.
+    
+    Costs one ``PRAGMA data_version`` per request unless another connection
+    has committed since the last check.
+    """
+    current_app.extensions["invalidation"].poll()
+
+
+def commit_workspace_change(
+    db: sqlite3.Connection, workplace_id: Optional[int]
+):
+    """
+    Commit a write and invalidate cached data for the workspace it touched.
+    
+    The workspace's version in ``change_log`` is bumped in the same
+    transaction, so other processes see the change on their next poll, and
+    this process's caches are evicted straight after the commit.
+    
+    Parameters:
+    ----------
+    db : sqlite3.Connection
+        Writable connection with the pending write
+    workplace_id : int, optional
+        Workspace affected by the write; None commits without invalidating
+    """
+    if not workplace_id:
+        db.commit()
+        return
+
+    version = repository.bump_workspace_version(db, workplace_id)
+    db.commit()
+    current_app.extensions["invalidation"].invalidate(workplace_id, version)
+
+
+def cached_response(
+    workplace_id: int,
+    scope: Hashable,
+    build: Callable[[], tuple[Any, int]],
+) -> tuple[Any, int]:
+    """
+    Serve a GET response from the response cache, building it on a miss.
+    
+    Entries hold the serialized body and are keyed on the route and query
+    string, the workspace, the caller's scope and the workspace's version,
+    so a hit costs a dictionary lookup. Every write to the workspace bumps
+    its version and expires its entries. Only 200 responses are cached.
+    
+    Parameters:
+    ----------
+    workplace_id : int
+        Workspace the response is read from
+    scope : Hashable
+        What the caller may see, e.g. "admin" or the owner's user ID (None
+        when the response is the same for every member)
+    build : Callable[[], tuple]
+        Builds the response on a miss, as returned by ``ApiResponse``
+        
+    Returns:
+    -------
+    tuple
+        JSON response and status code
+    """
+    cache = current_app.extensions["responses"]
+    bus = current_app.extensions["invalidation"]
+    version = bus.version(workplace_id)
+    key = (request.path, request.query_string, scope, version)
+
+    cached = cache.get(workplace_id, key)
+    if cached is None:
+        response, status_code = build()
+        if status_code != 200:
+            return response, status_code
+        cached = CachedResponse(
+            response.get_data(),
+            tuple(
+                (name, value)
+                for name, value in response.headers
+                if name not in ("Content-Type", "Content-Length")
+            ),
+        )
+        # Skip caching if the workspace changed while the body was built.
+        if bus.version(workplace_id) == version:
+            cache.put(workplace_id, key, cached)
+        return response, status_code
+
+    return (
+        current_app.response_class(
+            cached.body, headers=cached.headers, mimetype="application/json"
+        ),
+        200,
+    )
+
 
-def log_action(action: str, details: dict = None):
+def generate_password_hash(password: str) -> str:
     """
-    Log user actions to the application logger.
+    Hash a password or security answer.
+    
+    Thin wrapper around ``werkzeug.security`` so that module is only imported
+    by requests that actually hash something.
+    """
+    from werkzeug.security import generate_password_hash as hash_password
+
+    return hash_password(password)
+
+
+def check_password_hash(password_hash: str, password: str) -> bool:
+    """
+    Check a password or security answer against its hash.
+    
+    Thin wrapper around ``werkzeug.security``, imported on first use.
+    """
+    from werkzeug.security import check_password_hash as check_password
+
+    return check_password(password_hash, password)
+
+
+def log_action(
+    action: str,
+    details: dict = None,
+    workplace_id: Optional[int] = None,
+    ticket_id: Optional[int] = None,
+):
+    """
+    Log user actions to the application logger and the audit log.
+    
+    The audit event is only buffered here; it is written to
+    ``audit_events`` in a batch by the background ``AuditWriter``.
     
     Parameters:
     ----------
@@ -72,6 +635,10 @@ def log_action(action: str, details: dict = None):
         The action being performed
     details : dict, optional
         Additional details about the action
+    workplace_id : int, optional
+        Workspace the action happened in
+    ticket_id : int, optional
+        Ticket the action applies to, for ``/api/tickets/<id>/history``
     """
     try:
         user_id = get_jwt_identity()
@@ -87,8 +654,17 @@ def log_action(action: str, details: dict = None):
         log_data["details"] = details
     logger.info(json.dumps(log_data))
 
+    current_app.extensions["audit"].record(
+        log_data["timestamp"],
+        action,
+        user_id,
+        workplace_id,
+        ticket_id,
+        log_data["ip_address"],
+        json.dumps(details) if details else None,
+    )
+
 
-@app.before_request
 def before_request():
     """
     Execute before each request to measure performance.
@@ -99,11 +675,16 @@ def before_request():
     g.start_time = time.time()
 
 
-@app.after_request
 def after_request(response):
     """
     Execute after each request to log request details.
     
+    Error responses (status 400 and above) and requests slower than
+    ``REQUEST_LOG_SLOW_SECONDS`` are always logged. Other requests are
+    logged with probability ``REQUEST_LOG_SAMPLE_RATE``, and those lines
+    carry the rate so that offline reports can re-weight them. Requests that
+    are not logged cost only the sampling decision.
+    
     Parameters:
     ----------
     response : flask.Response
@@ -115,13 +696,28 @@ def after_request(response):
         The unmodified response object
     """
     duration = time.time() - g.start_time
-
+    sample_rate = current_app.config["REQUEST_LOG_SAMPLE_RATE"]
+
+    sampled = False
+    if (
+        response.status_code < 400
+        and duration < current_app.config["REQUEST_LOG_SLOW_SECONDS"]
+    ):
+        if sample_rate <= 0 or random.random() >= sample_rate:
+            return response
+        sampled = sample_rate < 1
+
+    # Views that read the body have already parsed it, so this is served
+    # from the request's JSON cache. The cached dict is copied rather than
+    # redacted in place.
     request_data = request.get_json(silent=True)
-    if request_data and isinstance(request_data, dict):
-        if "password" in request_data:
-            request_data["password"] = "********"
-        if "token" in request_data:
-            request_data["token"] = "********"
+    if isinstance(request_data, dict) and not REDACTED_FIELDS.isdisjoint(
+        request_data
+    ):
+        request_data = {
+            k: "********" if k in REDACTED_FIELDS else v
+            for k, v in request_data.items()
+        }
 
     log_data = {
         "timestamp": datetime.now().isoformat(),
@@ -132,6 +728,8 @@ def after_request(response):
         "duration": f"{duration:.4f}s",
         "request_data": request_data,
     }
+    if sampled:
+        log_data["sample_rate"] = sample_rate
 
     logger.info(json.dumps(log_data))
 
@@ -174,7 +772,9 @@ class ApiResponse:
         return jsonify(response), status_code
 
     @staticmethod
-    def error(message: str, status_code: int = 400) -> tuple[Any, int]:
+    def error(
+        message: str, status_code: int = 400, body: Optional[Any] = None
+    ) -> tuple[Any, int]:
         """
         Create a standardised error response.
         
@@ -184,39 +784,146 @@ class ApiResponse:
             Error message to return
         status_code : int
             HTTP status code (defaults to 400)
+        body : Optional[Any]
+            Optional data to include alongside the error
             
         Returns:
         -------
         tuple
             JSON response and status code
         """
-        return jsonify({"error": message}), status_code
+        response = {"error": message}
+        if body is not None:
+            response["body"] = body
+
+        return jsonify(response), status_code
+
+
+def connect_read_db():
+    """
+    Open a new read-only database connection.
+    
+    The database file is opened with ``mode=ro`` and the connection has
+    ``query_only`` enabled, so any write attempted through it fails. In WAL
+    mode these connections read concurrently with the writer.
+    
+    Returns:
+    -------
+    sqlite3.Connection
+        Read-only database connection
+    """
+    path = os.path.abspath(current_app.config["DATABASE"])
+    db = sqlite3.connect(
+        f"{Path(path).as_uri()}?mode=ro",
+        uri=True,
+        check_same_thread=False,
+        cached_statements=repository.STATEMENT_CACHE_SIZE,
+    )
+    db.execute("PRAGMA query_only = ON")
+    return db
+
+
+def rate_limited(view):
+    """
+    Limit how often a password-hashing endpoint can be called.
+    
+    Each request takes a token from the caller's IP bucket and, when the JSON
+    body has an email, from that email's bucket. Requests over either limit
+    are rejected with 429 before the view runs, so no hashing happens.
+    Wrapped views are admitted in the "auth" route class.
+    
+    Parameters:
+    ----------
+    view : Callable
+        The view function to protect
+        
+    Returns:
+    -------
+    Callable
+        The wrapped view function
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        data = request.get_json(silent=True)
+        email = data.get("email") if isinstance(data, dict) else None
+
+        keys = [("ip", request.remote_addr or "unknown")]
+        if isinstance(email, str) and email.strip():
+            keys.append(("email", email.strip().lower()))
+
+        limiter = current_app.extensions["auth_limiter"]
+        for namespace, value in keys:
+            allowed, retry_after = limiter.hit(namespace, value)
+            if not allowed:
+                log_action("rate_limited", {"key": namespace})
+                response, status_code = ApiResponse.error(
+                    "Too many attempts, please try again later", 429
+                )
+                response.headers["Retry-After"] = str(
+                    max(1, round(retry_after))
+                )
+                return response, status_code
+
+        return view(*args, **kwargs)
+
+    wrapper.route_class = "auth"
+    return wrapper
+
+
+def get_read_db():
+    """
+    Get a read-only database connection for the current context.
+    
+    Connections are borrowed from a process-wide pool and returned to it
+    when the application context ends.
+    
+    Returns:
+    -------
+    sqlite3.Connection
+        Read-only database connection
+    """
+    db = getattr(g, "_read_database", None)
+    if db is None:
+        try:
+            db = current_app.extensions["read_pool"].get_nowait()
+        except queue.Empty:
+            db = connect_read_db()
+        g._read_database = db
+    return db
 
 
 def get_db():
     """
     Get a database connection from the Flask context or create a new one.
     
-    Uses SQLite connection pooling via Flask's g object to efficiently
-    reuse database connections.
+    GET requests are served from the read-only pool (see ``get_read_db``).
+    All other requests use a writable connection cached on Flask's g object.
     
     Returns:
     -------
     sqlite3.Connection
-        Database connection object configured with Row factory
+        Database connection object
     """
+    if has_request_context() and request.method in ("GET", "HEAD"):
+        return get_read_db()
+
     db = getattr(g, "_database", None)
     if db is None:
-        db = g._database = sqlite3.connect(app.config["DATABASE"])
-        db.row_factory = sqlite3.Row
+        db = g._database = sqlite3.connect(
+            current_app.config["DATABASE"],
+            cached_statements=repository.STATEMENT_CACHE_SIZE,
+        )
+        ranking.register_functions(db)
     return db
 
 
-@app.teardown_appcontext
 def close_connection(exception=None):
     """
     Close the database connection when the application context ends.
     
+    Read-only connections are returned to the pool instead of being closed,
+    unless the pool is already full.
+    
     Parameters:
     ----------
     exception : Exception, optional
@@ -226,6 +933,15 @@ def close_connection(exception=None):
     if db is not None:
         db.close()
 
+    read_db = g.pop("_read_database", None)
+    if read_db is not None:
+        read_db.rollback()
+        read_pool = current_app.extensions["read_pool"]
+        if read_pool.qsize() < current_app.config["READ_POOL_SIZE"]:
+            read_pool.put(read_db)
+        else:
+            read_db.close()
+
 
 def generate_join_code(length=8):
     """
@@ -243,83 +959,293 @@ def generate_join_code(length=8):
     str
         A randomly generated alphanumeric join code
     """
+    import secrets
+    import string
+
     alphabet = string.ascii_uppercase + string.digits
     return "".join(secrets.choice(alphabet) for _ in range(length))
 
 
-def init_db():
+def create_workplace_with_code(
+    db: sqlite3.Connection, name: str, description: str, attempts: int = 5
+) -> Workplace:
     """
-    Initialise the database and creates necessary tables if they don't exist.
+    Insert a workspace with a freshly generated, unused join code.
     
-    Creates tables for:
-    - workplaces
-    - users
-    - security questions
-    - tickets
+    Candidate codes are checked against the in-memory join code index
+    first; the UNIQUE constraint on join_code catches any collision the
+    index could not see (e.g. a code just created by another process).
+    The caller adds the code to the index once the workspace is committed.
+    
+    Parameters:
+    ----------
+    db : sqlite3.Connection
+        Writable database connection
+    name : str
+        Workspace name
+    description : str
+        Workspace description
+    attempts : int, optional
+        Number of inserts to try before giving up (defaults to 5)
+        
+    Returns:
+    -------
+    Workplace
+        The new (uncommitted) workspace
     """
-    db = get_db()
-    db.execute(
-        """CREATE TABLE IF NOT EXISTS workplaces
-                  (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                   name TEXT NOT NULL,
-                   description TEXT,
-                   join_code TEXT UNIQUE,
-                   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"""
-    )
+    join_codes = current_app.extensions["join_codes"]
+    for _ in range(attempts):
+        join_code = generate_join_code()
+        while join_codes.is_taken(db, join_code):
+            join_code = generate_join_code()
 
-    db.execute(
-        """CREATE TABLE IF NOT EXISTS users
-                  (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                   name TEXT NOT NULL,
-                   email TEXT UNIQUE NOT NULL,
-                   password TEXT NOT NULL,
-                   is_admin INTEGER DEFAULT 0,
-                   workplace_id INTEGER,
-                   mfa_enabled INTEGER DEFAULT 0,
-                   FOREIGN KEY (workplace_id) REFERENCES workplaces (id))"""
-    )
+        try:
+            return repository.insert_workplace(
+                db, name, description, join_code
+            )
+        except sqlite3.IntegrityError:
+            continue
+
+    raise RuntimeError("Could not generate a unique join code")
 
-    db.execute(
-        """CREATE TABLE IF NOT EXISTS security_questions
-                  (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                   user_id INTEGER NOT NULL,
-                   question TEXT NOT NULL,
-                   answer TEXT NOT NULL,
-                   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                   FOREIGN KEY (user_id) REFERENCES users (id))"""
-    )
 
-    db.execute(
-        """CREATE TABLE IF NOT EXISTS tickets
-                  (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                   title TEXT NOT NULL,
-                   description TEXT NOT NULL,
-                   status TEXT NOT NULL,
-                   priority TEXT NOT NULL,
-                   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                   owner_id INTEGER,
-                   workplace_id INTEGER,
-                   FOREIGN KEY (owner_id) REFERENCES users (id),
-                   FOREIGN KEY (workplace_id) REFERENCES workplaces (id))"""
+def _code_case(column: str, values: tuple, default: str) -> str:
+    whens = " ".join(
+        f"WHEN '{value}' THEN {i}" for i, value in enumerate(values)
     )
-    db.commit()
+    return f"CASE {column} {whens} ELSE {values.index(default)} END"
 
 
-@app.route("/api/signup", methods=["POST"])
-def signup():
+def migrate_to_strict(db: sqlite3.Connection, table: str):
     """
-    Register a new user in the system.
+    Rebuild a ticket table created before the STRICT schema.
     
-    Expects a JSON payload with:
-    - email: User's email address
-    - password: User's password
-    - name: User's display name (optional, defaults to email username)
+    The rows are copied into a STRICT table with the current definition from
+    ``TICKET_TABLES``, converting status and priority names to their codes and
+    ``YYYY-MM-DD HH:MM:SS`` timestamps to epoch seconds, which then replaces
+    the old table in one transaction. The old table's indexes are dropped with
+    it; ``init_db`` recreates them afterwards. Ticket IDs and the
+    AUTOINCREMENT sequence are kept, so archived IDs are never reused.
     
-    Returns:
-    -------
-    JSON response with user data and authentication cookies
-    Status code 201 on success, 400/500 on failure
-    """
+    Ticket creation did not always validate status and priority, so values
+    outside ``TICKET_STATUSES``/``TICKET_PRIORITIES`` are migrated as the
+    creation defaults ("Open" and "Medium") and the affected ticket IDs are
+    logged, rather than failing the migration on every request.
+    
+    Parameters:
+    ----------
+    db : sqlite3.Connection
+        Connection used by ``init_db``
+    table : str
+        "tickets" or "tickets_archive"
+    """
+    archived_at = (
+        ", COALESCE(unixepoch(archived_at), unixepoch())"
+        if table == "tickets_archive"
+        else ""
+    )
+    columns = TICKET_COLUMNS + ", closed_at" + (
+        ", archived_at" if archived_at else ""
+    )
+    db.commit()
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        sequence = db.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)
+        ).fetchone()
+        unknown = [
+            row[0]
+            for row in db.execute(
+                f"""SELECT id FROM {table}
+                    WHERE status NOT IN {TICKET_STATUSES}
+                       OR priority NOT IN {TICKET_PRIORITIES}"""
+            )
+        ]
+        if unknown:
+            logger.warning(
+                json.dumps(
+                    {
+                        "timestamp": datetime.now().isoformat(),
+                        "action": "ticket_values_defaulted",
+                        "details": {"table": table, "ticket_ids": unknown},
+                    }
+                )
+            )
+        db.execute(f"CREATE TABLE {table}_strict {TICKET_TABLES[table]}")
+        db.execute(
+            f"""INSERT INTO {table}_strict ({columns})
+                SELECT id, title, description,
+                       {_code_case("status", TICKET_STATUSES, "Open")},
+                       {_code_case("priority", TICKET_PRIORITIES, "Medium")},
+                       COALESCE(unixepoch(created_at), unixepoch()),
+                       owner_id, workplace_id, rank,
+                       closed_at{archived_at}
+                FROM {table}"""
+        )
+        db.execute(f"DROP TABLE {table}")
+        db.execute(f"ALTER TABLE {table}_strict RENAME TO {table}")
+        if sequence:
+            db.execute(
+                "UPDATE sqlite_sequence SET seq = max(seq, ?) WHERE name = ?",
+                (sequence[0], table),
+            )
+            db.execute(
+                """INSERT INTO sqlite_sequence (name, seq)
+                   SELECT ?, ? WHERE changes() = 0""",
+                (table, sequence[0]),
+            )
+        db.commit()
+    except sqlite3.Error:
+        db.rollback()
+        raise
+
+
+def init_db():
+    """
+    Initialise the database and creates necessary tables if they don't exist.
+    
+    Creates tables for:
+    - workplaces
+    - users
+    - security questions
+    - tickets
+    - change_log (per-workspace versions used for cache invalidation)
+    - audit_events (persistent copy of ``log_action`` events)
+    - tickets_archive (Closed tickets moved out of ``tickets``)
+    
+    along with the indexes in ``repository.INDEXES``, gives tickets created
+    before board ordering existed a rank, rebuilds ticket tables created
+    before the STRICT schema (see ``migrate_to_strict``), and counts Closed
+    tickets from before ``closed_at`` existed as closed at the upgrade.
+    
+    The schema version is stored in ``PRAGMA user_version``; when it already
+    matches ``SCHEMA_VERSION`` no DDL is executed at all.
+    """
+    db = sqlite3.connect(current_app.config["DATABASE"])
+    try:
+        (version,) = db.execute("PRAGMA user_version").fetchone()
+        if version == SCHEMA_VERSION:
+            return
+
+        db.execute("PRAGMA journal_mode = WAL")
+        db.execute(
+            """CREATE TABLE IF NOT EXISTS workplaces
+                      (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                       name TEXT NOT NULL,
+                       description TEXT,
+                       join_code TEXT UNIQUE,
+                       created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"""
+        )
+
+        db.execute(
+            """CREATE TABLE IF NOT EXISTS users
+                      (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                       name TEXT NOT NULL,
+                       email TEXT UNIQUE NOT NULL,
+                       password TEXT NOT NULL,
+                       is_admin INTEGER DEFAULT 0,
+                       workplace_id INTEGER,
+                       mfa_enabled INTEGER DEFAULT 0,
+                       FOREIGN KEY (workplace_id) REFERENCES workplaces (id))"""
+        )
+
+        db.execute(
+            """CREATE TABLE IF NOT EXISTS security_questions
+                      (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                       user_id INTEGER NOT NULL,
+                       question TEXT NOT NULL,
+                       answer TEXT NOT NULL,
+                       created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                       FOREIGN KEY (user_id) REFERENCES users (id))"""
+        )
+
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS tickets " + TICKET_TABLES["tickets"]
+        )
+
+        db.execute(
+            """CREATE TABLE IF NOT EXISTS change_log
+                      (workplace_id INTEGER PRIMARY KEY,
+                       version INTEGER NOT NULL,
+                       seq INTEGER NOT NULL,
+                       FOREIGN KEY (workplace_id) REFERENCES workplaces (id))"""
+        )
+        db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_change_log_seq ON change_log (seq)"
+        )
+
+        db.execute(
+            """CREATE TABLE IF NOT EXISTS audit_events
+                      (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                       ts TEXT NOT NULL,
+                       action TEXT NOT NULL,
+                       user_id INTEGER,
+                       workplace_id INTEGER,
+                       ticket_id INTEGER,
+                       ip_address TEXT,
+                       details TEXT)"""
+        )
+        db.execute(
+            """CREATE INDEX IF NOT EXISTS idx_audit_events_ticket
+               ON audit_events (workplace_id, ticket_id, ts)"""
+        )
+        db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_audit_events_ts ON audit_events (ts)"
+        )
+
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS tickets_archive "
+            + TICKET_TABLES["tickets_archive"]
+        )
+
+        # Databases created before board ordering lack the rank column, and
+        # those created before close times were kept lack closed_at.
+        for table in TICKET_TABLES:
+            columns = {
+                row[1] for row in db.execute(f"PRAGMA table_info({table})")
+            }
+            if "rank" not in columns:
+                db.execute(f"ALTER TABLE {table} ADD COLUMN rank TEXT")
+            if "closed_at" not in columns:
+                db.execute(f"ALTER TABLE {table} ADD COLUMN closed_at INTEGER")
+        for table in TICKET_TABLES:
+            (strict,) = db.execute(
+                "SELECT strict FROM pragma_table_list WHERE name = ?",
+                (table,),
+            ).fetchone()
+            if not strict:
+                migrate_to_strict(db, table)
+        repository.backfill_closed_at(db)
+
+        for name, definition in repository.INDEXES.items():
+            db.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+        for name in repository.RETIRED_INDEXES:
+            db.execute(f"DROP INDEX IF EXISTS {name}")
+        db.commit()
+        for workplace_id, status in repository.list_unranked_columns(db):
+            ranking.rebalance_column(db, workplace_id, status)
+        db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        db.commit()
+    finally:
+        db.close()
+
+
+@api.route("/api/signup", methods=["POST"])
+@rate_limited
+def signup():
+    """
+    Register a new user in the system.
+    
+    Expects a JSON payload with:
+    - email: User's email address
+    - password: User's password
+    - name: User's display name (optional, defaults to email username)
+    
+    Returns:
+    -------
+    JSON response with user data and authentication cookies
+    Status code 201 on success, 400/500 on failure
+    """
     if not request.is_json:
         return ApiResponse.error("Request must be JSON format")
     
@@ -342,23 +1268,14 @@ def signup():
             name = ""
 
     db = get_db()
-    cursor = db.cursor()
 
-    cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
-    if cursor.fetchone():
+    if repository.get_user_by_email(db, email):
         return ApiResponse.error("Email already registered")
 
     try:
         hashed_password = generate_password_hash(password)
 
-        cursor.execute(
-            """
-            INSERT INTO users (name, email, password, is_admin, workplace_id, mfa_enabled)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """,
-            (name, email, hashed_password, 0, None, 0),
-        )
-        user_id = cursor.lastrowid
+        user_id = repository.insert_user(db, name, email, hashed_password)
 
         db.commit()
 
@@ -391,7 +1308,7 @@ def signup():
         return ApiResponse.error(f"Failed to create user: {str(e)}", 500)
 
 
-@app.route("/api/user/mfa/complete-auth", methods=["POST"])
+@api.route("/api/user/mfa/complete-auth", methods=["POST"])
 def complete_mfa_auth():
     """
     Complete the MFA process.
@@ -414,25 +1331,15 @@ def complete_mfa_auth():
         return ApiResponse.error("Email is required")
 
     db = get_db()
-    cursor = db.cursor()
-
-    cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
-    user = cursor.fetchone()
+    user = repository.get_user_by_email(db, email)
 
     if not user:
         return ApiResponse.error("User not found", 404)
 
-    access_token = create_access_token(identity=str(user["id"]))
-    refresh_token = create_refresh_token(identity=str(user["id"]))
+    access_token = create_access_token(identity=str(user.id))
+    refresh_token = create_refresh_token(identity=str(user.id))
 
-    user_data = {
-        "id": user["id"],
-        "name": user["name"],
-        "email": user["email"],
-        "is_admin": bool(user["is_admin"]),
-        "workplace_id": user["workplace_id"],
-        "mfa_enabled": bool(user["mfa_enabled"]),
-    }
+    user_data = to_wire(user)
 
     response = ApiResponse.success(
         message="Login successful", body={"user": user_data}
@@ -442,13 +1349,14 @@ def complete_mfa_auth():
     set_refresh_cookies(response, refresh_token)
 
     log_action(
-        "user_signin_mfa_complete", {"user_id": user["id"], "email": email}
+        "user_signin_mfa_complete", {"user_id": user.id, "email": email}
     )
 
     return response, 200
 
 
-@app.route("/api/user/check-credentials", methods=["POST"])
+@api.route("/api/user/check-credentials", methods=["POST"])
+@rate_limited
 def check_credentials():
     """
     Validate user credentials without creating a session.
@@ -472,21 +1380,18 @@ def check_credentials():
         return ApiResponse.error("Email and password are required")
 
     db = get_db()
-    cursor = db.cursor()
-
-    cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
-    user = cursor.fetchone()
+    user = repository.get_user_by_email(db, email)
 
     if not user:
         return ApiResponse.error("Invalid email or password", 401)
 
-    if check_password_hash(user["password"], password):
+    if check_password_hash(user.password_hash, password):
         return ApiResponse.success("Credentials valid")
 
     return ApiResponse.error("Invalid email or password", 401)
 
 
-@app.route("/api/user/mfa/check", methods=["POST"])
+@api.route("/api/user/mfa/check", methods=["POST"])
 def check_mfa():
     """
     Check if MFA is enabled for a user and retrieve their security question.
@@ -506,35 +1411,27 @@ def check_mfa():
         return ApiResponse.error("Email is required")
 
     db = get_db()
-    cursor = db.cursor()
-
-    cursor.execute(
-        "SELECT id, mfa_enabled FROM users WHERE email = ?", (email,)
-    )
-    user = cursor.fetchone()
+    user = repository.get_user_by_email(db, email)
 
     if not user:
         return ApiResponse.error("User not found", 404)
 
-    if user["mfa_enabled"]:
-        cursor.execute(
-            "SELECT question FROM security_questions WHERE user_id = ?",
-            (user["id"],),
-        )
-        security_question = cursor.fetchone()
+    if user.mfa_enabled:
+        security_question = repository.get_security_question(db, user.id)
 
         if not security_question:
             return ApiResponse.error("Security question not found", 404)
 
         return ApiResponse.success(
             "MFA status retrieved",
-            {"mfaEnabled": True, "question": security_question["question"]},
+            {"mfaEnabled": True, "question": security_question[0]},
         )
 
     return ApiResponse.success("MFA status retrieved", {"mfaEnabled": False})
 
 
-@app.route("/api/signin", methods=["POST"])
+@api.route("/api/signin", methods=["POST"])
+@rate_limited
 def signin():
     """
     Authenticate a user and create a session.
@@ -560,29 +1457,19 @@ def signin():
         return ApiResponse.error("Email and password are required")
 
     db = get_db()
-    cursor = db.cursor()
-
-    cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
-    user = cursor.fetchone()
+    user = repository.get_user_by_email(db, email)
 
     if not user:
         return ApiResponse.error("Invalid email or password", 401)
 
-    if check_password_hash(user["password"], password):
-        if user["mfa_enabled"] and not mfa_verified:
+    if check_password_hash(user.password_hash, password):
+        if user.mfa_enabled and not mfa_verified:
             return ApiResponse.error("MFA verification required", 403)
 
-        access_token = create_access_token(identity=str(user["id"]))
-        refresh_token = create_refresh_token(identity=str(user["id"]))
+        access_token = create_access_token(identity=str(user.id))
+        refresh_token = create_refresh_token(identity=str(user.id))
 
-        user_data = {
-            "id": user["id"],
-            "name": user["name"],
-            "email": user["email"],
-            "is_admin": bool(user["is_admin"]),
-            "workplace_id": user["workplace_id"],
-            "mfa_enabled": bool(user["mfa_enabled"]),
-        }
+        user_data = to_wire(user)
 
         response = ApiResponse.success(
             message="Login successful", body={"user": user_data}
@@ -591,14 +1478,15 @@ def signin():
         set_access_cookies(response, access_token)
         set_refresh_cookies(response, refresh_token)
 
-        log_action("user_signin", {"user_id": user["id"], "email": email})
+        log_action("user_signin", {"user_id": user.id, "email": email})
 
         return response, 200
 
     return ApiResponse.error("Invalid email or password", 401)
 
 
-@app.route("/api/user/mfa/verify", methods=["POST"])
+@api.route("/api/user/mfa/verify", methods=["POST"])
+@rate_limited
 def verify_mfa():
     """
     Verify a user's MFA security question answer.
@@ -620,28 +1508,21 @@ def verify_mfa():
         return ApiResponse.error("Email and answer are required")
 
     db = get_db()
-    cursor = db.cursor()
-
-    cursor.execute("SELECT id FROM users WHERE email = ?", (email,))
-    user = cursor.fetchone()
+    user = repository.get_user_by_email(db, email)
 
     if not user:
         return ApiResponse.error("User not found", 404)
 
-    cursor.execute(
-        "SELECT answer FROM security_questions WHERE user_id = ?",
-        (user["id"],),
-    )
-    security_question = cursor.fetchone()
+    security_question = repository.get_security_question(db, user.id)
 
     if not security_question:
         return ApiResponse.error("Security question not found", 404)
 
-    if check_password_hash(security_question["answer"], answer):
+    if check_password_hash(security_question[1], answer):
         access_token = create_access_token(
-            identity=str(user["id"]), additional_claims={"mfa_verified": True}
+            identity=str(user.id), additional_claims={"mfa_verified": True}
         )
-        refresh_token = create_refresh_token(identity=str(user["id"]))
+        refresh_token = create_refresh_token(identity=str(user.id))
 
         response = ApiResponse.success("MFA verification successful")[0]
         set_access_cookies(response, access_token)
@@ -651,7 +1532,7 @@ def verify_mfa():
     return ApiResponse.error("Invalid answer", 401)
 
 
-@app.route("/api/signout", methods=["POST"])
+@api.route("/api/signout", methods=["POST"])
 def signout():
     """
     End the user's session by clearing authentication cookies.
@@ -666,7 +1547,7 @@ def signout():
     return response, 200
 
 
-@app.route("/api/user/mfa/status", methods=["GET"])
+@api.route("/api/user/mfa/status", methods=["GET"])
 @jwt_required()
 def get_mfa_status():
     """
@@ -681,18 +1562,13 @@ def get_mfa_status():
         current_user_id = get_jwt_identity()
 
         db = get_db()
-        cursor = db.cursor()
-
-        cursor.execute(
-            "SELECT mfa_enabled FROM users WHERE id = ?", (current_user_id,)
-        )
-        user = cursor.fetchone()
+        user = repository.get_principal(db, current_user_id)
 
         if not user:
             return ApiResponse.error("User not found", 404)
 
         return ApiResponse.success(
-            "MFA status retrieved", {"enabled": bool(user["mfa_enabled"])}
+            "MFA status retrieved", {"enabled": user.mfa_enabled}
         )
 
     except Exception as e:
@@ -701,7 +1577,7 @@ def get_mfa_status():
         )
 
 
-@app.route("/api/user/mfa/setup", methods=["POST"])
+@api.route("/api/user/mfa/setup", methods=["POST"])
 @jwt_required()
 def setup_mfa():
     """
@@ -729,53 +1605,19 @@ def setup_mfa():
         if not question or not answer:
             return ApiResponse.error("Question and answer are required")
 
-        db = get_db()
-        cursor = db.cursor()
+        hashed_answer = generate_password_hash(answer)
 
-        cursor.execute(
-            "SELECT mfa_enabled FROM users WHERE id = ?", (current_user_id,)
-        )
-        user = cursor.fetchone()
+        db = get_db()
+        user = repository.set_mfa_enabled(db, current_user_id, True)
 
         if not user:
+            db.rollback()
             return ApiResponse.error("User not found", 404)
 
-        hashed_answer = generate_password_hash(answer)
-
-        cursor.execute(
-            "SELECT id FROM security_questions WHERE user_id = ?",
-            (current_user_id,),
-        )
-        existing_question = cursor.fetchone()
-
-        if existing_question:
-            cursor.execute(
-                """
-                UPDATE security_questions
-                SET question = ?, answer = ?
-                WHERE user_id = ?
-            """,
-                (question, hashed_answer, current_user_id),
-            )
-        else:
-            cursor.execute(
-                """
-                INSERT INTO security_questions (user_id, question, answer)
-                VALUES (?, ?, ?)
-            """,
-                (current_user_id, question, hashed_answer),
-            )
-
-        cursor.execute(
-            """
-            UPDATE users
-            SET mfa_enabled = 1
-            WHERE id = ?
-        """,
-            (current_user_id,),
+        repository.save_security_question(
+            db, current_user_id, question, hashed_answer
         )
-
-        db.commit()
+        commit_workspace_change(db, user.workplace_id)
 
         log_action("mfa_setup", {"user_id": current_user_id})
 
@@ -785,7 +1627,7 @@ def setup_mfa():
         return ApiResponse.error(f"Failed to setup MFA: {str(e)}", 500)
 
 
-@app.route("/api/user/mfa/disable", methods=["POST"])
+@api.route("/api/user/mfa/disable", methods=["POST"])
 @jwt_required()
 def disable_mfa():
     """
@@ -800,18 +1642,13 @@ def disable_mfa():
         current_user_id = get_jwt_identity()
 
         db = get_db()
-        cursor = db.cursor()
-
-        cursor.execute(
-            """
-            UPDATE users
-            SET mfa_enabled = 0
-            WHERE id = ?
-        """,
-            (current_user_id,),
-        )
+        user = repository.set_mfa_enabled(db, current_user_id, False)
 
-        db.commit()
+        if not user:
+            db.rollback()
+            return ApiResponse.error("User not found", 404)
+
+        commit_workspace_change(db, user.workplace_id)
 
         log_action("mfa_disabled", {"user_id": current_user_id})
 
@@ -821,7 +1658,7 @@ def disable_mfa():
         return ApiResponse.error(f"Failed to disable MFA: {str(e)}", 500)
 
 
-@app.route("/api/user", methods=["PUT"])
+@api.route("/api/user", methods=["PUT"])
 @jwt_required()
 def update_user():
     """
@@ -854,44 +1691,21 @@ def update_user():
             return ApiResponse.error("No valid fields to update")
 
         db = get_db()
-        cursor = db.cursor()
 
-        if "email" in update_fields:
-            cursor.execute(
-                "SELECT id FROM users WHERE email = ? AND id != ?",
-                (update_fields["email"], current_user_id),
+        try:
+            user = repository.update_user_fields(
+                db, current_user_id, **update_fields
             )
-            if cursor.fetchone():
-                return ApiResponse.error("Email already exists", 400)
+        except sqlite3.IntegrityError:
+            db.rollback()
+            return ApiResponse.error("Email already exists", 400)
 
-        query_parts = [f"{field} = ?" for field in update_fields.keys()]
-        query = f"UPDATE users SET {', '.join(query_parts)} WHERE id = ?"
-        params = list(update_fields.values()) + [current_user_id]
-
-        cursor.execute(query, params)
-
-        if cursor.rowcount == 0:
+        if user is None:
             return ApiResponse.error("User not found or no changes made", 404)
 
-        db.commit()
-
-        cursor.execute(
-            """
-            SELECT id, name, email, is_admin, workplace_id, mfa_enabled
-            FROM users WHERE id = ?
-        """,
-            (current_user_id,),
-        )
-        user = cursor.fetchone()
+        commit_workspace_change(db, user.workplace_id)
 
-        user_data = {
-            "id": user["id"],
-            "name": user["name"],
-            "email": user["email"],
-            "is_admin": bool(user["is_admin"]),
-            "workplace_id": user["workplace_id"],
-            "mfa_enabled": bool(user["mfa_enabled"]),
-        }
+        user_data = to_wire(user)
 
         return ApiResponse.success("User updated successfully", user_data)
 
@@ -899,7 +1713,7 @@ def update_user():
         return ApiResponse.error(f"Failed to update user: {str(e)}", 500)
 
 
-@app.route("/api/refresh", methods=["POST"])
+@api.route("/api/refresh", methods=["POST"])
 @jwt_required(refresh=True)
 def refresh():
     """
@@ -922,7 +1736,7 @@ def refresh():
         return ApiResponse.error("Token refresh failed", 401)
 
 
-@app.route("/api/status", methods=["GET"])
+@api.route("/api/status", methods=["GET"])
 @jwt_required()
 def get_user():
     """
@@ -937,25 +1751,12 @@ def get_user():
         current_user_id = get_jwt_identity()
 
         db = get_db()
-        cursor = db.cursor()
-
-        cursor.execute(
-            """
-            SELECT id, name, email, is_admin, workplace_id 
-            FROM users WHERE id = ?
-        """,
-            (current_user_id,),
-        )
-        user = cursor.fetchone()
+        user = repository.get_principal(db, current_user_id)
 
         if user:
-            user_data = {
-                "id": user["id"],
-                "name": user["name"],
-                "email": user["email"],
-                "is_admin": bool(user["is_admin"]),
-                "workplace_id": user["workplace_id"],
-            }
+            user_data = to_wire(
+                user, ("id", "name", "email", "is_admin", "workplace_id")
+            )
             return ApiResponse.success(
                 "User retrieved successfully", user_data
             )
@@ -965,7 +1766,7 @@ def get_user():
         return ApiResponse.error(f"Failed to retrieve user: {str(e)}", 500)
 
 
-@app.route("/api/workspace", methods=["GET"])
+@api.route("/api/workspace", methods=["GET"])
 @jwt_required()
 def get_workspace_join_code():
     """
@@ -980,40 +1781,31 @@ def get_workspace_join_code():
         current_user_id = get_jwt_identity()
 
         db = get_db()
-        cursor = db.cursor()
-
-        cursor.execute(
-            "SELECT workplace_id, is_admin FROM users WHERE id = ?",
-            (current_user_id,),
-        )
-        user = cursor.fetchone()
+        user = repository.get_principal(db, current_user_id)
 
         if not user:
             return ApiResponse.error("User not found", 404)
 
-        workplace_id = user["workplace_id"]
+        workplace_id = user.workplace_id
 
         if not workplace_id:
             return ApiResponse.error(
                 "User does not belong to a workspace", 400
             )
 
-        if not user["is_admin"]:
+        if not user.is_admin:
             return ApiResponse.error(
                 "Only admins can access the join code", 403
             )
 
-        cursor.execute(
-            "SELECT join_code FROM workplaces WHERE id = ?", (workplace_id,)
-        )
-        workspace = cursor.fetchone()
+        workspace = repository.get_workplace(db, workplace_id)
 
         if not workspace:
             return ApiResponse.error("Workspace not found", 404)
 
         return ApiResponse.success(
             "Join code retrieved successfully",
-            {"join_code": workspace["join_code"]},
+            {"join_code": workspace.join_code},
         )
 
     except Exception as e:
@@ -1022,7 +1814,7 @@ def get_workspace_join_code():
         )
 
 
-@app.route("/api/workspace/create", methods=["POST"])
+@api.route("/api/workspace/create", methods=["POST"])
 @jwt_required()
 def create_workspace():
     """
@@ -1048,62 +1840,27 @@ def create_workspace():
             return ApiResponse.error("Workspace name is required")
 
         db = get_db()
-        cursor = db.cursor()
-
-        cursor.execute(
-            "SELECT workplace_id FROM users WHERE id = ?", (current_user_id,)
-        )
-        user = cursor.fetchone()
+        workspace = create_workplace_with_code(db, name, description)
 
-        if user and user["workplace_id"]:
+        if not repository.set_user_workspace(
+            db, current_user_id, workspace.id, True
+        ):
+            db.rollback()
             return ApiResponse.error(
                 "User already belongs to a workspace", 400
             )
 
-        join_code = generate_join_code()
-        while True:
-            cursor.execute(
-                "SELECT id FROM workplaces WHERE join_code = ?", (join_code,)
-            )
-            if not cursor.fetchone():
-                break
-            join_code = generate_join_code()
-
-        cursor.execute(
-            """
-            INSERT INTO workplaces (name, description, join_code)
-            VALUES (?, ?, ?)
-        """,
-            (name, description, join_code),
-        )
-        workspace_id = cursor.lastrowid
-
-        cursor.execute(
-            """
-            UPDATE users
-            SET workplace_id = ?, is_admin = 1
-            WHERE id = ?
-        """,
-            (workspace_id, current_user_id),
+        commit_workspace_change(db, workspace.id)
+        current_app.extensions["join_codes"].add(
+            workspace.join_code, workspace.id
         )
 
-        db.commit()
-
-        cursor.execute(
-            "SELECT * FROM workplaces WHERE id = ?", (workspace_id,)
-        )
-        workspace = cursor.fetchone()
-
-        workspace_data = {
-            "id": workspace["id"],
-            "name": workspace["name"],
-            "description": workspace["description"],
-            "join_code": workspace["join_code"],
-            "created_at": workspace["created_at"],
-        }
+        workspace_data = to_wire(workspace)
 
         log_action(
-            "workspace_created", {"workspace_id": workspace_id, "name": name}
+            "workspace_created",
+            {"workspace_id": workspace.id, "name": name},
+            workplace_id=workspace.id,
         )
 
         return ApiResponse.success(
@@ -1114,7 +1871,7 @@ def create_workspace():
         return ApiResponse.error(f"Failed to create workspace: {str(e)}", 500)
 
 
-@app.route("/api/workspace/join", methods=["POST"])
+@api.route("/api/workspace/join", methods=["POST"])
 @jwt_required()
 def join_workspace():
     """
@@ -1138,48 +1895,29 @@ def join_workspace():
             return ApiResponse.error("Join code is required")
 
         db = get_db()
-        cursor = db.cursor()
-
-        cursor.execute(
-            "SELECT workplace_id FROM users WHERE id = ?", (current_user_id,)
-        )
-        user = cursor.fetchone()
+        workspace = None
+        join_codes = current_app.extensions["join_codes"]
+        if isinstance(join_code, str) and join_codes.might_exist(
+            db, join_code
+        ):
+            workspace = repository.find_workplace(db, join_code)
+
+        if workspace is None:
+            return ApiResponse.error("Invalid join code", 404)
 
-        if user and user["workplace_id"]:
+        if not repository.set_user_workspace(
+            db, current_user_id, workspace.id, False
+        ):
+            db.rollback()
             return ApiResponse.error(
                 "User already belongs to a workspace", 400
             )
 
-        cursor.execute(
-            "SELECT id FROM workplaces WHERE join_code = ?", (join_code,)
-        )
-        workspace = cursor.fetchone()
-
-        if not workspace:
-            return ApiResponse.error("Invalid join code", 404)
-
-        cursor.execute(
-            """
-            UPDATE users
-            SET workplace_id = ?, is_admin = 0
-            WHERE id = ?
-        """,
-            (workspace["id"], current_user_id),
-        )
-
-        db.commit()
+        commit_workspace_change(db, workspace.id)
 
-        cursor.execute(
-            "SELECT * FROM workplaces WHERE id = ?", (workspace["id"],)
+        workspace_data = to_wire(
+            workspace, ("id", "name", "description", "created_at")
         )
-        workspace = cursor.fetchone()
-
-        workspace_data = {
-            "id": workspace["id"],
-            "name": workspace["name"],
-            "description": workspace["description"],
-            "created_at": workspace["created_at"],
-        }
 
         return ApiResponse.success(
             "Joined workspace successfully", workspace_data
@@ -1189,60 +1927,111 @@ def join_workspace():
         return ApiResponse.error(f"Failed to join workspace: {str(e)}", 500)
 
 
-@app.route("/api/workspace/users", methods=["GET"])
+def encode_cursor(key: tuple[str, int]) -> str:
+    """Encode a ``(text, id)`` keyset position as an opaque, URL-safe cursor."""
+    raw = json.dumps(key, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[tuple[str, int]]:
+    """Decode a cursor from ``encode_cursor``, or None if invalid."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        name, user_id = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(name, str) or not isinstance(user_id, int):
+        return None
+    return name, user_id
+
+
+@api.route("/api/workspace/users", methods=["GET"])
 @jwt_required()
 def get_workspace_users():
     """
-    Get all users in the authenticated user's workspace.
+    Get the users in the authenticated user's workspace.
+    
+    Without query parameters every member is returned in one list. Passing
+    any of the parameters below returns one page of the member directory,
+    ordered by name; when more members follow, the ``X-Next-Cursor``
+    response header holds the cursor of the next page. Responses are the
+    same for every member, and are cached until the workspace changes.
+    
+    Query parameters:
+    - limit: Members per page (optional)
+    - cursor: Cursor of the page to fetch, from ``X-Next-Cursor`` (optional)
+    - q: Only members whose name or email starts with this, ignoring case
+      (optional)
     
     Returns:
     -------
     JSON response with array of user data including ID, name, email and admin status
-    Status code 200 on success, 400 if no workspace, 500 on error
+    Status code 200 on success, 400 if no workspace or for an invalid
+    parameter, 500 on error
     """
     try:
         current_user_id = get_jwt_identity()
 
         db = get_db()
-        cursor = db.cursor()
+        user = repository.get_principal(db, current_user_id)
 
-        cursor.execute(
-            "SELECT workplace_id FROM users WHERE id = ?", (current_user_id,)
-        )
-        user = cursor.fetchone()
-
-        if not user or not user["workplace_id"]:
+        if not user or not user.workplace_id:
             return ApiResponse.error(
                 "User does not belong to a workspace", 400
             )
 
-        cursor.execute(
-            """
-            SELECT id, name, email, is_admin
-            FROM users
-            WHERE workplace_id = ?
-        """,
-            (user["workplace_id"],),
-        )
+        fields = ("id", "name", "email", "is_admin")
+        args = request.args
+        if not any(name in args for name in ("limit", "cursor", "q")):
+            return cached_response(
+                user.workplace_id,
+                None,
+                lambda: ApiResponse.success(
+                    "Users retrieved successfully",
+                    to_wire(
+                        repository.list_workspace_members(
+                            db, user.workplace_id
+                        ),
+                        fields,
+                    ),
+                ),
+            )
 
-        users = cursor.fetchall()
-        users_data = [
-            {
-                "id": u["id"],
-                "name": u["name"],
-                "email": u["email"],
-                "is_admin": bool(u["is_admin"]),
-            }
-            for u in users
-        ]
+        max_limit = current_app.config["MEMBER_PAGE_MAX"]
+        try:
+            limit = int(
+                args.get("limit", current_app.config["MEMBER_PAGE_SIZE"])
+            )
+        except ValueError:
+            return ApiResponse.error("limit must be an integer")
+        if not 1 <= limit <= max_limit:
+            return ApiResponse.error(f"limit must be between 1 and {max_limit}")
+
+        after = repository.MEMBER_PAGE_START
+        if args.get("cursor"):
+            after = decode_cursor(args["cursor"])
+            if after is None:
+                return ApiResponse.error("Invalid cursor")
+        prefix = args.get("q", "").strip() or None
+
+        def build():
+            users, next_key = repository.list_workspace_members_page(
+                db, user.workplace_id, limit, after, prefix
+            )
+            response, status_code = ApiResponse.success(
+                "Users retrieved successfully", to_wire(users, fields)
+            )
+            if next_key:
+                response.headers["X-Next-Cursor"] = encode_cursor(next_key)
+            return response, status_code
 
-        return ApiResponse.success("Users retrieved successfully", users_data)
+        return cached_response(user.workplace_id, None, build)
 
     except Exception as e:
         return ApiResponse.error(f"Failed to retrieve users: {str(e)}", 500)
 
 
-@app.route("/api/workspace/promote", methods=["POST"])
+@api.route("/api/workspace/promote", methods=["POST"])
 @jwt_required()
 def promote_user():
     """
@@ -1266,45 +2055,29 @@ def promote_user():
             return ApiResponse.error("User ID is required")
 
         db = get_db()
-        cursor = db.cursor()
-
-        cursor.execute(
-            "SELECT workplace_id, is_admin FROM users WHERE id = ?",
-            (current_user_id,),
-        )
-        current_user = cursor.fetchone()
+        target_user = repository.set_user_admin(db, user_id, current_user_id)
 
-        if not current_user or not current_user["workplace_id"]:
-            return ApiResponse.error(
-                "User does not belong to a workspace", 400
-            )
+        if not target_user:
+            # Nothing changed; look up why only on this failure path.
+            db.rollback()
+            current_user = repository.get_principal(db, current_user_id)
 
-        if not current_user["is_admin"]:
-            return ApiResponse.error("Only admins can promote users", 403)
+            if not current_user or not current_user.workplace_id:
+                return ApiResponse.error(
+                    "User does not belong to a workspace", 400
+                )
 
-        cursor.execute(
-            "SELECT workplace_id FROM users WHERE id = ?", (user_id,)
-        )
-        target_user = cursor.fetchone()
+            if not current_user.is_admin:
+                return ApiResponse.error("Only admins can promote users", 403)
 
-        if not target_user:
-            return ApiResponse.error("Target user not found", 404)
+            if not repository.get_principal(db, user_id):
+                return ApiResponse.error("Target user not found", 404)
 
-        if target_user["workplace_id"] != current_user["workplace_id"]:
             return ApiResponse.error(
                 "Target user is not in the same workspace", 400
             )
 
-        cursor.execute(
-            """
-            UPDATE users
-            SET is_admin = 1
-            WHERE id = ?
-        """,
-            (user_id,),
-        )
-
-        db.commit()
+        commit_workspace_change(db, target_user.workplace_id)
 
         return ApiResponse.success("User promoted to admin successfully")
 
@@ -1312,225 +2085,698 @@ def promote_user():
         return ApiResponse.error(f"Failed to promote user: {str(e)}", 500)
 
 
-@app.route("/api/tickets", methods=["GET"])
+@api.route("/api/tickets", methods=["GET"])
 @jwt_required()
 def get_tickets():
     """
     Get tickets for the authenticated user's workspace.
     
     If user is an admin, returns all workspace tickets.
-    Otherwise, returns only the user's own tickets.
+    Otherwise, returns only the user's own tickets. Responses are cached
+    until the workspace changes (see ``cached_response``).
+    
+    Query parameters (all optional):
+    - status: Only tickets with this status
+    - priority: Only tickets with this priority
+    - owner_id: Only tickets owned by this user (admins only)
+    - created_from: Only tickets created on or after this date (YYYY-MM-DD)
+    - created_to: Only tickets created on or before this date (YYYY-MM-DD)
+    - sort: "created_at" (default), "status" or "priority"
+    - order: "desc" (default) or "asc"
+    - include_archived: "true" to include archived (Closed) tickets
     
     Returns:
     -------
     JSON response with array of ticket data
-    Status code 200 on success, 400 if no workspace, 500 on error
+    Status code 200 on success, 400 if no workspace or invalid parameters, 500 on error
     """
     try:
         current_user_id = get_jwt_identity()
 
-        db = get_db()
-        cursor = db.cursor()
+        query, query_error = ticket_query_params(request.args)
+        if query_error:
+            return ApiResponse.error(query_error)
 
-        cursor.execute(
-            "SELECT workplace_id FROM users WHERE id = ?", (current_user_id,)
-        )
-        user = cursor.fetchone()
+        db = get_db()
+        user = repository.get_principal(db, current_user_id)
 
-        if not user or not user["workplace_id"]:
+        if not user or not user.workplace_id:
             return ApiResponse.error(
                 "User does not belong to a workspace", 400
             )
 
-        cursor.execute(
-            "SELECT is_admin FROM users WHERE id = ?", (current_user_id,)
-        )
-        user_role = cursor.fetchone()
-
-        if user_role["is_admin"]:
-            cursor.execute(
-                """
-            SELECT id, title, description, status, priority, created_at, owner_id
-            FROM tickets
-            WHERE workplace_id = ?
-            ORDER BY created_at DESC
-            """,
-                (user["workplace_id"],),
-            )
-        else:
-            cursor.execute(
-                """
-            SELECT id, title, description, status, priority, created_at, owner_id
-            FROM tickets
-            WHERE workplace_id = ? AND owner_id = ?
-            ORDER BY created_at DESC
-            """,
-                (user["workplace_id"], current_user_id),
-            )
+        if not user.is_admin:
+            query["owner_id"] = user.id
 
-        tickets = cursor.fetchall()
-        tickets_data = [
-            {
-                "id": t["id"],
-                "title": t["title"],
-                "description": t["description"],
-                "status": t["status"],
-                "priority": t["priority"],
-                "created_at": t["created_at"],
-                "owner_id": t["owner_id"],
-            }
-            for t in tickets
-        ]
+        def build():
+            tickets = repository.list_tickets(db, user.workplace_id, **query)
+            return ApiResponse.success(
+                "Tickets retrieved successfully", to_wire(tickets)
+            )
 
-        return ApiResponse.success(
-            "Tickets retrieved successfully", tickets_data
+        return cached_response(
+            user.workplace_id, "admin" if user.is_admin else user.id, build
         )
 
     except Exception as e:
         return ApiResponse.error(f"Failed to retrieve tickets: {str(e)}", 500)
 
 
-@app.route("/api/tickets/create", methods=["POST"])
+def ticket_query_params(args) -> tuple[dict, Optional[str]]:
+    """
+    Validate the filter and sort parameters of a ticket listing.
+    
+    Parameters:
+    ----------
+    args : werkzeug.datastructures.MultiDict
+        The request's query parameters
+        
+    Returns:
+    -------
+    tuple[dict, str or None]
+        Keyword arguments for ``repository.list_tickets``, and an error
+        message if a parameter is invalid
+    """
+    query = {}
+
+    for field in ("status", "priority"):
+        value = args.get(field)
+        if value is not None:
+            query[field] = value
+    field_error = ticket_field_error(query)
+    if field_error:
+        return query, field_error
+
+    if args.get("owner_id") is not None:
+        try:
+            query["owner_id"] = int(args["owner_id"])
+        except ValueError:
+            return query, "owner_id must be an integer"
+
+    try:
+        if args.get("created_from"):
+            query["created_from"] = date_to_epoch(
+                date.fromisoformat(args["created_from"])
+            )
+        if args.get("created_to"):
+            query["created_before"] = date_to_epoch(
+                date.fromisoformat(args["created_to"]) + timedelta(days=1)
+            )
+    except ValueError:
+        return query, "Dates must be in YYYY-MM-DD format"
+
+    sort = args.get("sort", "created_at")
+    if sort not in repository.TICKET_SORT_KEYS:
+        return query, "sort must be one of: " + ", ".join(
+            repository.TICKET_SORT_KEYS
+        )
+    query["sort"] = sort
+
+    order = args.get("order", "desc").lower()
+    if order not in ("asc", "desc"):
+        return query, "order must be 'asc' or 'desc'"
+    query["descending"] = order == "desc"
+
+    include_archived = args.get("include_archived", "false").lower()
+    if include_archived not in ("true", "false"):
+        return query, "include_archived must be 'true' or 'false'"
+    query["include_archived"] = include_archived == "true"
+
+    return query, None
+
+
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+@api.route("/api/tickets/board", methods=["GET"])
 @jwt_required()
-def create_ticket():
+def get_board_column():
     """
-    Create a new ticket in the user's workspace.
+    Get one page of a board column, in manual (rank) order.
     
-    Expects JSON payload with:
-    - title: Ticket title
-    - description: Ticket description
-    - status: Ticket status (optional, defaults to "Open")
-    - priority: Ticket priority (optional, defaults to "Medium")
+    Tickets are scoped as in ``/api/tickets`` (admins see the whole
+    workspace, other users their own tickets). When more tickets follow, the
+    ``X-Next-Cursor`` response header holds the cursor of the next page.
+    Pages are cached until the workspace changes.
+    
+    Query parameters:
+    - status: The column to read ("Open", "In Progress", "Closed")
+    - limit: Tickets per page (optional)
+    - cursor: Cursor of the page to fetch, from ``X-Next-Cursor`` (optional)
     
     Returns:
     -------
-    JSON response with created ticket data
-    Status code 201 on success, 400 if invalid data or no workspace, 500 on error
+    JSON response with array of ticket data
+    Status code 200 on success, 400 if no workspace or invalid parameters,
+    500 on error
     """
     try:
         current_user_id = get_jwt_identity()
-        data = request.json
+        args = request.args
 
-        title = data.get("title")
-        description = data.get("description")
-        status = data.get("status", "Open")
-        priority = data.get("priority", "Medium")
+        status = args.get("status")
+        if status is None:
+            return ApiResponse.error("status is required")
+        field_error = ticket_field_error({"status": status})
+        if field_error:
+            return ApiResponse.error(field_error)
 
-        if not title or not description:
-            return ApiResponse.error("Title and description are required")
+        max_limit = current_app.config["BOARD_COLUMN_LIMIT"]
+        try:
+            limit = int(args.get("limit", max_limit))
+        except ValueError:
+            return ApiResponse.error("limit must be an integer")
+        if not 1 <= limit <= max_limit:
+            return ApiResponse.error(f"limit must be between 1 and {max_limit}")
+
+        after = repository.COLUMN_PAGE_START
+        if args.get("cursor"):
+            after = decode_cursor(args["cursor"])
+            if after is None:
+                return ApiResponse.error("Invalid cursor")
 
         db = get_db()
-        cursor = db.cursor()
-
-        cursor.execute(
-            "SELECT workplace_id FROM users WHERE id = ?", (current_user_id,)
-        )
-        user = cursor.fetchone()
+        user = repository.get_principal(db, current_user_id)
 
-        if not user or not user["workplace_id"]:
+        if not user or not user.workplace_id:
             return ApiResponse.error(
                 "User does not belong to a workspace", 400
             )
 
-        cursor.execute(
-            """
-            INSERT INTO tickets (title, description, status, priority, owner_id, workplace_id)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """,
-            (
-                title,
-                description,
+        def build():
+            tickets, next_key = repository.list_column_tickets(
+                db,
+                user.workplace_id,
                 status,
-                priority,
-                current_user_id,
-                user["workplace_id"],
-            ),
-        )
-
-        ticket_id = cursor.lastrowid
-        db.commit()
-
-        cursor.execute("SELECT * FROM tickets WHERE id = ?", (ticket_id,))
-        ticket = cursor.fetchone()
-
-        ticket_data = {
-            "id": ticket["id"],
-            "title": ticket["title"],
-            "description": ticket["description"],
-            "status": ticket["status"],
-            "priority": ticket["priority"],
-            "created_at": ticket["created_at"],
-            "owner_id": ticket["owner_id"],
-        }
+                limit,
+                after,
+                owner_id=None if user.is_admin else user.id,
+            )
+            response, status_code = ApiResponse.success(
+                "Tickets retrieved successfully", to_wire(tickets)
+            )
+            if next_key:
+                response.headers["X-Next-Cursor"] = encode_cursor(next_key)
+            return response, status_code
 
-        return ApiResponse.success(
-            "Ticket created successfully", ticket_data, 201
+        return cached_response(
+            user.workplace_id, "admin" if user.is_admin else user.id, build
         )
 
     except Exception as e:
-        return ApiResponse.error(f"Failed to create ticket: {str(e)}", 500)
+        return ApiResponse.error(f"Failed to retrieve tickets: {str(e)}", 500)
 
 
-@app.route("/api/tickets/<int:ticket_id>", methods=["PUT"])
+@api.route("/api/tickets/export", methods=["GET"])
 @jwt_required()
-def update_ticket(ticket_id):
+def export_tickets():
     """
-    Update an existing ticket.
-    
-    Admins can update any ticket in their workspace.
-    Regular users can only update their own tickets.
+    Export tickets for the authenticated user's workspace as a file download.
     
-    Parameters:
-    ----------
-    ticket_id : int
-        The ID of the ticket to update
+    Uses the same scoping as ``get_tickets``: admins export every workspace
+    ticket, other users only their own. Rows are streamed from the cursor in
+    chunks, so memory use stays constant regardless of the number of tickets.
     
-    Expects JSON payload with any of:
-    - title: Ticket title
-    - description: Ticket description
-    - status: Ticket status ("Open", "In Progress", "Closed")
-    - priority: Ticket priority ("Low", "Medium", "High")
+    Query parameters:
+    - format: "csv" (default) or "ndjson"
     
     Returns:
     -------
-    JSON response with updated ticket data
-    Status code 200 on success, 403 if insufficient permissions, 404 if ticket not found
+    Streamed CSV or NDJSON response
+    Status code 200 on success, 400 if no workspace or invalid format, 500 on error
     """
     try:
         current_user_id = get_jwt_identity()
-        data = request.json
+        export_format = request.args.get("format", "csv").lower()
 
-        if not data:
-            return ApiResponse.error("No data provided")
+        if export_format not in EXPORT_FORMATS:
+            return ApiResponse.error("Format must be 'csv' or 'ndjson'")
 
         db = get_db()
-        cursor = db.cursor()
+        user = repository.get_principal(db, current_user_id)
 
-        cursor.execute("SELECT * FROM tickets WHERE id = ?", (ticket_id,))
-        ticket = cursor.fetchone()
+        if not user or not user.workplace_id:
+            return ApiResponse.error(
+                "User does not belong to a workspace", 400
+            )
 
-        if not ticket:
-            return ApiResponse.error("Ticket not found", 404)
+        owner_id = None if user.is_admin else user.id
+        chunks = repository.iter_tickets(
+            db,
+            user.workplace_id,
+            owner_id,
+            current_app.config["EXPORT_CHUNK_SIZE"],
+        )
+
+        if export_format == "csv":
+            body = _csv_export(chunks)
+        else:
+            body = _ndjson_export(chunks)
 
-        cursor.execute(
-            "SELECT workplace_id, is_admin FROM users WHERE id = ?",
-            (current_user_id,),
+        log_action(
+            "tickets_exported",
+            {"workspace_id": user.workplace_id, "format": export_format},
+            workplace_id=user.workplace_id,
         )
-        user = cursor.fetchone()
 
-        if not user:
-            return ApiResponse.error("User not found", 404)
+        filename = f"tickets-{user.workplace_id}.{export_format}"
+        return Response(
+            stream_with_context(body),
+            mimetype=EXPORT_FORMATS[export_format],
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"'
+            },
+        )
+
+    except Exception as e:
+        return ApiResponse.error(f"Failed to export tickets: {str(e)}", 500)
+
+
+def _csv_export(chunks):
+    """Yield CSV text for ticket chunks, starting with a header row."""
+    fields = Ticket.WIRE_FIELDS
+    import csv
+    import io
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for chunk in chunks:
+        writer.writerows(row.values() for row in to_wire(chunk, fields))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _ndjson_export(chunks):
+    """Yield one JSON document per ticket, newline separated."""
+    for chunk in chunks:
+        yield "".join(
+            json.dumps(ticket) + "\n" for ticket in to_wire(chunk)
+        )
+
+
+@api.route("/api/tickets/import", methods=["POST"])
+@jwt_required()
+def import_tickets():
+    """
+    Bulk import tickets into the authenticated admin's workspace.
+    
+    The request body is the raw CSV (with a header row) or NDJSON upload and
+    is parsed as it streams in. Records use the same fields as ticket
+    creation, plus an optional owner_id (defaults to the importing admin).
+    Invalid records are skipped and reported.
+    
+    Query parameters:
+    - format: "csv" (default) or "ndjson"
+    - batch_size: Tickets per transaction (optional)
+    - resume_from: Number of records to skip from an earlier failed import (optional)
+    
+    Returns:
+    -------
+    JSON response with imported/skipped counts, resume_from and record errors
+    Status code 200 on success, 400 for invalid parameters, 403 if not admin,
+    500 on error (body includes resume_from)
+    """
+    import _bulk as bulk
+
+    try:
+        current_user_id = get_jwt_identity()
+        import_format = request.args.get("format", "csv").lower()
+
+        if import_format not in bulk.IMPORT_FORMATS:
+            return ApiResponse.error("Format must be 'csv' or 'ndjson'")
 
-        if ticket["workplace_id"] != user["workplace_id"]:
+        try:
+            batch_size = int(
+                request.args.get("batch_size", bulk.DEFAULT_BATCH_SIZE)
+            )
+            resume_from = int(request.args.get("resume_from", 0))
+        except ValueError:
             return ApiResponse.error(
-                "Ticket does not belong to your workspace", 403
+                "batch_size and resume_from must be integers"
+            )
+
+        if not 1 <= batch_size <= bulk.MAX_BATCH_SIZE or resume_from < 0:
+            return ApiResponse.error("Invalid batch_size or resume_from")
+
+        db = get_db()
+        user = repository.get_principal(db, current_user_id)
+
+        if not user or not user.workplace_id:
+            return ApiResponse.error(
+                "User does not belong to a workspace", 400
             )
 
-        if not user["is_admin"] and ticket["owner_id"] != int(current_user_id):
+        if not user.is_admin:
+            return ApiResponse.error("Only admins can import tickets", 403)
+
+        invalidation = current_app.extensions["invalidation"]
+        try:
+            result = bulk.import_tickets(
+                db,
+                bulk.iter_records(request.stream, import_format),
+                user.workplace_id,
+                user.id,
+                batch_size=batch_size,
+                resume_from=resume_from,
+            )
+        except bulk.ImportFailed as e:
+            if e.result.version is not None:
+                invalidation.invalidate(user.workplace_id, e.result.version)
+            log_action(
+                "tickets_import_failed",
+                e.result.to_dict(),
+                workplace_id=user.workplace_id,
+            )
+            return ApiResponse.error(
+                f"Failed to import tickets: {str(e)}", 500, e.result.to_dict()
+            )
+
+        if result.version is not None:
+            invalidation.invalidate(user.workplace_id, result.version)
+        log_action(
+            "tickets_imported",
+            {
+                "workspace_id": user.workplace_id,
+                "imported": result.imported,
+                "skipped": result.skipped,
+            },
+            workplace_id=user.workplace_id,
+        )
+
+        return ApiResponse.success("Tickets imported", result.to_dict())
+
+    except Exception as e:
+        return ApiResponse.error(f"Failed to import tickets: {str(e)}", 500)
+
+
+@api.route("/api/tickets/archive", methods=["POST"])
+@jwt_required()
+def archive_tickets():
+    """
+    Move the workspace's old Closed tickets to the archive.
+    
+    Tickets are moved in batches of ``ARCHIVE_BATCH_SIZE``, each in its own
+    short transaction. Archived tickets are read-only and only listed with
+    ``include_archived=true``.
+    
+    Expects JSON payload with:
+    - older_than_days: Minimum days since a ticket was closed (optional,
+      defaults to ``ARCHIVE_AFTER_DAYS``)
+    
+    Returns:
+    -------
+    JSON response with the number of tickets archived
+    Status code 200 on success, 400 for invalid data, 403 if not admin, 500 on error
+    """
+    import _archive as archive
+
+    try:
+        current_user_id = get_jwt_identity()
+        data = request.get_json(silent=True) or {}
+
+        older_than_days = data.get(
+            "older_than_days", current_app.config["ARCHIVE_AFTER_DAYS"]
+        )
+        if (
+            isinstance(older_than_days, bool)
+            or not isinstance(older_than_days, (int, float))
+            or older_than_days < 0
+        ):
+            return ApiResponse.error(
+                "older_than_days must be a non-negative number"
+            )
+
+        db = get_db()
+        user = repository.get_principal(db, current_user_id)
+
+        if not user or not user.workplace_id:
+            return ApiResponse.error(
+                "User does not belong to a workspace", 400
+            )
+
+        if not user.is_admin:
+            return ApiResponse.error("Only admins can archive tickets", 403)
+
+        invalidation = current_app.extensions["invalidation"]
+        try:
+            archived, version = archive.archive_workspace(
+                db,
+                user.workplace_id,
+                older_than_days,
+                batch_size=current_app.config["ARCHIVE_BATCH_SIZE"],
+            )
+        except Exception:
+            # Batches committed before the failure reach ``poll`` through
+            # change_log; evict now without guessing their version.
+            invalidation.invalidate(user.workplace_id)
+            raise
+        if version is not None:
+            invalidation.invalidate(user.workplace_id, version)
+
+        log_action(
+            "tickets_archived",
+            {"archived": archived, "older_than_days": older_than_days},
+            workplace_id=user.workplace_id,
+        )
+
+        return ApiResponse.success("Tickets archived", {"archived": archived})
+
+    except Exception as e:
+        return ApiResponse.error(f"Failed to archive tickets: {str(e)}", 500)
+
+
+@api.route("/api/tickets/create", methods=["POST"])
+@jwt_required()
+def create_ticket():
+    """
+    Create a new ticket in the user's workspace.
+    
+    Expects JSON payload with:
+    - title: Ticket title
+    - description: Ticket description
+    - status: Ticket status (optional, defaults to "Open")
+    - priority: Ticket priority (optional, defaults to "Medium")
+    
+    Returns:
+    -------
+    JSON response with created ticket data
+    Status code 201 on success, 400 if invalid data or no workspace, 500 on error
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        data = request.json
+
+        title = data.get("title")
+        description = data.get("description")
+        status = data.get("status", "Open")
+        priority = data.get("priority", "Medium")
+
+        if not title or not description:
+            return ApiResponse.error("Title and description are required")
+
+        field_error = ticket_field_error(
+            {"status": status, "priority": priority}
+        )
+        if field_error:
+            return ApiResponse.error(field_error)
+
+        db = get_db()
+        ticket = repository.create_ticket(
+            db, current_user_id, title, description, status, priority
+        )
+
+        if ticket is None:
+            db.rollback()
             return ApiResponse.error(
-                "You don't have permission to update this ticket", 403
+                "User does not belong to a workspace", 400
             )
 
+        commit_workspace_change(db, ticket.workplace_id)
+        current_app.extensions["rank_rebalancer"].check(
+            ticket.workplace_id, status, ticket.rank
+        )
+
+        ticket_data = to_wire(ticket)
+
+        log_action(
+            "ticket_created",
+            {"ticket_id": ticket.id, "status": status, "priority": priority},
+            workplace_id=ticket.workplace_id,
+            ticket_id=ticket.id,
+        )
+
+        return ApiResponse.success(
+            "Ticket created successfully", ticket_data, 201
+        )
+
+    except Exception as e:
+        return ApiResponse.error(f"Failed to create ticket: {str(e)}", 500)
+
+
+def ticket_update_error(
+    db: sqlite3.Connection, ticket: Optional[Ticket], user_id: int
+) -> Optional[tuple[str, int]]:
+    """
+    Explain why a user may not update a ticket.
+    
+    Admins can update any ticket in their workspace; other users only their
+    own tickets.
+    
+    Parameters:
+    ----------
+    db : sqlite3.Connection
+        Database connection
+    ticket : Ticket, optional
+        The ticket, or None if it doesn't exist
+    user_id : int
+        ID of the user making the update
+        
+    Returns:
+    -------
+    tuple[str, int] or None
+        An error message and status code, or None if the update is allowed
+    """
+    if not ticket:
+        return "Ticket not found", 404
+
+    user = repository.get_principal(db, user_id)
+
+    if not user:
+        return "User not found", 404
+
+    if ticket.workplace_id != user.workplace_id:
+        return "Ticket does not belong to your workspace", 403
+
+    if not user.is_admin and ticket.owner_id != int(user_id):
+        return "You don't have permission to update this ticket", 403
+
+    return None
+
+
+def ticket_move_rank(
+    db: sqlite3.Connection, ticket: Ticket, status: str, position: dict
+) -> tuple[Optional[str], Optional[tuple[str, int]]]:
+    """
+    Work out a ticket's new rank from the neighbours it is moved between.
+    
+    Parameters:
+    ----------
+    db : sqlite3.Connection
+        Database connection
+    ticket : Ticket
+        The ticket being moved
+    status : str
+        Column the ticket ends up in
+    position : dict
+        Request payload, with optional ``after_id`` and ``before_id``
+        
+    Returns:
+    -------
+    tuple[str or None, tuple[str, int] or None]
+        The new rank, or an error message and status code
+    """
+    neighbour_ids = []
+    for key in ("after_id", "before_id"):
+        value = position.get(key)
+        if value is None:
+            continue
+        if type(value) is not int or value == ticket.id:
+            return None, (f"{key} must be the ID of another ticket", 400)
+        neighbour_ids.append(value)
+
+    ranks = {}
+    if neighbour_ids:
+        positions = repository.get_ticket_positions(
+            db, ticket.workplace_id, neighbour_ids
+        )
+        for key in ("after_id", "before_id"):
+            neighbour_id = position.get(key)
+            if neighbour_id is None:
+                continue
+            neighbour = positions.get(neighbour_id)
+            if neighbour is None or neighbour[0] != status:
+                return None, (
+                    f"Ticket {neighbour_id} is not in the {status} column",
+                    400,
+                )
+            ranks[key] = neighbour[1]
+
+    workplace_id = ticket.workplace_id
+    rebalancer = current_app.extensions["rank_rebalancer"]
+    conflict = ("The board column has changed, reload it", 409)
+    if any(rank is None for rank in ranks.values()):
+        rebalancer.schedule(workplace_id, status)
+        return None, conflict
+
+    low = high = None
+    if "after_id" in position:
+        low = ranks.get("after_id")
+        high = repository.get_adjacent_rank(
+            db, workplace_id, status, low or "", ticket.id
+        )
+        # Both neighbours given: they must still be adjacent.
+        if "before_id" in position and ranks.get("before_id") != high:
+            return None, conflict
+    elif ranks.get("before_id") is not None:
+        high = ranks["before_id"]
+        low = repository.get_adjacent_rank(
+            db, workplace_id, status, high, ticket.id, previous=True
+        )
+    else:
+        low = repository.get_last_rank(db, workplace_id, status)
+
+    if low is not None and high is not None and low >= high:
+        # Tied ranks from concurrent moves; a rebalance separates them.
+        rebalancer.schedule(workplace_id, status)
+        return None, conflict
+
+    return ranking.key_between(low, high), None
+
+
+@api.route("/api/tickets/<int:ticket_id>", methods=["PUT"])
+@jwt_required()
+def update_ticket(ticket_id):
+    """
+    Update an existing ticket.
+    
+    Admins can update any ticket in their workspace.
+    Regular users can only update their own tickets.
+    
+    Parameters:
+    ----------
+    ticket_id : int
+        The ID of the ticket to update
+    
+    Expects JSON payload with any of:
+    - title: Ticket title
+    - description: Ticket description
+    - status: Ticket status ("Open", "In Progress", "Closed")
+    - priority: Ticket priority ("Low", "Medium", "High")
+    - after_id: Move directly after this ticket in its board column (null
+      moves to the top)
+    - before_id: Move directly before this ticket (null moves to the bottom)
+    
+    A ticket whose status changes without a position goes to the bottom of
+    its new column. A move only rewrites the ticket's own rank.
+    
+    Returns:
+    -------
+    JSON response with updated ticket data
+    Status code 200 on success, 400 for an invalid position, 403 if
+    insufficient permissions, 404 if ticket not found, 409 if the column
+    changed since the neighbours were read
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        data = request.json
+
+        if not data:
+            return ApiResponse.error("No data provided")
+
         allowed_fields = ["title", "description", "status", "priority"]
         update_fields = {
             k: v
@@ -1538,46 +2784,59 @@ def update_ticket(ticket_id):
             if k in allowed_fields and v is not None
         }
 
-        if not update_fields:
+        moved = "after_id" in data or "before_id" in data
+        if not update_fields and not moved:
             return ApiResponse.error("No valid fields to update")
 
-        if "status" in update_fields and update_fields["status"] not in [
-            "Open",
-            "In Progress",
-            "Closed",
-        ]:
-            return ApiResponse.error("Invalid status value")
-
-        if "priority" in update_fields and update_fields["priority"] not in [
-            "Low",
-            "Medium",
-            "High",
-        ]:
-            return ApiResponse.error("Invalid priority value")
-
-        query_parts = [f"{field} = ?" for field in update_fields.keys()]
-        query = f"UPDATE tickets SET {', '.join(query_parts)} WHERE id = ?"
-        params = list(update_fields.values()) + [ticket_id]
-
-        cursor.execute(query, params)
-        db.commit()
+        field_error = ticket_field_error(update_fields)
+        if field_error:
+            return ApiResponse.error(field_error)
 
-        cursor.execute("SELECT * FROM tickets WHERE id = ?", (ticket_id,))
-        updated_ticket = cursor.fetchone()
-
-        ticket_data = {
-            "id": updated_ticket["id"],
-            "title": updated_ticket["title"],
-            "description": updated_ticket["description"],
-            "status": updated_ticket["status"],
-            "priority": updated_ticket["priority"],
-            "created_at": updated_ticket["created_at"],
-            "owner_id": updated_ticket["owner_id"],
-        }
+        db = get_db()
+        rank = None
+        if moved:
+            ticket = repository.get_ticket(db, ticket_id)
+            denied = ticket_update_error(db, ticket, current_user_id)
+            if denied:
+                return ApiResponse.error(*denied)
+
+            status = update_fields.get("status", ticket.status)
+            rank, move_error = ticket_move_rank(db, ticket, status, data)
+            if move_error:
+                return ApiResponse.error(*move_error)
+
+        updated_ticket = repository.update_ticket_fields(
+            db, ticket_id, current_user_id, rank=rank, **update_fields
+        )
+
+        if updated_ticket is None:
+            db.rollback()
+            ticket = repository.get_ticket(db, ticket_id)
+            return ApiResponse.error(
+                *(
+                    ticket_update_error(db, ticket, current_user_id)
+                    or ("Ticket not found", 404)
+                )
+            )
+
+        commit_workspace_change(db, updated_ticket.workplace_id)
+        current_app.extensions["rank_rebalancer"].check(
+            updated_ticket.workplace_id,
+            updated_ticket.status,
+            updated_ticket.rank,
+        )
+
+        ticket_data = to_wire(updated_ticket)
 
         log_action(
             "ticket_updated",
-            {"ticket_id": ticket_id, "updates": update_fields},
+            {
+                "ticket_id": ticket_id,
+                "updates": update_fields,
+                "moved": moved,
+            },
+            workplace_id=updated_ticket.workplace_id,
+            ticket_id=ticket_id,
         )
 
         return ApiResponse.success("Ticket updated successfully", ticket_data)
@@ -1586,8 +2845,550 @@ def update_ticket(ticket_id):
         return ApiResponse.error(f"Failed to update ticket: {str(e)}", 500)
 
 
-with app.app_context():
-    init_db()
+@api.route("/api/dashboard", methods=["GET"])
+@jwt_required()
+def get_dashboard():
+    """
+    Get everything the dashboard needs for its first paint.
+    
+    Built from at most three statements on one read-only connection: the
+    user joined to their workspace, the workspace members, and the first
+    page of tickets with the ticket counts computed in the same scan.
+    Tickets are scoped as in ``/api/tickets`` (admins see the whole
+    workspace, other users their own tickets).
+    
+    Query parameters:
+    - limit: Number of tickets in the first page (optional)
+    
+    Returns:
+    -------
+    JSON response with user, workspace (join code for admins only), members,
+    tickets and ticket_counts
+    Status code 200 on success, 400 for an invalid limit, 404 if user not
+    found, 500 on error
+    """
+    try:
+        current_user_id = get_jwt_identity()
+
+        max_limit = current_app.config["DASHBOARD_TICKET_LIMIT"]
+        try:
+            limit = int(request.args.get("limit", max_limit))
+        except ValueError:
+            return ApiResponse.error("limit must be an integer")
+
+        if not 1 <= limit <= max_limit:
+            return ApiResponse.error(f"limit must be between 1 and {max_limit}")
+
+        db = get_db()
+        principal = repository.get_principal_with_workplace(
+            db, current_user_id
+        )
+
+        if not principal:
+            return ApiResponse.error("User not found", 404)
+
+        user, workspace = principal
+        dashboard = {
+            "user": to_wire(
+                user, ("id", "name", "email", "is_admin", "workplace_id")
+            ),
+            "workspace": None,
+            "members": [],
+            "tickets": [],
+            "ticket_counts": None,
+        }
+
+        if workspace:
+            workspace_fields = ("id", "name", "description", "created_at")
+            if user.is_admin:
+                workspace_fields += ("join_code",)
+            owner_id = None if user.is_admin else user.id
+            members = repository.list_workspace_members(db, workspace.id)
+            tickets, counts = repository.ticket_page_with_counts(
+                db, workspace.id, owner_id, limit
+            )
+
+            dashboard["workspace"] = to_wire(workspace, workspace_fields)
+            dashboard["members"] = to_wire(
+                members, ("id", "name", "email", "is_admin")
+            )
+            dashboard["tickets"] = to_wire(tickets)
+            dashboard["ticket_counts"] = counts
+
+        return ApiResponse.success(
+            "Dashboard retrieved successfully", dashboard
+        )
+
+    except Exception as e:
+        return ApiResponse.error(
+            f"Failed to retrieve dashboard: {str(e)}", 500
+        )
+
+
+BATCH_EXCLUDED_ENDPOINTS = {"api.batch", "api.export_tickets"}
+
+
+@api.route("/api/batch", methods=["POST"])
+@jwt_required()
+def batch():
+    """
+    Run several GET requests in one round trip.
+    
+    The JWT is verified once for the whole batch and every sub-request shares
+    one read-only connection inside a single transaction, so all results come
+    from the same snapshot of the database.
+    
+    Expects JSON payload with:
+    - requests: List of objects with a "path" to an existing GET route,
+      optionally including a query string (e.g. "/api/tickets")
+    
+    Returns:
+    -------
+    JSON response with one {path, status, body} entry per sub-request, in order
+    Status code 200 on success, 400 for an invalid batch, 500 on error
+    """
+    from urllib.parse import urlsplit
+    from werkzeug.exceptions import HTTPException
+
+    try:
+        data = request.json
+        sub_requests = data.get("requests") if isinstance(data, dict) else None
+
+        if not isinstance(sub_requests, list) or not sub_requests:
+            return ApiResponse.error("A list of requests is required")
+
+        if len(sub_requests) > current_app.config["BATCH_MAX_REQUESTS"]:
+            return ApiResponse.error(
+                "Too many requests in batch "
+                f"(maximum {current_app.config['BATCH_MAX_REQUESTS']})"
+            )
+
+        paths = [
+            item.get("path") if isinstance(item, dict) else None
+            for item in sub_requests
+        ]
+        if not all(isinstance(path, str) for path in paths):
+            return ApiResponse.error("Every request needs a path")
+
+        db = get_read_db()
+        if not db.in_transaction:
+            db.execute("BEGIN")
+
+        adapter = current_app.url_map.bind(request.host)
+        results = []
+        for path in paths:
+            try:
+                endpoint, view_args = adapter.match(
+                    urlsplit(path).path, method="GET"
+                )
+                if endpoint in BATCH_EXCLUDED_ENDPOINTS:
+                    results.append(
+                        {
+                            "path": path,
+                            "status": 400,
+                            "body": {"error": "Route cannot be batched"},
+                        }
+                    )
+                    continue
+
+                view = current_app.view_functions[endpoint]
+                view = getattr(view, "__wrapped__", view)
+                with current_app.test_request_context(
+                    path,
+                    base_url=request.host_url,
+                    method="GET",
+                    environ_base={"REMOTE_ADDR": request.remote_addr},
+                ):
+                    response = current_app.make_response(view(**view_args))
+                results.append(
+                    {
+                        "path": path,
+                        "status": response.status_code,
+                        "body": response.get_json(silent=True),
+                    }
+                )
+            except HTTPException as e:
+                results.append(
+                    {
+                        "path": path,
+                        "status": e.code,
+                        "body": {"error": e.description},
+                    }
+                )
+
+        return ApiResponse.success("Batch completed", results)
+
+    except Exception as e:
+        return ApiResponse.error(f"Failed to run batch: {str(e)}", 500)
+
+
+@api.route("/api/tickets/<int:ticket_id>/history", methods=["GET"])
+@jwt_required()
+def get_ticket_history(ticket_id):
+    """
+    Get the audit history of a ticket, oldest event first.
+    
+    Admins can view any ticket in their workspace; other users only their
+    own tickets. Archived tickets keep their history. Buffered events are
+    flushed first so the history includes changes made moments ago.
+    
+    Parameters:
+    ----------
+    ticket_id : int
+        The ID of the ticket
+    
+    Returns:
+    -------
+    JSON response with array of events (id, ts, action, user_id, details)
+    Status code 200 on success, 403 if insufficient permissions, 404 if ticket not found
+    """
+    try:
+        current_user_id = get_jwt_identity()
+
+        db = get_db()
+        ticket = repository.get_ticket(db, ticket_id)
+        if not ticket:
+            ticket = repository.get_archived_ticket(db, ticket_id)
+
+        if not ticket:
+            return ApiResponse.error("Ticket not found", 404)
+
+        user = repository.get_principal(db, current_user_id)
+
+        if not user or ticket.workplace_id != user.workplace_id:
+            return ApiResponse.error(
+                "Ticket does not belong to your workspace", 403
+            )
+
+        if not user.is_admin and ticket.owner_id != user.id:
+            return ApiResponse.error(
+                "You don't have permission to view this ticket", 403
+            )
+
+        current_app.extensions["audit"].flush()
+        events = repository.get_ticket_history(
+            db, ticket.workplace_id, ticket_id
+        )
+
+        return ApiResponse.success(
+            "Ticket history retrieved successfully", to_wire(events)
+        )
+
+    except Exception as e:
+        return ApiResponse.error(
+            f"Failed to retrieve ticket history: {str(e)}", 500
+        )
+
+
+def is_operator(user_id) -> bool:
+    """
+    Check whether a user may use the process-wide operator endpoints.
+    
+    These endpoints expose every tenant served by the worker, so they are
+    limited to the IDs in ``OPERATOR_USER_IDS`` rather than to workspace
+    admins, whom any user can become by creating a workspace.
+    """
+    try:
+        return int(user_id) in current_app.config["OPERATOR_USER_IDS"]
+    except (TypeError, ValueError):
+        return False
+
+
+@api.route("/api/metrics", methods=["GET"])
+@jwt_required()
+def get_metrics():
+    """
+    Get in-process counters for the API's protective subsystems.
+    
+    Only available to operators (see ``is_operator``).
+    
+    Returns:
+    -------
+    JSON response with rate limiter, admission control, profiler, join
+    code index, cache invalidation and audit writer statistics
+    Status code 200 on success, 403 if not an operator, 500 on error
+    """
+    try:
+        if not is_operator(get_jwt_identity()):
+            return ApiResponse.error("Only operators can view metrics", 403)
+
+        return ApiResponse.success(
+            "Metrics retrieved successfully",
+            {
+                "rate_limits": current_app.extensions[
+                    "auth_limiter"
+                ].stats(),
+                "join_codes": current_app.extensions["join_codes"].stats(),
+                "invalidation": current_app.extensions[
+                    "invalidation"
+                ].stats(),
+                "audit": current_app.extensions["audit"].stats(),
+                "admission": current_app.extensions["admission"].stats(),
+                "profiler": current_app.extensions["profiler"].stats(),
+                "responses": current_app.extensions["responses"].stats(),
+                "rank_rebalancer": current_app.extensions[
+                    "rank_rebalancer"
+                ].stats(),
+            },
+        )
+
+    except Exception as e:
+        return ApiResponse.error(f"Failed to retrieve metrics: {str(e)}", 500)
+
+
+def cache_sizes() -> list[dict]:
+    """
+    Report the size of each in-process cache, largest first.
+    
+    Returns:
+    -------
+    list[dict]
+        Name, entry count and, where it is tracked, size in bytes of each
+        cache
+    """
+    extensions = current_app.extensions
+    responses = extensions["responses"].stats()
+    join_codes = extensions["join_codes"].stats()
+    caches = [
+        {
+            "name": "responses",
+            "entries": responses["entries"],
+            "bytes": responses["bytes"],
+        },
+        {
+            "name": "join_codes",
+            "entries": join_codes["codes"],
+            "bytes": join_codes["bytes"],
+        },
+        {
+            "name": "rate_limit_buckets",
+            "entries": extensions["auth_limiter"].stats()["buckets"],
+            "bytes": None,
+        },
+        {
+            "name": "audit_buffer",
+            "entries": extensions["audit"].stats()["buffered"],
+            "bytes": None,
+        },
+        {
+            "name": "read_pool",
+            "entries": extensions["read_pool"].qsize(),
+            "bytes": None,
+        },
+    ]
+    caches.sort(key=lambda cache: (cache["bytes"] or 0, cache["entries"]))
+    return caches[::-1]
+
+
+def operator_error(user_id: int) -> Optional[tuple[str, int]]:
+    """
+    Return an error unless ``user_id`` is an operator, for diagnostics.
+    
+    Tracing and heap snapshots cover every tenant served by the worker, so
+    workspace admins are refused (see ``is_operator``).
+    """
+    if not is_operator(user_id):
+        return "Only operators can view diagnostics", 403
+    return None
+
+
+@api.route("/api/diagnostics/memory", methods=["GET"])
+@jwt_required()
+def get_memory_status():
+    """
+    Get the worker's memory use: RSS, tracemalloc state and cache sizes.
+    
+    Returns:
+    -------
+    JSON response with process RSS, tracing state, snapshot IDs and the
+    in-process caches, largest first
+    Status code 200 on success, 403 if not an operator, 500 on error
+    """
+    try:
+        denied = operator_error(get_jwt_identity())
+        if denied:
+            return ApiResponse.error(*denied)
+
+        return ApiResponse.success(
+            "Memory status retrieved successfully",
+            {
+                "process": rss_bytes(),
+                "tracemalloc": current_app.extensions["memory"].stats(),
+                "caches": cache_sizes(),
+            },
+        )
+
+    except Exception as e:
+        return ApiResponse.error(
+            f"Failed to retrieve memory status: {str(e)}", 500
+        )
+
+
+@api.route("/api/diagnostics/memory/tracing", methods=["POST"])
+@jwt_required()
+def set_memory_tracing():
+    """
+    Start or stop tracemalloc in this worker.
+    
+    Tracing slows down allocation-heavy requests, so stop it once the
+    snapshots needed have been taken. Stopping drops every snapshot.
+    
+    Expects JSON payload with:
+    - enabled: true to start tracing, false to stop it
+    - frames: Stack frames kept per allocation (optional, 1 to 64,
+      defaults to 1)
+    
+    Returns:
+    -------
+    JSON response with the tracing state
+    Status code 200 on success, 400 for invalid data, 403 if not an
+    operator, 500 on error
+    """
+    try:
+        denied = operator_error(get_jwt_identity())
+        if denied:
+            return ApiResponse.error(*denied)
+
+        data = request.get_json(silent=True) or {}
+        enabled = data.get("enabled")
+        frames = data.get("frames", 1)
+
+        if not isinstance(enabled, bool):
+            return ApiResponse.error("enabled must be true or false")
+        if type(frames) is not int or not 1 <= frames <= 64:
+            return ApiResponse.error("frames must be between 1 and 64")
+
+        tracer = current_app.extensions["memory"]
+        if enabled:
+            tracer.start(frames)
+        else:
+            tracer.stop()
+
+        log_action("memory_tracing", {"enabled": enabled, "frames": frames})
+
+        return ApiResponse.success(
+            "Memory tracing updated successfully", tracer.stats()
+        )
+
+    except Exception as e:
+        return ApiResponse.error(
+            f"Failed to update memory tracing: {str(e)}", 500
+        )
+
+
+@api.route("/api/diagnostics/memory/snapshots", methods=["POST"])
+@jwt_required()
+def take_memory_snapshot():
+    """
+    Take a tracemalloc snapshot of this worker.
+    
+    Only the newest ``MEMORY_SNAPSHOTS`` snapshots are kept.
+    
+    Expects JSON payload with (all optional):
+    - group_by: "lineno" (default), "filename" or "traceback"
+    - limit: Allocation sites returned (defaults to 20)
+    
+    Returns:
+    -------
+    JSON response with the snapshot ID and its largest allocation sites
+    Status code 201 on success, 400 if tracing is off or for invalid data,
+    403 if not an operator, 500 on error
+    """
+    try:
+        denied = operator_error(get_jwt_identity())
+        if denied:
+            return ApiResponse.error(*denied)
+
+        data = request.get_json(silent=True) or {}
+        group_by = data.get("group_by", "lineno")
+        limit = data.get("limit", 20)
+
+        if group_by not in GROUP_BY:
+            return ApiResponse.error(
+                "group_by must be one of: " + ", ".join(GROUP_BY)
+            )
+        if type(limit) is not int or limit < 1:
+            return ApiResponse.error("limit must be a positive integer")
+
+        tracer = current_app.extensions["memory"]
+        try:
+            snapshot_id = tracer.snapshot()
+        except RuntimeError as e:
+            return ApiResponse.error(str(e))
+
+        return ApiResponse.success(
+            "Memory snapshot taken successfully",
+            {
+                "id": snapshot_id,
+                "top": tracer.top(snapshot_id, group_by, limit),
+            },
+            201,
+        )
+
+    except Exception as e:
+        return ApiResponse.error(
+            f"Failed to take memory snapshot: {str(e)}", 500
+        )
+
+
+@api.route("/api/diagnostics/memory/diff", methods=["GET"])
+@jwt_required()
+def diff_memory_snapshots():
+    """
+    Compare two memory snapshots by allocation site.
+    
+    Query parameters:
+    - from: ID of the earlier snapshot
+    - to: ID of the later snapshot
+    - group_by: "lineno" (default), "filename" or "traceback" (optional)
+    - limit: Allocation sites returned (optional, defaults to 20)
+    
+    Returns:
+    -------
+    JSON response with per-site size and count changes, largest growth
+    first
+    Status code 200 on success, 400 for invalid parameters, 403 if not an
+    operator, 404 if a snapshot is unknown, 500 on error
+    """
+    try:
+        denied = operator_error(get_jwt_identity())
+        if denied:
+            return ApiResponse.error(*denied)
+
+        args = request.args
+        group_by = args.get("group_by", "lineno")
+        if group_by not in GROUP_BY:
+            return ApiResponse.error(
+                "group_by must be one of: " + ", ".join(GROUP_BY)
+            )
+        try:
+            from_id = int(args["from"])
+            to_id = int(args["to"])
+            limit = int(args.get("limit", 20))
+        except (KeyError, ValueError):
+            return ApiResponse.error(
+                "from and to must be snapshot IDs and limit an integer"
+            )
+        if limit < 1:
+            return ApiResponse.error("limit must be a positive integer")
+
+        diff = current_app.extensions["memory"].compare(
+            from_id, to_id, group_by, limit
+        )
+        if diff is None:
+            return ApiResponse.error("Snapshot not found", 404)
+
+        return ApiResponse.success(
+            "Memory snapshots compared successfully", diff
+        )
+
+    except Exception as e:
+        return ApiResponse.error(
+            f"Failed to compare memory snapshots: {str(e)}", 500
+        )
+
+
+app = create_app()
 
 if __name__ == "__main__":
-    app.run()
\ No newline at end of file
+    app.run()
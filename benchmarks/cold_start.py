@@ -0,0 +1,95 @@
+"""
+Cold-start time of the API: from interpreter start to the first response.
+
+Each run starts a fresh Python process that imports ``api/index.py`` and sends
+one request through the test client, so nothing is shared between runs. Two
+scenarios are measured: a database that doesn't exist yet (full schema
+creation) and one whose schema version is already current (no DDL).
+
+Usage:
+    python benchmarks/cold_start.py [--runs 20] [--path /api/signout]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+API_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "api"))
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {api_dir!r})
+import index
+imported = time.perf_counter()
+client = index.app.test_client()
+response = client.open({path!r}, method={method!r}, base_url="https://localhost")
+done = time.perf_counter()
+print(json.dumps({{
+    "import": imported - start,
+    "first_response": done - imported,
+    "total": done - start,
+    "status": response.status_code,
+}}))
+"""
+
+
+def run_once(env: dict, path: str, method: str) -> dict:
+    code = CHILD.format(api_dir=API_DIR, path=path, method=method)
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        cwd=env["BENCH_CWD"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def report(label: str, samples: list[dict]):
+    print(label)
+    for key in ("import", "first_response", "total"):
+        values = [sample[key] * 1000 for sample in samples]
+        print(
+            f"  {key:<15} median {statistics.median(values):7.1f} ms   "
+            f"min {min(values):7.1f} ms   max {max(values):7.1f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--path", default="/api/signout")
+    parser.add_argument("--method", default="POST")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            JWT_SECRET_KEY="cold-start-benchmark-secret-key-000",
+            BENCH_CWD=tmp,
+        )
+
+        fresh = []
+        for i in range(args.runs):
+            env["DATABASE"] = os.path.join(tmp, f"fresh-{i}.db")
+            fresh.append(run_once(env, args.path, args.method))
+
+        env["DATABASE"] = os.path.join(tmp, "current.db")
+        run_once(env, args.path, args.method)
+        current = [
+            run_once(env, args.path, args.method) for _ in range(args.runs)
+        ]
+
+    print(f"{args.method} {args.path}, {args.runs} runs each")
+    report("new database (schema created)", fresh)
+    report("existing database (schema current, no DDL)", current)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Size and scan/sort cost of the STRICT ticket schema against the text schema.
+
+Builds a database with the schema-version-7 ``tickets`` table (status and
+priority stored as names, ``created_at`` as ``YYYY-MM-DD HH:MM:SS`` text, and
+the status/priority rank expression indexes), copies it and migrates the copy
+with ``init_db``. Both files are vacuumed before their sizes are compared, and
+each query is timed on both, with status and priority bound as names on the
+text schema and as codes on the STRICT one. Scans bypass the indexes with
+``NOT INDEXED`` so every row is decoded.
+
+Usage:
+    python benchmarks/compact_schema.py [--tickets 200000] [--runs 10]
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+from _models import (  # noqa: E402
+    STATUS_CODES,
+    TICKET_PRIORITIES,
+    TICKET_STATUSES,
+)
+
+
+def _rank(column: str, values: tuple) -> str:
+    whens = " ".join(
+        f"WHEN '{value}' THEN {i}" for i, value in enumerate(values)
+    )
+    return f"(CASE {column} {whens} END)"
+
+
+LEGACY_TICKETS = """
+    CREATE TABLE tickets
+              (id INTEGER PRIMARY KEY AUTOINCREMENT,
+               title TEXT NOT NULL,
+               description TEXT NOT NULL,
+               status TEXT NOT NULL,
+               priority TEXT NOT NULL,
+               created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+               owner_id INTEGER,
+               workplace_id INTEGER,
+               rank TEXT)
+"""
+LEGACY_INDEXES = (
+    "tickets (workplace_id, created_at)",
+    "tickets (workplace_id, owner_id, created_at)",
+    f"tickets (workplace_id, {_rank('status', TICKET_STATUSES)}, created_at)",
+    f"tickets (workplace_id, {_rank('priority', TICKET_PRIORITIES)}, "
+    "created_at)",
+    "tickets (workplace_id, status, rank)",
+)
+
+# (label, text-schema SQL, STRICT SQL, text args, STRICT args)
+QUERIES = (
+    (
+        "scan: count by status",
+        "SELECT status, count(*) FROM tickets NOT INDEXED GROUP BY status",
+        "SELECT status, count(*) FROM tickets NOT INDEXED GROUP BY status",
+        (),
+        (),
+    ),
+    (
+        "scan: Closed, last 30d",
+        "SELECT count(*) FROM tickets NOT INDEXED WHERE status = ? "
+        "AND created_at >= datetime('now', '-30 days')",
+        "SELECT count(*) FROM tickets NOT INDEXED WHERE status = ? "
+        "AND created_at >= unixepoch('now', '-30 days')",
+        ("Closed",),
+        (STATUS_CODES["Closed"],),
+    ),
+    (
+        "sort: created_at",
+        "SELECT id FROM tickets NOT INDEXED ORDER BY created_at DESC",
+        "SELECT id FROM tickets NOT INDEXED ORDER BY created_at DESC",
+        (),
+        (),
+    ),
+    (
+        "sort: status, created_at",
+        "SELECT id FROM tickets NOT INDEXED "
+        f"ORDER BY {_rank('status', TICKET_STATUSES)}, created_at",
+        "SELECT id FROM tickets NOT INDEXED ORDER BY status, created_at",
+        (),
+        (),
+    ),
+    (
+        "page: status index",
+        "SELECT id FROM tickets WHERE workplace_id = 1 "
+        f"AND {_rank('status', TICKET_STATUSES)} = ? "
+        "ORDER BY created_at DESC LIMIT 50",
+        "SELECT id FROM tickets WHERE workplace_id = 1 AND status = ? "
+        "ORDER BY created_at DESC LIMIT 50",
+        (STATUS_CODES["In Progress"],),
+        (STATUS_CODES["In Progress"],),
+    ),
+)
+
+
+def build_legacy(database: str, tickets: int):
+    db = sqlite3.connect(database)
+    db.execute(LEGACY_TICKETS)
+    for i, definition in enumerate(LEGACY_INDEXES):
+        db.execute(f"CREATE INDEX idx_legacy_{i} ON {definition}")
+    db.executemany(
+        """INSERT INTO tickets
+           (title, description, status, priority, created_at, owner_id,
+            workplace_id, rank)
+           VALUES (?, ?, ?, ?, datetime('now', ?), ?, ?, ?)""",
+        (
+            (
+                f"Ticket {i}",
+                f"Description for ticket {i}",
+                TICKET_STATUSES[i % 3],
+                TICKET_PRIORITIES[i % 7 % 3],
+                f"-{i * 60} seconds",
+                i % 50,
+                i % 4 + 1,
+                f"a{i:06d}",
+            )
+            for i in range(tickets)
+        ),
+    )
+    db.execute("PRAGMA user_version = 7")
+    db.commit()
+    db.close()
+
+
+def vacuumed_size(database: str) -> int:
+    db = sqlite3.connect(database)
+    db.execute("VACUUM")
+    db.close()
+    return os.path.getsize(database)
+
+
+def timed(database: str, sql: str, params: tuple, runs: int) -> float:
+    db = sqlite3.connect(database)
+    db.execute(sql, params).fetchall()
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        db.execute(sql, params).fetchall()
+        times.append(time.perf_counter() - start)
+    db.close()
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tickets", type=int, default=200_000)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.environ.setdefault(
+            "JWT_SECRET_KEY", "compact-schema-benchmark-secret-00"
+        )
+        import index
+
+        legacy = os.path.join(tmp, "legacy.db")
+        strict = os.path.join(tmp, "strict.db")
+        build_legacy(legacy, args.tickets)
+        shutil.copyfile(legacy, strict)
+
+        app = index.create_app({"DATABASE": strict})
+        start = time.perf_counter()
+        with app.app_context():
+            index.init_db()
+        migration = time.perf_counter() - start
+
+        legacy_size = vacuumed_size(legacy)
+        strict_size = vacuumed_size(strict)
+        print(f"{args.tickets} tickets, migrated in {migration:.2f} s")
+        print(
+            f"{'database size':<26} {legacy_size / 2**20:8.2f} MiB -> "
+            f"{strict_size / 2**20:8.2f} MiB "
+            f"({strict_size / legacy_size - 1:+.1%})"
+        )
+
+        for label, text_sql, strict_sql, text_args, strict_args in QUERIES:
+            before = timed(legacy, text_sql, text_args, args.runs)
+            after = timed(strict, strict_sql, strict_args, args.runs)
+            print(
+                f"{label:<26} {before * 1000:8.2f} ms  -> "
+                f"{after * 1000:8.2f} ms  ({after / before - 1:+.1%})"
+            )
+
+
+if __name__ == "__main__":
+    main()
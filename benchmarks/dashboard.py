@@ -0,0 +1,131 @@
+"""
+Dashboard first-paint cost: separate calls vs ``/api/batch`` vs ``/api/dashboard``.
+
+Seeds a workspace with members and tickets, signs in as its admin and loads
+the dashboard data three ways through the test client, reporting the median
+time per load, the number of SQL statements executed and the response size.
+The separate calls are the four GET routes the dashboard used before
+(status, workspace, workspace/users, tickets); note that ``/api/tickets``
+returns every ticket while ``/api/dashboard`` returns only the first page.
+
+Usage:
+    python benchmarks/dashboard.py [--members 50] [--tickets 5000] [--runs 200]
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+BASE_URL = "https://localhost"
+SEPARATE = [
+    "/api/status",
+    "/api/workspace",
+    "/api/workspace/users",
+    "/api/tickets",
+]
+
+
+def seed(database: str, members: int, tickets: int):
+    db = sqlite3.connect(database)
+    db.executemany(
+        """INSERT INTO users (name, email, password, is_admin, workplace_id)
+           VALUES (?, ?, 'x', 0, 1)""",
+        ((f"Member {i}", f"member{i}@example.com") for i in range(members)),
+    )
+    owners = [row[0] for row in db.execute("SELECT id FROM users")]
+    db.executemany(
+        """INSERT INTO tickets
+           (title, description, status, priority, created_at, owner_id, workplace_id)
+           VALUES (?, ?, ?, 1, unixepoch('now', ?), ?, 1)""",
+        (
+            (
+                f"Ticket {i}",
+                f"Description for ticket {i}",
+                i % 3,
+                f"-{i} seconds",
+                owners[i % len(owners)],
+            )
+            for i in range(tickets)
+        ),
+    )
+    db.commit()
+    db.close()
+
+
+def measure(label: str, load, runs: int, repository):
+    load()
+    statements = []
+    hook = lambda name, elapsed: statements.append(name)
+    repository.add_statement_hook(hook)
+    size = load()
+    repository.remove_statement_hook(hook)
+
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        load()
+        times.append(time.perf_counter() - start)
+
+    print(
+        f"{label:<18} {statistics.median(times) * 1000:8.2f} ms   "
+        f"{len(statements):3d} statements   {size / 1024:8.1f} KiB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--members", type=int, default=50)
+    parser.add_argument("--tickets", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.environ.setdefault(
+            "JWT_SECRET_KEY", "dashboard-benchmark-secret-key-00"
+        )
+        import _repository as repository
+        import index
+
+        app = index.create_app({"DATABASE": os.path.join(tmp, "bench.db")})
+        client = app.test_client()
+        credentials = {"email": "admin@example.com", "password": "password1"}
+        client.post("/api/signup", json=credentials, base_url=BASE_URL)
+        client.post("/api/signin", json=credentials, base_url=BASE_URL)
+        client.post(
+            "/api/workspace/create", json={"name": "Bench"}, base_url=BASE_URL
+        )
+        seed(app.config["DATABASE"], args.members, args.tickets)
+        print(f"{args.members} members, {args.tickets} tickets")
+
+        def separate():
+            return sum(
+                len(client.get(path, base_url=BASE_URL).data)
+                for path in SEPARATE
+            )
+
+        def batched():
+            return len(
+                client.post(
+                    "/api/batch",
+                    json={"requests": [{"path": path} for path in SEPARATE]},
+                    base_url=BASE_URL,
+                ).data
+            )
+
+        def dashboard():
+            return len(client.get("/api/dashboard", base_url=BASE_URL).data)
+
+        measure("separate calls", separate, args.runs, repository)
+        measure("/api/batch", batched, args.runs, repository)
+        measure("/api/dashboard", dashboard, args.runs, repository)
+
+
+if __name__ == "__main__":
+    main()
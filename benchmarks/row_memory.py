@@ -0,0 +1,116 @@
+"""
+Per-row memory footprint of a ticket listing.
+
+Compares the previous ``sqlite3.Row`` + dict representation with the slotted
+``Ticket`` model for a listing of 100k tickets, measured with tracemalloc.
+
+Usage:
+    python benchmarks/row_memory.py [--rows 100000]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+from _models import TICKET_COLUMNS, Ticket, to_wire  # noqa: E402
+
+LISTING = f"SELECT {TICKET_COLUMNS} FROM tickets ORDER BY created_at DESC"
+
+
+def build_database(rows: int) -> sqlite3.Connection:
+    db = sqlite3.connect(":memory:")
+    db.execute(
+        """CREATE TABLE tickets
+                  (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                   title TEXT NOT NULL,
+                   description TEXT NOT NULL,
+                   status INTEGER NOT NULL,
+                   priority INTEGER NOT NULL,
+                   created_at INTEGER NOT NULL DEFAULT (unixepoch()),
+                   owner_id INTEGER,
+                   workplace_id INTEGER,
+                   rank TEXT)
+                  STRICT"""
+    )
+    db.executemany(
+        """INSERT INTO tickets
+           (title, description, status, priority, created_at, owner_id, workplace_id)
+           VALUES (?, ?, ?, ?, unixepoch('now', ?), ?, 1)""",
+        (
+            (
+                f"Ticket {i}",
+                f"Description for ticket {i}",
+                i % 3,
+                i % 3,
+                f"-{i} seconds",
+                i % 50,
+            )
+            for i in range(rows)
+        ),
+    )
+    db.commit()
+    return db
+
+
+def legacy_listing(db: sqlite3.Connection) -> list:
+    cursor = db.cursor()
+    cursor.row_factory = sqlite3.Row
+    rows = cursor.execute(LISTING).fetchall()
+    return [
+        {
+            "id": t["id"],
+            "title": t["title"],
+            "description": t["description"],
+            "status": t["status"],
+            "priority": t["priority"],
+            "created_at": t["created_at"],
+            "owner_id": t["owner_id"],
+        }
+        for t in rows
+    ]
+
+
+def model_listing(db: sqlite3.Connection) -> list:
+    cursor = db.cursor()
+    cursor.row_factory = Ticket.from_cursor
+    return cursor.execute(LISTING).fetchall()
+
+
+def measure(label: str, fn, db: sqlite3.Connection, rows: int):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(db)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<22} {retained / rows:>8.1f} B/row retained "
+        f"{peak / rows:>8.1f} B/row peak {elapsed * 1000:>8.1f} ms"
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    db = build_database(args.rows)
+    print(f"{args.rows} tickets")
+
+    measure("sqlite3.Row + dict", legacy_listing, db, args.rows)
+    tickets = measure("Ticket (__slots__)", model_listing, db, args.rows)
+
+    start = time.perf_counter()
+    to_wire(tickets)
+    elapsed = time.perf_counter() - start
+    print(f"{'to_wire (serialise)':<22} {elapsed * 1000:>52.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
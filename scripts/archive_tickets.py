@@ -0,0 +1,93 @@
+"""
+Archive old Closed tickets straight from the database, for every workspace.
+
+Uses the same batched moves as ``POST /api/tickets/archive``; suitable for a
+nightly cron job. ``--pause`` sleeps between batches to leave the write lock
+free for the API on a busy database.
+
+Usage:
+    python scripts/archive_tickets.py --days 90
+    python scripts/archive_tickets.py --days 30 --workspace 1 \\
+        --batch-size 1000 --pause 0.05
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+import _archive as archive  # noqa: E402
+import _repository as repository  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Archive old Closed tickets."
+    )
+    parser.add_argument(
+        "--database",
+        default=os.getenv("DATABASE", "jyra.db"),
+        help="SQLite database (defaults to $DATABASE or jyra.db)",
+    )
+    parser.add_argument(
+        "--days",
+        type=float,
+        default=float(os.getenv("ARCHIVE_AFTER_DAYS", "90")),
+        help=(
+            "Minimum days since a ticket was closed "
+            "(defaults to $ARCHIVE_AFTER_DAYS or 90)"
+        ),
+    )
+    parser.add_argument(
+        "--workspace",
+        type=int,
+        help="Only archive this workspace (defaults to all)",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=archive.DEFAULT_BATCH_SIZE
+    )
+    parser.add_argument(
+        "--pause",
+        type=float,
+        default=0.0,
+        help="Seconds to sleep between batches",
+    )
+    args = parser.parse_args()
+
+    db = sqlite3.connect(args.database, timeout=30)
+    db.execute("PRAGMA journal_mode = WAL")
+    started = time.perf_counter()
+    total = 0
+
+    try:
+        if args.workspace is not None:
+            workplace_ids = [args.workspace]
+        else:
+            workplace_ids = repository.list_workplace_ids(db)
+
+        for workplace_id in workplace_ids:
+            archived, _ = archive.archive_workspace(
+                db,
+                workplace_id,
+                args.days,
+                batch_size=args.batch_size,
+                pause=args.pause,
+                progress=lambda n, w=workplace_id: print(
+                    f"workspace {w}: archived {n}", file=sys.stderr
+                ),
+            )
+            total += archived
+    finally:
+        db.close()
+
+    print(
+        f"done: archived {total} tickets from {len(workplace_ids)} "
+        f"workspace(s) in {time.perf_counter() - started:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Check the query plan of every repository statement against the real schema.
+
+Creates a scratch database through the API's own ``init_db`` and runs
+``EXPLAIN QUERY PLAN`` on each statement in ``repository.STATEMENTS``. A plan
+fails when it:
+
+- scans a table without an index, or
+- sorts in a temporary B-tree after narrowing the table by the workspace
+  alone (the ticket table views must be read in index order; sorting is only
+  acceptable for subsets narrowed by a further equality filter or a bounded
+  range, such as a prefix search).
+
+Exits with status 1 if any plan fails, so it can run in CI:
+
+    python scripts/check_query_plans.py [--verbose]
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+# The dashboard page is taken from window counts over every matching ticket,
+# so its top-N sort is expected.
+EXPECTED_SORTS = {"workspace_ticket_page", "owner_ticket_page"}
+# Statements that enumerate a whole table by design (archival runs over
+# every workspace; the closed_at backfill runs once, at the schema upgrade).
+EXPECTED_SCANS = {"workplace_ids", "backfill_closed_at"}
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+EQUALITY = re.compile(r"\w+=\?|<expr>=\?")
+BOUNDED_RANGE = re.compile(r"(\w+|<expr>)>=?\? AND \1<=?\?")
+
+
+def plan_of(db: sqlite3.Connection, sql: str) -> list[str]:
+    params = (None,) * sql.count("?")
+    return [row[3] for row in db.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def problems_in(name: str, plan: list[str]) -> list[str]:
+    problems = []
+    searches = [step for step in plan if step.startswith("SEARCH")]
+    for step in plan:
+        match = FULL_SCAN.match(step)
+        if match and name not in EXPECTED_SCANS:
+            problems.append(f"full scan of {match.group(1)}")
+    if "USE TEMP B-TREE FOR ORDER BY" in plan and name not in EXPECTED_SORTS:
+        narrowed = any(
+            len(EQUALITY.findall(step)) >= 2 or BOUNDED_RANGE.search(step)
+            for step in searches
+        )
+        if not narrowed:
+            problems.append("temporary B-tree sort of the whole workspace")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.environ.setdefault(
+            "JWT_SECRET_KEY", "query-plan-check-secret-key-000"
+        )
+        import _ranking as ranking
+        import _repository as repository
+        import index
+
+        app = index.create_app({"DATABASE": os.path.join(tmp, "plans.db")})
+        with app.app_context():
+            index.init_db()
+
+        db = sqlite3.connect(app.config["DATABASE"])
+        ranking.register_functions(db)
+        failures = 0
+        for name, sql in repository.STATEMENTS.items():
+            plan = plan_of(db, sql)
+            problems = problems_in(name, plan)
+            if problems:
+                failures += 1
+                print(f"FAIL {name}: {'; '.join(problems)}")
+            elif args.verbose:
+                print(f"ok   {name}")
+            if problems or args.verbose:
+                for step in plan:
+                    print(f"    {step}")
+        db.close()
+
+    print(
+        f"{len(repository.STATEMENTS) - failures} of "
+        f"{len(repository.STATEMENTS)} statements have acceptable plans"
+    )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Count the repository statements each API endpoint runs per request.
+
+Drives every route of the ``api`` blueprint through Flask's test client
+against a scratch database, recording the statements executed on the request
+thread (the audit writer and rank rebalancer run on their own threads and are
+not counted). A request fails when it runs more statements than its budget
+or returns an error, and a route without a scenario fails too, so a new
+endpoint cannot ship unmeasured. Writes are budgeted at one statement plus
+the workspace version bump.
+
+Exits with status 1 on any failure, so it can run in CI:
+
+    python scripts/count_queries.py [--verbose]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+BASE_URL = "https://localhost"
+PASSWORD = "query-count-password"
+
+
+class StatementCounter:
+    """Statement hook that records statement names run on one thread."""
+
+    def __init__(self):
+        self.thread_id = threading.get_ident()
+        self.names: list[str] = []
+
+    def __call__(self, name: str, seconds: float):
+        if threading.get_ident() == self.thread_id:
+            self.names.append(name)
+
+    def take(self) -> list[str]:
+        names, self.names = self.names, []
+        return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.environ.setdefault(
+            "JWT_SECRET_KEY", "query-count-check-secret-key-000"
+        )
+        import _repository as repository
+        import index
+
+        app = index.create_app(
+            {
+                "DATABASE": os.path.join(tmp, "queries.db"),
+                "AUTH_RATE_LIMIT_BURST": 1000,
+                # The first account signed up (the admin) is the operator.
+                "OPERATOR_USER_IDS": frozenset({1}),
+                # Keep the cross-process poll out of the per-request counts.
+                "INVALIDATION_POLL_SECONDS": 3600,
+            }
+        )
+        with app.app_context():
+            index.init_db()
+
+        adapter = app.url_map.bind("localhost")
+        counter = StatementCounter()
+        repository.add_statement_hook(counter)
+        admin, member = app.test_client(), app.test_client()
+        covered = set()
+        failures = 0
+
+        def measure(client, method, path, budget, **kwargs):
+            nonlocal failures
+            response = client.open(
+                path, method=method, base_url=BASE_URL, **kwargs
+            )
+            response.get_data()
+            names = counter.take()
+            endpoint, _ = adapter.match(path.split("?")[0], method=method)
+            covered.add(endpoint)
+            # An error response would be measured on the wrong code path.
+            failed = len(names) > budget or response.status_code >= 400
+            failures += failed
+            if failed or args.verbose:
+                print(
+                    f"{'FAIL' if failed else 'ok  '} {method} {path} "
+                    f"{response.status_code}: {len(names)} of {budget}"
+                )
+                print(f"    {', '.join(names) or '-'}")
+            return response
+
+        def signup(client, email, name):
+            payload = {"email": email, "password": PASSWORD, "name": name}
+            return measure(client, "POST", "/api/signup", 2, json=payload)
+
+        # Warm the invalidation bus before anything is counted.
+        app.extensions["invalidation"].poll()
+        counter.take()
+
+        signup(admin, "admin@example.com", "Admin")
+        signup(member, "member@example.com", "Member")
+        credentials = {"email": "admin@example.com", "password": PASSWORD}
+        measure(admin, "POST", "/api/signin", 1, json=credentials)
+        measure(
+            admin, "POST", "/api/user/check-credentials", 1, json=credentials
+        )
+        measure(admin, "GET", "/api/status", 1)
+
+        response = measure(
+            admin,
+            "POST",
+            "/api/workspace/create",
+            4,
+            json={"name": "Workspace", "description": "Query counts"},
+        )
+        join_code = response.get_json()["body"]["join_code"]
+        measure(admin, "GET", "/api/workspace", 2)
+        measure(
+            member,
+            "POST",
+            "/api/workspace/join",
+            3,
+            json={"joinCode": join_code},
+        )
+
+        ticket = {"title": "Ticket", "description": "Counted"}
+        response = measure(
+            admin, "POST", "/api/tickets/create", 2, json=ticket
+        )
+        first_id = response.get_json()["body"]["id"]
+        response = measure(
+            member, "POST", "/api/tickets/create", 2, json=ticket
+        )
+        second_id = response.get_json()["body"]["id"]
+        measure(
+            admin,
+            "PUT",
+            f"/api/tickets/{first_id}",
+            2,
+            json={"priority": "High"},
+        )
+        # A move also reads the ticket, the mover and the neighbours' ranks.
+        measure(
+            admin,
+            "PUT",
+            f"/api/tickets/{first_id}",
+            6,
+            json={"after_id": second_id},
+        )
+        measure(
+            member,
+            "PUT",
+            "/api/user",
+            2,
+            json={"name": "Member Renamed"},
+        )
+
+        measure(admin, "GET", "/api/tickets", 2)
+        # Unchanged data is served from the response cache.
+        measure(admin, "GET", "/api/tickets", 1)
+        measure(admin, "GET", "/api/tickets?status=Open&sort=priority", 2)
+        measure(admin, "GET", "/api/tickets/board?status=Open", 2)
+        measure(admin, "GET", "/api/dashboard", 3)
+        measure(admin, "GET", f"/api/tickets/{first_id}/history", 4)
+        measure(admin, "GET", "/api/workspace/users", 2)
+        measure(member, "GET", "/api/workspace/users", 1)
+        measure(admin, "GET", "/api/workspace/users?limit=10&q=mem", 3)
+        measure(
+            admin,
+            "POST",
+            "/api/batch",
+            3,
+            json={
+                "requests": [{"path": "/api/tickets"}, {"path": "/api/status"}]
+            },
+        )
+        measure(admin, "GET", "/api/tickets/export", 2)
+        measure(
+            admin,
+            "POST",
+            "/api/tickets/import?format=csv",
+            5,
+            data="title,description\nImported,From CSV\n",
+            content_type="text/csv",
+        )
+        measure(
+            admin,
+            "POST",
+            "/api/tickets/archive",
+            3,
+            json={"older_than_days": 0},
+        )
+        measure(
+            admin,
+            "POST",
+            "/api/workspace/promote",
+            2,
+            json={"userId": 2},
+        )
+        measure(admin, "GET", "/api/metrics", 0)
+        measure(admin, "GET", "/api/diagnostics/memory", 1)
+        measure(
+            admin,
+            "POST",
+            "/api/diagnostics/memory/tracing",
+            1,
+            json={"enabled": True},
+        )
+        for _ in range(2):
+            measure(admin, "POST", "/api/diagnostics/memory/snapshots", 1)
+        measure(admin, "GET", "/api/diagnostics/memory/diff?from=1&to=2", 1)
+        measure(
+            admin,
+            "POST",
+            "/api/diagnostics/memory/tracing",
+            1,
+            json={"enabled": False},
+        )
+
+        mfa = {"question": "First pet?", "answer": "Rex"}
+        # The first setup inserts the question after the update finds none.
+        measure(admin, "POST", "/api/user/mfa/setup", 4, json=mfa)
+        measure(admin, "POST", "/api/user/mfa/setup", 3, json=mfa)
+        measure(admin, "GET", "/api/user/mfa/status", 1)
+        email = {"email": "admin@example.com"}
+        measure(admin, "POST", "/api/user/mfa/check", 2, json=email)
+        measure(
+            admin,
+            "POST",
+            "/api/user/mfa/verify",
+            2,
+            json={**email, "answer": "Rex"},
+        )
+        measure(admin, "POST", "/api/user/mfa/complete-auth", 1, json=email)
+        measure(admin, "POST", "/api/user/mfa/disable", 2)
+        measure(admin, "POST", "/api/refresh", 0)
+        measure(admin, "POST", "/api/signout", 0)
+        repository.remove_statement_hook(counter)
+
+        routes = {
+            rule.endpoint
+            for rule in app.url_map.iter_rules()
+            if rule.endpoint.startswith("api.")
+        }
+        for endpoint in sorted(routes - covered):
+            failures += 1
+            print(f"FAIL {endpoint}: no scenario")
+
+    print(f"{len(routes)} routes measured, {failures} failure(s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Import-time profile of the API module graph, with an optional budget check.
+
+Runs ``python -X importtime -c "import index"`` in fresh processes and reports
+the modules with the highest cumulative and self import time (median across
+runs), plus the cost of each module imported directly by ``index``.
+
+With ``--budget-ms`` the script exits with status 1 when the median total
+import time of ``index`` exceeds the budget, so it can be used as a
+regression check in CI:
+
+    python scripts/import_profile.py --runs 7 --budget-ms 300
+
+Usage:
+    python scripts/import_profile.py [--runs 5] [--top 25] [--budget-ms N]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+API_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "api"))
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "0"))
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def profile_once(module: str) -> list[tuple[str, int, int, int]]:
+    """Return (module, self_us, cumulative_us, depth) for one fresh import."""
+    env = dict(os.environ, JWT_SECRET_KEY=os.getenv("JWT_SECRET_KEY", "x"))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=API_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append(
+                (name, int(self_us), int(cumulative_us), len(indent) // 2)
+            )
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="index")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help="Fail when the median import time exceeds this (0 disables)",
+    )
+    args = parser.parse_args()
+
+    self_times = defaultdict(list)
+    cumulative_times = defaultdict(list)
+    direct = set()
+    totals = []
+
+    for _ in range(args.runs):
+        children = []
+        for name, self_us, cumulative_us, depth in profile_once(args.module):
+            self_times[name].append(self_us)
+            cumulative_times[name].append(cumulative_us)
+            if depth == 1:
+                children.append(name)
+            elif depth == 0:
+                if name == args.module:
+                    direct.update(children)
+                    totals.append(cumulative_us / 1000)
+                children = []
+
+    def median_ms(samples: dict, name: str) -> float:
+        return statistics.median(samples[name]) / 1000
+
+    total = statistics.median(totals)
+    print(f"import {args.module}: median {total:.1f} ms over {args.runs} runs\n")
+
+    print(f"Imported directly by {args.module} (cumulative):")
+    for name in sorted(
+        direct, key=lambda n: median_ms(cumulative_times, n), reverse=True
+    ):
+        print(f"  {median_ms(cumulative_times, name):8.1f} ms  {name}")
+
+    print(f"\nTop {args.top} modules by self time:")
+    for name in sorted(
+        self_times, key=lambda n: median_ms(self_times, n), reverse=True
+    )[: args.top]:
+        print(
+            f"  {median_ms(self_times, name):8.1f} ms self "
+            f"{median_ms(cumulative_times, name):8.1f} ms cumulative  {name}"
+        )
+
+    if args.budget_ms and total > args.budget_ms:
+        print(
+            f"\nFAIL: import {args.module} took {total:.1f} ms, "
+            f"over the {args.budget_ms:.0f} ms budget",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    if args.budget_ms:
+        print(f"\nOK: within the {args.budget_ms:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
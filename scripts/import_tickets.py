@@ -0,0 +1,133 @@
+"""
+Bulk import tickets from a CSV or NDJSON file straight into the database.
+
+Uses the same parsing, validation and batching as ``POST /api/tickets/import``.
+Progress is written to stderr after each committed batch. With ``--checkpoint``
+the number of committed records is saved after every batch, and a re-run with
+the same checkpoint file resumes where the previous run stopped.
+
+Usage:
+    python scripts/import_tickets.py tickets.csv --workspace 1 --owner 1
+    python scripts/import_tickets.py tickets.ndjson --workspace 1 --owner 1 \\
+        --batch-size 10000 --checkpoint tickets.ckpt
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+import _bulk as bulk  # noqa: E402
+
+
+def read_checkpoint(path: str) -> int:
+    try:
+        with open(path) as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def write_checkpoint(path: str, resume_from: int):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(str(resume_from))
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bulk import tickets from CSV or NDJSON."
+    )
+    parser.add_argument("file", help="CSV or NDJSON file to import")
+    parser.add_argument(
+        "--database",
+        default=os.getenv("DATABASE", "jyra.db"),
+        help="SQLite database (defaults to $DATABASE or jyra.db)",
+    )
+    parser.add_argument("--workspace", type=int, required=True)
+    parser.add_argument(
+        "--owner",
+        type=int,
+        required=True,
+        help="Owner for records without an owner_id",
+    )
+    parser.add_argument(
+        "--format",
+        choices=bulk.IMPORT_FORMATS,
+        help="Input format (defaults to the file extension)",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=bulk.DEFAULT_BATCH_SIZE
+    )
+    parser.add_argument(
+        "--resume-from",
+        type=int,
+        default=0,
+        help="Skip this many records (overridden by --checkpoint)",
+    )
+    parser.add_argument(
+        "--checkpoint", help="File recording committed progress for resuming"
+    )
+    args = parser.parse_args()
+
+    fmt = args.format or os.path.splitext(args.file)[1].lstrip(".").lower()
+    if fmt not in bulk.IMPORT_FORMATS:
+        parser.error("cannot infer format, pass --format csv|ndjson")
+
+    resume_from = args.resume_from
+    if args.checkpoint:
+        resume_from = max(resume_from, read_checkpoint(args.checkpoint))
+
+    db = sqlite3.connect(args.database)
+    db.execute("PRAGMA journal_mode = WAL")
+    started = time.perf_counter()
+
+    def progress(result: bulk.ImportResult):
+        if args.checkpoint:
+            write_checkpoint(args.checkpoint, result.resume_from)
+        rate = result.imported / max(time.perf_counter() - started, 1e-9)
+        print(
+            f"imported {result.imported} skipped {result.skipped} "
+            f"(record {result.resume_from}, {rate:,.0f} tickets/s)",
+            file=sys.stderr,
+        )
+
+    try:
+        with open(args.file, "rb") as f:
+            result = bulk.import_tickets(
+                db,
+                bulk.iter_records(f, fmt),
+                args.workspace,
+                args.owner,
+                batch_size=args.batch_size,
+                resume_from=resume_from,
+                progress=progress,
+            )
+    except bulk.ImportFailed as e:
+        print(
+            f"{e} - resume with --resume-from {e.resume_from}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    finally:
+        db.close()
+
+    if args.checkpoint:
+        write_checkpoint(args.checkpoint, result.resume_from)
+
+    for error in result.errors:
+        print(f"record {error['record']}: {error['error']}", file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"done: imported {result.imported}, skipped {result.skipped} "
+        f"in {elapsed:.2f}s ({result.imported / max(elapsed, 1e-9):,.0f} tickets/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Latency and traffic report from the request lines ``after_request`` writes to
+``api.log``.
+
+Log files are streamed line by line (rotated ``api.log.N`` and gzipped
+``*.gz`` files included), so memory use depends on the number of routes, not
+the size of the logs. Durations go into log-scale histograms, which give
+p50/p95/p99 within about 4% and can be merged, so several files can be
+processed in parallel with ``--jobs`` and the results combined.
+
+Lines written under head sampling carry a ``sample_rate`` and are counted
+``1 / sample_rate`` times, so counts, throughput and percentiles estimate the
+full traffic even though errors and slow requests are always logged.
+
+Numeric path segments are folded into ``<id>`` so that e.g. every
+``PUT /api/tickets/<id>`` request is reported as one route.
+
+Usage:
+    python scripts/log_report.py [api.log api.log.1 api.log.2.gz ...]
+                                 [--jobs 4] [--top 10] [--json]
+"""
+
+import argparse
+import glob
+import gzip
+import heapq
+import json
+import math
+import re
+import sys
+from collections import Counter
+from datetime import datetime
+from multiprocessing import Pool
+
+BUCKET_GROWTH = 1.04
+LOG_GROWTH = math.log(BUCKET_GROWTH)
+ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+REQUEST_MARKER = '"duration": "'
+
+
+class RouteStats:
+    """Mergeable counters and duration histogram for one route."""
+
+    __slots__ = ("count", "total", "maximum", "buckets", "statuses")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.buckets: Counter = Counter()
+        self.statuses: Counter = Counter()
+
+    def add(self, duration: float, status: int, weight: float = 1.0):
+        self.count += weight
+        self.total += duration * weight
+        if duration > self.maximum:
+            self.maximum = duration
+        self.buckets[_bucket(duration)] += weight
+        self.statuses[status] += weight
+
+    def merge(self, other: "RouteStats"):
+        self.count += other.count
+        self.total += other.total
+        self.maximum = max(self.maximum, other.maximum)
+        self.buckets.update(other.buckets)
+        self.statuses.update(other.statuses)
+
+    def percentile(self, fraction: float) -> float:
+        """Return the upper bound of the bucket holding the percentile."""
+        rank = math.ceil(self.count * fraction)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(_bucket_upper(bucket), self.maximum)
+        return self.maximum
+
+
+def _bucket(duration: float) -> int:
+    micros = max(duration * 1e6, 1.0)
+    return int(math.log(micros) / LOG_GROWTH)
+
+
+def _bucket_upper(bucket: int) -> float:
+    return BUCKET_GROWTH ** (bucket + 1) / 1e6
+
+
+def open_log(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, encoding="utf-8", errors="replace")
+
+
+def scan_file(args: tuple[str, int]) -> dict:
+    """
+    Aggregate one log file.
+
+    Returns:
+    -------
+    dict
+        Per-route stats, the slowest requests, the first and last
+        timestamps and counts of request and unparseable lines
+    """
+    path, top = args
+    routes: dict[str, RouteStats] = {}
+    slowest: list[tuple] = []
+    first = last = None
+    malformed = 0
+
+    with open_log(path) as lines:
+        for line in lines:
+            if REQUEST_MARKER not in line:
+                continue
+            try:
+                entry = json.loads(line[line.index("{") :])
+                duration = float(entry["duration"].rstrip("s"))
+                status = int(entry["status_code"])
+                method = entry["method"]
+                request_path = entry["path"]
+                timestamp = entry["timestamp"]
+                weight = 1 / float(entry.get("sample_rate", 1))
+            except (
+                ValueError,
+                KeyError,
+                TypeError,
+                AttributeError,
+                ZeroDivisionError,
+            ):
+                malformed += 1
+                continue
+
+            route = f"{method} {ID_SEGMENT.sub('/<id>', request_path)}"
+            stats = routes.get(route)
+            if stats is None:
+                stats = routes[route] = RouteStats()
+            stats.add(duration, status, weight)
+
+            if first is None or timestamp < first:
+                first = timestamp
+            if last is None or timestamp > last:
+                last = timestamp
+
+            item = (duration, timestamp, method, request_path, status)
+            if len(slowest) < top:
+                heapq.heappush(slowest, item)
+            elif item > slowest[0]:
+                heapq.heapreplace(slowest, item)
+
+    return {
+        "routes": routes,
+        "slowest": slowest,
+        "first": first,
+        "last": last,
+        "malformed": malformed,
+    }
+
+
+def merge(results: list[dict], top: int) -> dict:
+    routes: dict[str, RouteStats] = {}
+    slowest: list[tuple] = []
+    firsts = [r["first"] for r in results if r["first"]]
+    lasts = [r["last"] for r in results if r["last"]]
+    for result in results:
+        for route, stats in result["routes"].items():
+            routes.setdefault(route, RouteStats()).merge(stats)
+        slowest.extend(result["slowest"])
+    return {
+        "routes": routes,
+        "slowest": heapq.nlargest(top, slowest),
+        "first": min(firsts) if firsts else None,
+        "last": max(lasts) if lasts else None,
+        "malformed": sum(r["malformed"] for r in results),
+    }
+
+
+def build_report(merged: dict) -> dict:
+    span = 0.0
+    if merged["first"] and merged["last"]:
+        span = (
+            datetime.fromisoformat(merged["last"])
+            - datetime.fromisoformat(merged["first"])
+        ).total_seconds()
+
+    statuses: Counter = Counter()
+    routes = []
+    for route, stats in sorted(
+        merged["routes"].items(), key=lambda item: -item[1].count
+    ):
+        statuses.update(stats.statuses)
+        routes.append(
+            {
+                "route": route,
+                "count": round(stats.count),
+                "per_second": stats.count / span if span else None,
+                "mean_ms": stats.total / stats.count * 1000,
+                "p50_ms": stats.percentile(0.50) * 1000,
+                "p95_ms": stats.percentile(0.95) * 1000,
+                "p99_ms": stats.percentile(0.99) * 1000,
+                "max_ms": stats.maximum * 1000,
+                "statuses": {
+                    str(k): round(v) for k, v in sorted(stats.statuses.items())
+                },
+            }
+        )
+
+    return {
+        "first": merged["first"],
+        "last": merged["last"],
+        "span_seconds": span,
+        "requests": sum(route["count"] for route in routes),
+        "malformed": merged["malformed"],
+        "statuses": {str(k): round(v) for k, v in sorted(statuses.items())},
+        "routes": routes,
+        "slowest": [
+            {
+                "duration_ms": duration * 1000,
+                "timestamp": timestamp,
+                "method": method,
+                "path": path,
+                "status": status,
+            }
+            for duration, timestamp, method, path, status in merged["slowest"]
+        ],
+    }
+
+
+def print_report(report: dict):
+    print(
+        f"{report['requests']} requests from {report['first']} to "
+        f"{report['last']} ({report['span_seconds']:.0f}s), "
+        f"{report['malformed']} malformed lines"
+    )
+    print(
+        "statuses: "
+        + ", ".join(f"{k}: {v}" for k, v in report["statuses"].items())
+    )
+    print()
+    print(
+        f"{'route':<40} {'count':>8} {'req/s':>8} {'p50':>8} {'p95':>8} "
+        f"{'p99':>8} {'max':>8}  statuses"
+    )
+    for route in report["routes"]:
+        per_second = route["per_second"]
+        print(
+            f"{route['route']:<40} {route['count']:>8} "
+            f"{per_second if per_second is not None else 0:>8.2f} "
+            f"{route['p50_ms']:>8.1f} {route['p95_ms']:>8.1f} "
+            f"{route['p99_ms']:>8.1f} {route['max_ms']:>8.1f}  "
+            + " ".join(f"{k}:{v}" for k, v in route["statuses"].items())
+        )
+    print("\n(latencies in ms)\n\nslowest requests:")
+    for item in report["slowest"]:
+        print(
+            f"  {item['duration_ms']:>9.1f} ms  {item['timestamp']}  "
+            f"{item['method']} {item['path']} -> {item['status']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help="Log files or globs (default: api.log and its rotations)",
+    )
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    patterns = args.files or ["api.log", "api.log.*"]
+    paths = sorted(
+        {path for pattern in patterns for path in glob.glob(pattern)}
+    )
+    if not paths:
+        sys.exit("No log files found")
+
+    work = [(path, args.top) for path in paths]
+    if args.jobs > 1 and len(paths) > 1:
+        with Pool(min(args.jobs, len(paths))) as pool:
+            results = pool.map(scan_file, work)
+    else:
+        results = [scan_file(item) for item in work]
+
+    report = build_report(merge(results, args.top))
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ import WorkspaceJoinCode from "@/components/dashboard/join-code";
 import TicketTable from "@/components/dashboard/table";
 import Loading from "@/components/loading";
 import { useAuth } from "@/hooks/use-auth";
-import { apiRequest } from "@/lib/api";
+import { apiRequest, batchRequest } from "@/lib/api";
 import {
   AlertCircle,
   AlertTriangle,
@@ -116,7 +116,16 @@ export default function Admin() {
   async function fetchData() {
     setIsLoadingData(true);
     try {
-      await Promise.all([fetchTickets(), fetchUsers()]);
+      const [ticketsResult, usersResult] = await batchRequest([
+        "tickets",
+        "workspace/users",
+      ]);
+      if (ticketsResult.data) {
+        setTickets(ticketsResult.data as TicketType[]);
+      }
+      if (usersResult.data) {
+        setUsers(usersResult.data as User[]);
+      }
     } catch (error) {
       console.error("Error fetching data:", error);
       toast.error("Failed to fetch data");
@@ -125,20 +134,6 @@ export default function Admin() {
     }
   }
 
-  async function fetchTickets() {
-    const result = await apiRequest<TicketType[]>("tickets");
-    if (result.data) {
-      setTickets(result.data);
-    }
-  }
-
-  async function fetchUsers() {
-    const result = await apiRequest<User[]>("workspace/users");
-    if (result.data) {
-      setUsers(result.data);
-    }
-  }
-
   async function updateTicket(ticketId: number, updates: Partial<TicketType>) {
     try {
       const result = await apiRequest<TicketType>(`tickets/${ticketId}`, {
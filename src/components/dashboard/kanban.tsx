@@ -17,6 +17,7 @@ import { arrayMove, sortableKeyboardCoordinates } from "@dnd-kit/sortable";
 import { useEffect, useState } from "react";
 
 interface KanbanBoardProps {
+  moveTicket: (ticketId: number, afterId: null | number) => Promise<void>;
   tickets: Ticket[];
   updateTicketStatus: (ticketId: number, newStatus: string) => Promise<void>;
 }
@@ -27,6 +28,7 @@ interface Ticket {
   id: number;
   owner_id: number;
   priority: string;
+  rank: null | string;
   status: string;
   title: string;
 }
@@ -34,7 +36,16 @@ interface Ticket {
 const VALID_STATUSES = ["Open", "In Progress", "Closed"] as const;
 type ValidStatus = (typeof VALID_STATUSES)[number];
 
+// Ranks compare byte-wise, like the database orders them.
+const byRank = (a: Ticket, b: Ticket) =>
+  (a.rank ?? "") < (b.rank ?? "")
+    ? -1
+    : (a.rank ?? "") > (b.rank ?? "")
+      ? 1
+      : a.id - b.id;
+
 export default function KanbanBoard({
+  moveTicket,
   tickets,
   updateTicketStatus,
 }: KanbanBoardProps) {
@@ -43,7 +54,7 @@ export default function KanbanBoard({
   const [ticketsState, setTicketsState] = useState<Ticket[]>(tickets);
 
   useEffect(() => {
-    setTicketsState(tickets);
+    setTicketsState([...tickets].sort(byRank));
   }, [tickets]);
 
   const sensors = useSensors(
@@ -110,7 +121,15 @@ export default function KanbanBoard({
         const overIndex = ticketsState.findIndex((t) => t.id === overTicketId);
 
         if (activeIndex !== -1 && overIndex !== -1) {
-          setTicketsState(arrayMove(ticketsState, activeIndex, overIndex));
+          const moved = arrayMove(ticketsState, activeIndex, overIndex);
+          setTicketsState(moved);
+
+          const column = moved.filter((t) => t.status === activeTicket.status);
+          const position = column.findIndex((t) => t.id === activeTicketId);
+          await moveTicket(
+            activeTicketId,
+            position > 0 ? column[position - 1].id : null
+          );
         }
       } else {
         setTicketsState((currentTickets) =>
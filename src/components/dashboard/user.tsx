@@ -34,6 +34,7 @@ interface Ticket {
   id: number;
   owner_id: number;
   priority: string;
+  rank: null | string;
   status: string;
   title: string;
 }
@@ -98,7 +99,10 @@ export default function User() {
   }
 
   const updateTicket = useCallback(
-    async (ticketId: number, updates: Partial<Ticket>) => {
+    async (
+      ticketId: number,
+      updates: Partial<Ticket> & { after_id?: null | number }
+    ) => {
       try {
         const result = await apiRequest<Ticket>(`tickets/${ticketId}`, {
           body: updates,
@@ -322,6 +326,9 @@ export default function User() {
       ) : (
         <div className="p-4 h-full flex flex-col">
           <KanbanBoard
+            moveTicket={(ticketId: number, afterId: null | number) =>
+              updateTicket(ticketId, { after_id: afterId })
+            }
             tickets={tickets}
             updateTicketStatus={(ticketId: number, newStatus: string) =>
               updateTicket(ticketId, { status: newStatus })
@@ -61,3 +61,35 @@ export async function apiRequest<T = unknown>(
     };
   }
 }
+
+interface BatchItem {
+  body: null | { body?: unknown; error?: string };
+  path: string;
+  status: number;
+}
+
+export async function batchRequest(
+  endpoints: string[]
+): Promise<ApiResult<unknown>[]> {
+  const result = await apiRequest<BatchItem[]>("batch", {
+    body: {
+      requests: endpoints.map((endpoint) => ({ path: `/api/${endpoint}` })),
+    },
+    method: "POST",
+  });
+
+  if (!result.data) {
+    return endpoints.map(() => ({
+      data: null,
+      error: result.error,
+      status: result.status,
+    }));
+  }
+
+  return result.data.map(({ body, status }) => ({
+    data: status < 400 ? body?.body ?? null : null,
+    error:
+      status < 400 ? null : body?.error ?? "An unknown error occurred",
+    status,
+  }));
+}